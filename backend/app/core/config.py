@@ -3,7 +3,7 @@ Configuration settings for the AI Interviewer application
 """
 
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 import os
 import json
 
@@ -23,6 +23,99 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o"
     WHISPER_MODEL: str = "whisper-1"
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_MAX_CONNECTIONS: int = 20  # Shared HTTP connection pool size
+    OPENAI_MAX_CONCURRENCY: int = 8  # Concurrent OpenAI calls per process
+    OPENAI_BASE_URL: Optional[str] = None  # e.g. http://localhost:8100/v1 for benchmarks/openai_stub.py
+    
+    # Model routing: OPENAI_MODEL is the quality tier, OPENAI_FAST_MODEL the fast tier
+    OPENAI_FAST_MODEL: str = "gpt-4o-mini"
+    LLM_MODEL_ROUTES: Dict[str, str] = {
+        # Live interview turns
+        "analyze_response": "fast",
+        "analyze_batch": "fast",  # Same tier as analyze_response so per-answer scores stay comparable
+        "next_action": "fast",
+        "turn": "fast",
+        "speculative_question": "fast",
+        "opening_question": "fast",
+        "adaptive_question": "fast",
+        # Reports and profile extraction
+        "final_analysis": "quality",
+        "resume_analysis": "quality",
+        "question_generation": "quality",
+    }
+    LLM_LATENCY_SLO_SECONDS: Dict[str, float] = {  # p95 above this moves the operation to the fast tier
+        "final_analysis": 45.0,
+        "resume_analysis": 30.0,
+        "question_generation": 30.0,
+    }
+    LLM_SLO_MIN_SAMPLES: int = 5
+    LLM_SLO_COOLDOWN_SECONDS: int = 300
+    
+    # OpenAI call resilience
+    LLM_MAX_RETRIES: int = 3  # Retries for 429s, 5xx, timeouts and connection errors
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5  # Full-jitter exponential backoff
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_CALL_DEADLINE_SECONDS: float = 90.0  # Total time for one call including retries
+    LLM_HEDGING_ENABLED: bool = False  # Send a duplicate request when the first is slower than p95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before hedging starts
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive provider failures that open the circuit
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0  # Time before a half-open probe is allowed
+
+    # OpenAI rate limiting (token buckets shared by the workers on a host)
+    OPENAI_RATE_LIMIT_ENABLED: bool = True
+    OPENAI_RATE_LIMIT_BACKEND: str = "file"  # file (fcntl-locked, shared across workers) or memory (per process)
+    OPENAI_RATE_LIMIT_STATE_FILE: str = "/tmp/ai_interviewer_openai_ratelimit.json"
+    OPENAI_RATE_LIMITS: Dict[str, Dict[str, int]] = {  # Starting limits per model; x-ratelimit-* headers override them
+        "gpt-4o": {"rpm": 500, "tpm": 30000},
+        "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+        "whisper-1": {"rpm": 50, "tpm": 0},  # tpm 0 = no token bucket
+        "text-embedding-3-small": {"rpm": 3000, "tpm": 1000000},
+        "default": {"rpm": 500, "tpm": 30000}
+    }
+    OPENAI_RATE_LIMIT_BURST_SECONDS: float = 10.0  # Bucket capacity in seconds of the per-minute limit
+    OPENAI_RATE_LIMIT_MAX_WAIT_SECONDS: float = 30.0  # Longest a call waits for its reservation
+    OPENAI_RATE_LIMIT_DECREASE: float = 0.5  # AIMD: multiply the rate by this on a 429
+    OPENAI_RATE_LIMIT_INCREASE: float = 0.02  # AIMD: fraction of the limit regained per successful call
+    OPENAI_RATE_LIMIT_MIN_FRACTION: float = 0.1
+    OPENAI_COMPLETION_TOKEN_ESTIMATE: int = 500  # Reserved for completions without max_tokens
+
+    # LLM Response Cache (deterministic prompts only)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1000  # In-memory LRU size
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_PERSISTENT: bool = True  # Also store entries in the database
+    LLM_CACHE_PERSISTENT_MAX_ROWS: int = 50000
+    LLM_JSON_MAX_RETRIES: int = 1  # Re-asks when structured output fails schema validation
+    
+    # Final analysis coalescing across workers
+    SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS: int = 300
+    FINAL_ANALYSIS_BACKFILL_CONCURRENCY: int = 5  # Parallel analyses for responses missing one
+    BATCH_SCORING_ENABLED: bool = True  # Score several answers per LLM request
+    BATCH_SCORING_MAX_ITEMS: int = 8
+    FINAL_ANALYSIS_CONTEXT_TOKENS: int = 6000  # Budget for the conversation section of the prompt
+    FINAL_ANALYSIS_MAX_ANSWER_TOKENS: int = 400  # Longer answers are trimmed extractively
+    
+    # Local first-pass scorer (LLM is called only for responses it is unsure about)
+    LOCAL_SCORER_ENABLED: bool = True
+    LOCAL_SCORER_WEIGHTS_FILE: str = "local_scorer_weights.json"  # Written by scripts/train_local_scorer.py
+    LOCAL_SCORER_MAX_INTERVAL: float = 1.5  # Escalate when a 90% prediction interval is wider than +/- this many points
+    
+    # Background job queue
+    JOB_QUEUE_ENABLED: bool = True  # Run final analysis etc. on queue workers instead of inline
+    JOB_WORKERS: int = 2  # Worker coroutines per process
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3  # Then the job is marked dead
+    JOB_RETRY_BASE_SECONDS: int = 10  # Doubled after every failed attempt
+    JOB_TIMEOUT_SECONDS: int = 600
+    JOB_LEASE_SECONDS: int = 900  # Running jobs not finished by then are retried by another worker
+    
+    # Question bank (pre-generated questions served by /api/ai/question-bank)
+    QUESTION_BANK_TARGET_SIZE: int = 30  # Questions kept per role focus, difficulty and question type
+    QUESTION_BANK_BATCH_SIZE: int = 10  # Questions generated per LLM call
+    QUESTION_BANK_REFRESH_INTERVAL_SECONDS: int = 3600  # How often short pools are queued for a refill
+    QUESTION_BANK_ROLES: List[str] = []  # Role focuses stocked before anyone requests them
     
     # Pinecone Configuration
     PINECONE_API_KEY: str = ""
@@ -62,6 +155,29 @@ class Settings(BaseSettings):
         else:
             print(f"DEBUG: No environment ALLOWED_ORIGINS found")
     
+    # Interview WebSocket
+    WS_STREAM_AI_RESPONSES: bool = True  # Send follow-ups as ai_response_delta frames
+    WS_SPECULATIVE_QUESTIONS: bool = False  # Pre-generate easier/same/harder next questions while the candidate answers
+    WS_TURN_MODE: str = "fused"  # "fused" scores and picks the follow-up in one LLM call, "two_step" uses two
+    WS_AUDIO_MAX_BYTES: int = 25 * 1024 * 1024  # Largest binary audio upload per answer (Whisper's limit)
+    WS_AUDIO_FORMATS: List[str] = ["wav", "webm", "ogg", "mp3", "mp4", "m4a", "mpeg", "mpga", "flac"]
+    # Streaming audio (audio_stream_start + 16-bit mono PCM chunks, segmented server-side)
+    WS_STREAM_SAMPLE_RATES: List[int] = [8000, 16000, 24000, 48000]
+    WS_STREAM_MAX_SECONDS: float = 300.0  # Preallocated buffer length; a full buffer ends the answer
+    WS_STREAM_FRAME_MS: int = 20  # Energy analysis frame
+    WS_STREAM_MIN_RMS: float = 300.0  # Frames quieter than this (int16 RMS) are never speech
+    WS_STREAM_SPEECH_RATIO: float = 3.0  # Speech is this many times louder than the noise floor
+    WS_STREAM_SEGMENT_PAUSE_SECONDS: float = 0.5  # Pause that closes a segment for transcription
+    WS_STREAM_SEGMENT_MIN_SECONDS: float = 1.0  # Speech needed before a pause closes a segment
+    WS_STREAM_SEGMENT_MAX_SECONDS: float = 15.0  # Segments are cut here even without a pause
+    WS_STREAM_END_SILENCE_SECONDS: float = 1.5  # Silence after speech that ends the answer
+    # Inbound processing (each socket's messages run on its own worker so the receive loop keeps reading)
+    WS_INBOUND_QUEUE_SIZE: int = 32  # Queued messages per socket; further messages are rejected
+    WS_BACKPRESSURE_HIGH_WATERMARK: int = 24  # Queue depth that sends backpressure "pause"
+    WS_BACKPRESSURE_LOW_WATERMARK: int = 8  # Queue depth that sends backpressure "resume"
+    WS_CANCEL_SUPERSEDED_TURNS: bool = True  # A new answer cancels the turn still being processed
+    WS_MAX_INFLIGHT_TURNS_PER_INTERVIEW: int = 2  # Turns processed at once across an interview's sockets
+    
     # File Storage
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
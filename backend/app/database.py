@@ -60,10 +60,19 @@ async def init_db():
     """Initialize database tables"""
     try:
         # Import all models here to ensure they're registered
-        from app.models import user, candidate, interview, question, response, score
+        from app.models import user, candidate, interview, question, response, score, llm_cache, score_aggregate, job, resume_analysis, question_bank
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        
+        # create_all skips tables that already exist, so add indexes introduced later explicitly
+        try:
+            from app.models.job import Job
+            for index in Job.__table__.indexes:
+                if index.name == "uq_jobs_active_dedupe_key":
+                    index.create(bind=engine, checkfirst=True)
+        except Exception as e:
+            print(f"⚠️ Could not create the active job dedupe index (duplicate active jobs?): {e}")
         print("✅ Database initialized successfully")
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
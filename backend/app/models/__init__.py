@@ -5,3 +5,8 @@ from .interview import Interview, InterviewStatus, InterviewType
 from .question import Question, QuestionType, QuestionDifficulty
 from .response import Response
 from .score import Score
+from .llm_cache import LLMCacheEntry
+from .score_aggregate import InterviewScoreAggregate
+from .job import Job, JobStatus
+from .resume_analysis import ResumeAnalysisRecord
+from .question_bank import QuestionBankEntry
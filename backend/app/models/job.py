@@ -0,0 +1,75 @@
+"""
+Job model for the database-backed background job queue
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class JobStatus:
+    """Job lifecycle states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"  # Failed on every attempt
+
+
+class Job(Base):
+    """A unit of background work claimed by queue workers with SKIP LOCKED"""
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=True)
+
+    # Identical work already queued or running is reused instead of enqueued twice
+    dedupe_key = Column(String(200), nullable=True, index=True)
+
+    # Execution state
+    status = Column(String(20), nullable=False, default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(100), nullable=True)
+
+    # Progress and outcome
+    progress = Column(String(500), nullable=True)
+    result = Column(JSON, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers scan for due jobs by status and run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        # At most one queued or running job per dedupe_key, so concurrent enqueues cannot both insert
+        Index(
+            "uq_jobs_active_dedupe_key", "dedupe_key", unique=True,
+            postgresql_where=status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+            sqlite_where=status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.last_error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "completed_at": self.completed_at
+        }
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, job_type='{self.job_type}', status='{self.status}')>"
@@ -0,0 +1,28 @@
+"""
+LLM cache model for persisted completion results
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class LLMCacheEntry(Base):
+    """Persistent tier of the content-addressed LLM response cache"""
+    
+    __tablename__ = "llm_cache_entries"
+    
+    # SHA-256 of model, messages and sampling parameters
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    
+    # Cached completion text
+    response_text = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0)
+    
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<LLMCacheEntry(key='{self.key[:12]}', model='{self.model}')>"
@@ -0,0 +1,45 @@
+"""
+Question bank model for pre-generated interview questions
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class QuestionBankEntry(Base):
+    """A pre-generated question in the pool for a role focus, difficulty and question type"""
+
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        # Pool reads filter on all three columns
+        Index("ix_question_bank_pool", "role_focus", "difficulty", "question_type"),
+        UniqueConstraint("role_focus", "question_hash", name="uq_question_bank_role_focus_question_hash"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    role_focus = Column(String(100), nullable=False)  # Normalized (lowercase)
+    difficulty = Column(String(20), nullable=False)
+    question_type = Column(String(50), nullable=False)
+
+    question = Column(Text, nullable=False)
+    # SHA-256 of the normalized question text, so refreshes do not store duplicates
+    question_hash = Column(String(64), nullable=False)
+    skills_tested = Column(JSON, nullable=True)
+    expected_answer_points = Column(JSON, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "question": self.question,
+            "question_type": self.question_type,
+            "difficulty": self.difficulty,
+            "skills_tested": self.skills_tested or [],
+            "expected_answer_points": self.expected_answer_points or []
+        }
+
+    def __repr__(self):
+        return f"<QuestionBankEntry(id={self.id}, role_focus='{self.role_focus}', difficulty='{self.difficulty}')>"
@@ -0,0 +1,34 @@
+"""
+Resume analysis model for deduplicating repeat resume extractions
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ResumeAnalysisRecord(Base):
+    """Stored extraction result for a resume, keyed by normalized text hash and role focus"""
+
+    __tablename__ = "resume_analyses"
+    __table_args__ = (
+        UniqueConstraint("text_hash", "role_focus", name="uq_resume_analyses_text_hash_role_focus"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # SHA-256 of the normalized resume text
+    text_hash = Column(String(64), nullable=False)
+    role_focus = Column(String(100), nullable=False)
+
+    # Extraction result (ResumeAnalysis fields)
+    analysis = Column(JSON, nullable=False)
+    model = Column(String(100), nullable=True)
+    hit_count = Column(Integer, default=0)
+
+    # Metadata
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ResumeAnalysisRecord(text_hash='{self.text_hash[:12]}', role_focus='{self.role_focus}')>"
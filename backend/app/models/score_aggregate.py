@@ -0,0 +1,93 @@
+"""
+Running per-interview score aggregates, maintained as responses are scored
+"""
+
+import math
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+# Rubric dimensions tracked in the aggregate (0-10 scale)
+SCORE_DIMENSIONS = (
+    "technical_accuracy",
+    "communication_clarity",
+    "problem_solving_approach",
+    "relevance_to_question",
+    "professional_experience",
+    "overall_score",
+)
+
+
+class InterviewScoreAggregate(Base):
+    """Count, sum and sum of squares of each response score dimension for an interview"""
+
+    __tablename__ = "interview_score_aggregates"
+
+    interview_id = Column(Integer, ForeignKey("interviews.id"), primary_key=True)
+    response_count = Column(Integer, nullable=False, default=0)
+
+    technical_accuracy_sum = Column(Float, nullable=False, default=0.0)
+    technical_accuracy_sq_sum = Column(Float, nullable=False, default=0.0)
+    communication_clarity_sum = Column(Float, nullable=False, default=0.0)
+    communication_clarity_sq_sum = Column(Float, nullable=False, default=0.0)
+    problem_solving_approach_sum = Column(Float, nullable=False, default=0.0)
+    problem_solving_approach_sq_sum = Column(Float, nullable=False, default=0.0)
+    relevance_to_question_sum = Column(Float, nullable=False, default=0.0)
+    relevance_to_question_sq_sum = Column(Float, nullable=False, default=0.0)
+    professional_experience_sum = Column(Float, nullable=False, default=0.0)
+    professional_experience_sq_sum = Column(Float, nullable=False, default=0.0)
+    overall_score_sum = Column(Float, nullable=False, default=0.0)
+    overall_score_sq_sum = Column(Float, nullable=False, default=0.0)
+
+    # Metadata
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def reset(self):
+        self.response_count = 0
+        for dimension in SCORE_DIMENSIONS:
+            setattr(self, f"{dimension}_sum", 0.0)
+            setattr(self, f"{dimension}_sq_sum", 0.0)
+
+    def add(self, analysis: Dict[str, Any], weight: int = 1):
+        """Add (weight=1) or remove (weight=-1) one response analysis"""
+        self.response_count = (self.response_count or 0) + weight
+        for dimension in SCORE_DIMENSIONS:
+            value = float(analysis.get(dimension, 0) or 0)
+            setattr(self, f"{dimension}_sum", (getattr(self, f"{dimension}_sum") or 0.0) + weight * value)
+            setattr(self, f"{dimension}_sq_sum", (getattr(self, f"{dimension}_sq_sum") or 0.0) + weight * value * value)
+
+    def totals(self, extra: Iterable[Dict[str, Any]] = ()) -> Dict[str, float]:
+        """Per-dimension sums and the response count, including analyses not stored in the aggregate"""
+        totals = {dimension: getattr(self, f"{dimension}_sum") or 0.0 for dimension in SCORE_DIMENSIONS}
+        totals["count"] = self.response_count or 0
+        for analysis in extra:
+            totals["count"] += 1
+            for dimension in SCORE_DIMENSIONS:
+                totals[dimension] += float(analysis.get(dimension, 0) or 0)
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mean and standard deviation of each dimension (0-10 scale)"""
+        count = self.response_count or 0
+        dimensions = {}
+        for dimension in SCORE_DIMENSIONS:
+            total = getattr(self, f"{dimension}_sum") or 0.0
+            mean = total / count if count else 0.0
+            variance = (getattr(self, f"{dimension}_sq_sum") or 0.0) / count - mean * mean if count else 0.0
+            dimensions[dimension] = {
+                "mean": round(mean, 2),
+                "stddev": round(math.sqrt(max(variance, 0.0)), 2)
+            }
+        return {
+            "interview_id": self.interview_id,
+            "response_count": count,
+            "dimensions": dimensions,
+            "progress_score": round(dimensions["overall_score"]["mean"] * 10, 1),  # 0-100 scale
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f"<InterviewScoreAggregate(interview_id={self.interview_id}, response_count={self.response_count})>"
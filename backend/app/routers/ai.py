@@ -13,11 +13,22 @@ import tempfile
 from datetime import datetime
 
 from app.database import get_db
+from app.core.config import settings
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service
 from app.services.pinecone_service import PineconeService
 from app.services.tts_service import tts_service
+from app.services.llm_cache import llm_cache
+from app.services.llm_resilience import llm_resilience
+from app.services.model_router import model_router
+from app.services.rate_limiter import rate_limiter
+from app.services.heuristic_scorer import average_scores
+from app.services.local_scorer import local_scorer
+from app.services.question_bank import (
+    BANK_DIFFICULTIES, BANK_QUESTION_TYPES, sample_questions, refill_pool, enqueue_refresh, refresh_dedupe_key
+)
+from app.services.job_queue import job_queue
 
 router = APIRouter()
 
@@ -52,10 +63,17 @@ class StoreQuestionsRequest(BaseModel):
 @router.post("/analyze-resume")
 async def analyze_resume(
     request: dict,
+    background: bool = False,
+    reanalyze: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
-    """Analyze resume and extract candidate information using AI"""
+    """Analyze resume and extract candidate information using AI
+    
+    Repeat uploads of the same resume return the stored analysis; pass
+    reanalyze=true to run the extraction again.
+    """
     try:
         resume_text = request.get("resume_text", "")
         role_focus = request.get("role_focus", "General")
@@ -63,7 +81,12 @@ async def analyze_resume(
         if not resume_text:
             raise HTTPException(status_code=400, detail="Resume text is required")
         
-        ai_service = AIService()
+        # Queue the analysis; the result is read from /api/jobs/{job_id}
+        if background:
+            job = await job_queue.enqueue(
+                "resume_analysis", {"resume_text": resume_text, "role_focus": role_focus, "reanalyze": reanalyze}
+            )
+            return {"message": "Resume analysis queued", "job_id": job["job_id"], "status": job["status"]}
         
         # Create AI prompt for resume analysis
         prompt = f"""
@@ -92,7 +115,7 @@ async def analyze_resume(
         """
         
         # Use AI service to analyze resume
-        analysis = await ai_service.analyze_resume_text(resume_text, role_focus)
+        analysis = await ai_service.analyze_resume_text(resume_text, role_focus, reanalyze=reanalyze)
         
         return analysis
         
@@ -111,12 +134,11 @@ class QuestionGenerateRequest(BaseModel):
 async def generate_questions(
     request: QuestionGenerateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Generate interview questions based on candidate profile"""
     try:
-        ai_service = AIService()
-        
         # Get candidate information
         from app.models.candidate import Candidate
         candidate = db.query(Candidate).filter(Candidate.id == request.candidate_id).first()
@@ -148,12 +170,11 @@ async def generate_questions(
 async def analyze_response(
     request: ResponseAnalyzeRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Analyze candidate response to a question"""
     try:
-        ai_service = AIService()
-        
         # Analyze the response
         analysis = await ai_service.analyze_response(request.interview_id, request.response_text)
         
@@ -174,12 +195,11 @@ async def analyze_response(
 async def transcribe_audio(
     audio_file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Transcribe audio file using Whisper"""
     try:
-        ai_service = AIService()
-        
         # Read audio file
         audio_content = await audio_file.read()
         
@@ -205,12 +225,11 @@ async def transcribe_audio(
 async def generate_feedback(
     request: FeedbackGenerateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Generate comprehensive interview feedback"""
     try:
-        ai_service = AIService()
-        
         # Get interview data
         from app.models.interview import Interview
         interview = db.query(Interview).filter(Interview.id == request.interview_id).first()
@@ -236,12 +255,11 @@ async def generate_feedback(
 async def score_interview(
     request: ScoreInterviewRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Score an interview using AI"""
     try:
-        ai_service = AIService()
-        
         # Get interview data
         from app.models.interview import Interview
         interview = db.query(Interview).filter(Interview.id == request.interview_id).first()
@@ -267,12 +285,11 @@ async def score_interview(
 async def store_response(
     request: StoreResponseRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Store individual candidate response with AI analysis"""
     try:
-        ai_service = AIService()
-        
         # Get question context for better analysis
         from app.models.question import Question
         question = db.query(Question).filter(Question.id == request.question_id).first()
@@ -288,7 +305,8 @@ async def store_response(
             request.interview_id, 
             request.response_text, 
             question_context, 
-            role_focus
+            role_focus,
+            expected_points=question.expected_answer_points if question else None
         )
         
         # Create response record
@@ -313,6 +331,11 @@ async def store_response(
         )
         
         db.add(response_record)
+        
+        # Update the running score aggregate in the same transaction
+        from app.services.score_aggregates import record_analysis
+        record_analysis(db, request.interview_id, analysis)
+        
         db.commit()
         db.refresh(response_record)
         
@@ -459,13 +482,11 @@ async def debug_interview(
 @router.post("/create-scores/{interview_id}")
 async def create_scores(
     interview_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Manually create scores for an interview"""
     try:
-        from app.services.ai_service import AIService
-        ai_service = AIService()
-        
         print(f"🔄 Manual score creation for interview {interview_id}")
         
         # Generate comprehensive final analysis
@@ -523,75 +544,16 @@ async def test_analysis(
         from app.models.response import Response
         responses = db.query(Response).filter(Response.interview_id == interview_id).all()
         
-        # Initialize scores
-        technical_score = 0
-        communication_score = 0
-        problem_solving_score = 0
-        cultural_fit_score = 0
-        relevance_score = 0
-        experience_score = 0
-        response_count = 0
-        
-        # Calculate scores from individual responses
-        for response in responses:
-            if response.text_response:
-                content = response.text_response.lower()
-                word_count = len(content.split())
-                
-                # Technical score based on technical keywords
-                if any(word in content for word in ['data', 'analysis', 'python', 'sql', 'visualization', 'statistics', 'machine learning', 'algorithm']):
-                    technical_score += 7.0
-                else:
-                    technical_score += 5.0
-                
-                # Communication score based on response length and clarity
-                if word_count > 20:
-                    communication_score += 7.0
-                elif word_count > 10:
-                    communication_score += 6.0
-                else:
-                    communication_score += 5.0
-                
-                # Problem solving based on structured responses
-                if any(word in content for word in ['step', 'process', 'approach', 'solution', 'method']):
-                    problem_solving_score += 7.0
-                else:
-                    problem_solving_score += 5.0
-                
-                # Cultural fit based on collaboration mentions
-                if any(word in content for word in ['team', 'collaborate', 'work together', 'help', 'support']):
-                    cultural_fit_score += 7.0
-                elif any(word in content for word in ['project', 'work', 'experience', 'learn', 'develop']):
-                    cultural_fit_score += 6.0  # Professional engagement
-                else:
-                    cultural_fit_score += 5.0
-                
-                # Relevance score based on how well response addresses the question
-                if any(word in content for word in ['because', 'therefore', 'however', 'specifically', 'example', 'instance']):
-                    relevance_score += 7.0  # Shows direct addressing of question
-                elif word_count > 15:  # Substantial response
-                    relevance_score += 6.0
-                else:
-                    relevance_score += 5.0
-                
-                # Experience score based on professional/academic experience mentions
-                if any(word in content for word in ['internship', 'project', 'work', 'experience', 'previous', 'before', 'studied', 'learned']):
-                    experience_score += 7.0
-                elif any(word in content for word in ['course', 'class', 'training', 'certification']):
-                    experience_score += 6.0
-                else:
-                    experience_score += 5.0
-                
-                response_count += 1
-        
-        # Calculate average scores (convert to 0-100 scale)
+        # Score responses with the keyword heuristic (averages on the 0-100 scale)
+        response_count, averages = average_scores(response.text_response for response in responses)
+        
         if response_count > 0:
-            technical_score = (technical_score / response_count) * 10  # Convert to 0-100 scale
-            communication_score = (communication_score / response_count) * 10  # Convert to 0-100 scale
-            problem_solving_score = (problem_solving_score / response_count) * 10  # Convert to 0-100 scale
-            cultural_fit_score = (cultural_fit_score / response_count) * 10  # Convert to 0-100 scale
-            relevance_score = (relevance_score / response_count) * 10  # Convert to 0-100 scale
-            experience_score = (experience_score / response_count) * 10  # Convert to 0-100 scale
+            technical_score = averages['technical']
+            communication_score = averages['communication']
+            problem_solving_score = averages['problem_solving']
+            cultural_fit_score = averages['cultural_fit']
+            relevance_score = averages['relevance']
+            experience_score = averages['experience']
         else:
             # Use interview scores if available, otherwise default to 0
             technical_score = interview.scores_breakdown.get('technical', 0) if interview.scores_breakdown else 0
@@ -656,8 +618,11 @@ async def test_analysis(
 @router.post("/regenerate-analysis/{interview_id}")
 async def regenerate_analysis(
     interview_id: int,
+    rescore_responses: bool = False,
+    background: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Regenerate analysis for an existing interview"""
     try:
@@ -673,11 +638,20 @@ async def regenerate_analysis(
         
         print(f"✅ Interview found: {interview.title}")
         
-        ai_service = AIService()
+        if background:
+            job = await job_queue.enqueue(
+                "final_analysis",
+                {"interview_id": interview_id, "rescore_responses": rescore_responses},
+                dedupe_key=f"final_analysis:{interview_id}{':rescore' if rescore_responses else ''}"
+            )
+            return {
+                "message": "Analysis regeneration queued",
+                "data": {"interview_id": interview_id, "job_id": job["job_id"], "status": job["status"]}
+            }
         
         # Generate comprehensive final analysis
-        print(f"🔄 Starting AI analysis for interview {interview_id}")
-        final_analysis = await ai_service.generate_final_analysis(str(interview_id))
+        print(f"🔄 Starting AI analysis for interview {interview_id} (rescore_responses={rescore_responses})")
+        final_analysis = await ai_service.generate_final_analysis(str(interview_id), rescore_responses=rescore_responses)
         
         print(f"✅ AI analysis completed for interview {interview_id}")
         
@@ -703,15 +677,53 @@ async def regenerate_analysis(
         print(f"❌ Full traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Analysis regeneration failed: {str(e)}")
 
+@router.post("/rescore-responses/{interview_id}")
+async def rescore_responses(
+    interview_id: int,
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """Re-score all stored responses of an interview in batched LLM requests"""
+    try:
+        result = await ai_service.rescore_responses(str(interview_id))
+        
+        return {
+            "message": "Responses re-scored successfully",
+            "data": result
+        }
+    
+    except Exception as e:
+        print(f"❌ Response re-scoring failed for interview {interview_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Response re-scoring failed: {str(e)}")
+
+@router.get("/interview-progress/{interview_id}")
+async def get_interview_progress(
+    interview_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the running score averages of an interview from its score aggregate"""
+    try:
+        from app.services.score_aggregates import get_aggregate
+        aggregate = get_aggregate(db, interview_id)
+        db.commit()
+        
+        return {
+            "message": "Interview progress retrieved successfully",
+            "data": aggregate.to_dict()
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Interview progress retrieval failed: {str(e)}")
+
 @router.post("/generate-adaptive-question")
 async def generate_adaptive_question(
     request: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Generate adaptive follow-up question based on previous response"""
     try:
-        ai_service = AIService()
-        
         # Extract request parameters
         interview_id = request.get('interview_id')
         previous_response = request.get('previous_response')
@@ -871,24 +883,32 @@ async def get_question_bank(
     question_type: Optional[str] = None,
     limit: int = 20,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
-    """Get question bank for specific role and difficulty using AI"""
+    """Get a random sample of pre-generated questions for a role and difficulty"""
+    # Unknown values would start new pools that the refresh loop then keeps filling
+    if difficulty not in BANK_DIFFICULTIES:
+        raise HTTPException(status_code=422, detail=f"difficulty must be one of: {', '.join(BANK_DIFFICULTIES)}")
+    if question_type is not None and question_type not in BANK_QUESTION_TYPES:
+        raise HTTPException(status_code=422, detail=f"question_type must be one of: {', '.join(BANK_QUESTION_TYPES)}")
+    
     try:
-        ai_service = AIService()
-        
-        # Generate questions using AI
-        questions = await ai_service.generate_questions_from_resume(
-            resume_text=f"Role: {role_focus}, Difficulty: {difficulty}",
-            role_focus=role_focus
-        )
-        
-        # Filter by question type if specified
-        if question_type:
-            questions = [q for q in questions if q.get("question_type") == question_type]
+        questions = sample_questions(db, role_focus, difficulty, question_type, limit)
+        
+        if not questions:
+            # Cold pool: generate one batch inline so the first request is not empty
+            print(f"📚 Question bank empty for {role_focus}/{difficulty}, generating a first batch")
+            await ai_service.single_flight.run(
+                f"{refresh_dedupe_key(role_focus, difficulty)}:{question_type or 'all'}",
+                lambda: refill_pool(ai_service, role_focus, difficulty,
+                                    question_types=[question_type] if question_type else None, max_batches=1)
+            )
+            questions = sample_questions(db, role_focus, difficulty, question_type, limit)
         
-        # Limit results
-        questions = questions[:limit]
+        # Top the pool up in the background once it cannot fill a page
+        if len(questions) < limit and settings.JOB_QUEUE_ENABLED:
+            await enqueue_refresh(job_queue, role_focus, difficulty)
         
         return {
             "message": "Question bank retrieved successfully",
@@ -980,6 +1000,79 @@ async def clear_tts_cache(
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
 
 
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get LLM response cache hit/miss statistics"""
+    try:
+        return llm_cache.get_stats()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get cache stats: {str(e)}")
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache(
+    current_user: User = Depends(get_current_user)
+):
+    """Clear LLM response cache"""
+    try:
+        await llm_cache.clear()
+        return {"message": "LLM cache cleared successfully"}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
+
+
+@router.get("/llm-resilience/stats")
+async def get_llm_resilience_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get retry, hedging and circuit breaker counters for OpenAI calls"""
+    try:
+        return llm_resilience.get_stats()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get resilience stats: {str(e)}")
+
+
+@router.get("/rate-limits/stats")
+async def get_rate_limit_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get OpenAI rate limiter reservations, throttling and 429 counters"""
+    try:
+        return rate_limiter.get_stats()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get rate limit stats: {str(e)}")
+
+
+@router.get("/local-scorer/stats")
+async def get_local_scorer_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get how many responses the local scorer handled and how many it escalated to the LLM"""
+    try:
+        return local_scorer.get_stats()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get local scorer stats: {str(e)}")
+
+
+@router.get("/model-routing/stats")
+async def get_model_routing_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get model tier routes, SLO fallbacks in effect and per-tier call counts"""
+    try:
+        return model_router.get_stats()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get model routing stats: {str(e)}")
+
+
 @router.post("/extract-pdf-text")
 async def extract_pdf_text(
     file: UploadFile = File(...),
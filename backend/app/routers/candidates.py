@@ -12,7 +12,6 @@ from app.database import get_db
 from app.models.candidate import Candidate
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.services.ai_service import AIService
 
 router = APIRouter()
 
@@ -161,7 +160,6 @@ async def upload_resume(
         db.commit()
         
         # Analyze resume using AI (simplified for now)
-        ai_service = AIService()
         # In a real implementation, you would extract text from the resume file
         # and then analyze it using the AI service
         
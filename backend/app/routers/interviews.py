@@ -13,6 +13,9 @@ from app.models.interview import Interview, InterviewStatus, InterviewType
 from app.models.candidate import Candidate
 from app.models.user import User
 from app.routers.auth import get_current_user
+from app.core.config import settings
+from app.services.ai_service import AIService, get_ai_service
+from app.services.job_queue import job_queue
 
 router = APIRouter()
 
@@ -205,7 +208,8 @@ async def complete_interview(
     interview_id: int,
     request: CompleteInterviewRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Complete an interview and generate final analysis"""
     interview = db.query(Interview).filter(Interview.id == interview_id).first()
@@ -233,11 +237,24 @@ async def complete_interview(
     db.commit()
     db.refresh(interview)
     
+    # Hand the final analysis to the job queue and return straight away
+    if settings.JOB_QUEUE_ENABLED:
+        job = await job_queue.enqueue(
+            "final_analysis",
+            {"interview_id": interview.id},
+            dedupe_key=f"final_analysis:{interview.id}"
+        )
+        return {
+            "message": "Interview completed successfully",
+            "interview_id": interview.id,
+            "status": interview.status,
+            "completed_at": interview.completed_at,
+            "analysis_job_id": job["job_id"],
+            "analysis_status": job["status"]
+        }
+    
     # Generate final analysis and scoring
     try:
-        from app.services.ai_service import AIService
-        ai_service = AIService()
-        
         print(f"🔄 Starting final analysis for interview {interview_id}")
         
         # Generate comprehensive final analysis
@@ -295,7 +312,8 @@ async def cancel_interview(
 async def get_interview_report(
     interview_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Get interview report with scoring and feedback"""
     interview = db.query(Interview).filter(Interview.id == interview_id).first()
@@ -305,9 +323,6 @@ async def get_interview_report(
     # Generate analysis if interview is completed but has no scores
     if interview.status == InterviewStatus.COMPLETED and (not interview.overall_score or interview.overall_score == 0):
         try:
-            from app.services.ai_service import AIService
-            ai_service = AIService()
-            
             # Generate comprehensive final analysis
             final_analysis = await ai_service.generate_final_analysis(str(interview_id))
             
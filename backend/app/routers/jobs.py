@@ -0,0 +1,29 @@
+"""
+Jobs router for background job status
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.models.user import User
+from app.routers.auth import get_current_user
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status, progress and result of a background job"""
+    job = await asyncio.to_thread(job_queue.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "message": "Job retrieved successfully",
+        "data": job
+    }
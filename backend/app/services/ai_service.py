@@ -2,67 +2,266 @@
 AI Service for handling OpenAI interactions and interview logic
 """
 
-import openai
-from typing import Dict, List, Any, Optional
+from fastapi import Request
+from typing import Dict, List, Any, Optional, AsyncIterator, Type, TypeVar
+from pydantic import ValidationError
+import asyncio
 import json
 import base64
 from app.core.config import settings
+from app.services.openai_client import get_openai_client, get_openai_semaphore, close_openai_client
+from app.services.llm_cache import llm_cache
+from app.services.llm_resilience import llm_resilience
+from app.services.model_router import model_router
+from app.services.rate_limiter import rate_limiter, estimate_chat_tokens
+from app.services.single_flight import SingleFlight, advisory_lock
+from app.services.stream_sections import SectionStreamParser
+from app.services.prompt_budget import ConversationPromptBuilder
+from app.services.heuristic_scorer import average_scores
+from app.services.local_scorer import local_scorer
+from app.services.resume_analysis_store import resume_text_hash, normalize_role_focus, get_stored_analysis, store_analysis
+from app.services.score_aggregates import record_analysis, get_aggregate, is_scored
+from app.services.llm_schemas import (
+    LLMSchema, LLMOutputError, ResponseAnalysis, BatchResponseAnalysis, NextAction,
+    GeneratedQuestion, AdaptiveQuestion, QuestionList, FinalAnalysis, ResumeAnalysis
+)
 from app.services.pinecone_service import PineconeService
 
+SchemaT = TypeVar("SchemaT", bound=LLMSchema)
+
+# Separates streamed spoken content from the trailing structured action JSON
+ACTION_MARKER = "###ACTION###"
+# Separates the leading rubric JSON from the spoken content in a fused turn
+RESPONSE_MARKER = "###RESPONSE###"
+
+SCORING_RUBRIC = """Evaluate the response on multiple dimensions (0-10 each):
+            1. Technical Accuracy: How technically correct and accurate is the response?
+            2. Communication Clarity: How clear and well-structured is the communication?
+            3. Depth of Knowledge: How deep and comprehensive is the knowledge demonstrated?
+            4. Problem-Solving Approach: How logical and effective is the problem-solving approach?
+            5. Relevance to Question: How well does the response address the specific question?
+            6. Professional Experience: How well does the response demonstrate relevant experience?
+            
+            Scoring Guidelines:
+            - 9-10: Exceptional response, exceeds expectations
+            - 7-8: Good response, meets expectations
+            - 5-6: Average response, partially meets expectations
+            - 3-4: Below average response, needs improvement
+            - 1-2: Poor response, significantly below expectations
+            - 0: No response or completely irrelevant"""
+
+DEFAULT_NEXT_ACTION = {
+    "action_type": "next_question",
+    "content": "Thank you for that response. Let's move on to the next question.",
+    "difficulty_adjustment": "same",
+    "reasoning": "Default action due to processing error"
+}
+
+
+class FusedTurnError(Exception):
+    """The fused turn failed before any analysis was produced; use the two-step path"""
+
 
 class AIService:
     """Service for AI-powered interview functionality"""
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.pinecone_service = PineconeService()
+    def __init__(self, pinecone_service: Optional[PineconeService] = None):
+        self.client = get_openai_client()
+        self.llm_semaphore = get_openai_semaphore()
+        self.cache = llm_cache
+        self.resilience = llm_resilience
+        self.models = model_router
+        self.rate_limiter = rate_limiter
+        self.single_flight = SingleFlight()
+        self.pinecone_service = pinecone_service or PineconeService()
+    
+    async def warm_up(self):
+        """Open a pooled connection to OpenAI before the first real request"""
+        try:
+            await self.client.models.retrieve(settings.OPENAI_MODEL)
+            print("✅ OpenAI connection pool warmed up")
+        except Exception as e:
+            print(f"⚠️ OpenAI warm-up failed: {e}")
+    
+    async def aclose(self):
+        """Release the shared OpenAI connection pool"""
+        await close_openai_client()
+    
+    async def _call(self, operation: str, factory, limit_key: str, tokens: int = 0, hedge: bool = False):
+        """Run an OpenAI request through the resilience layer and rate limiter
+        
+        factory returns a raw response (with_raw_response) so the limiter can read
+        the x-ratelimit-* headers. Each attempt takes one concurrency slot.
+        """
+        async def send():
+            async with self.llm_semaphore:
+                return await factory()
+        
+        async def attempt():
+            return await self.rate_limiter.call(limit_key, tokens, send)
+        return await self.resilience.call(operation, attempt, hedge=hedge)
+    
+    def _route(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Pop the operation name from kwargs and fill in the model routed for it"""
+        operation = kwargs.pop("operation", None)
+        if "model" not in kwargs:
+            kwargs["model"] = self.models.model_for(operation)
+        return operation
+    
+    async def _chat(self, **kwargs):
+        """Run a chat completion with retries, hedging and circuit breaking"""
+        operation = self._route(kwargs)
+        started = asyncio.get_running_loop().time()
+        response = await self._call(
+            "chat", lambda: self.client.chat.completions.with_raw_response.create(**kwargs),
+            limit_key=kwargs["model"], tokens=estimate_chat_tokens(kwargs), hedge=True
+        )
+        self.models.record(operation, kwargs["model"], asyncio.get_running_loop().time() - started)
+        return response
+    
+    async def _stream(self, **kwargs) -> AsyncIterator[str]:
+        """Stream a chat completion's text deltas under the per-process concurrency limit
+        
+        Opening the stream is retried; once deltas have been yielded it is not.
+        """
+        operation = self._route(kwargs)
+        started = asyncio.get_running_loop().time()
+        held = False
+        
+        # Like _call, the slot is taken only after the rate limiter admits the request,
+        # but it is kept until the stream has been read
+        async def send():
+            nonlocal held
+            if held:
+                # An earlier attempt opened a stream that was then discarded
+                self.llm_semaphore.release()
+                held = False
+            await self.llm_semaphore.acquire()
+            try:
+                response = await self.client.chat.completions.with_raw_response.create(stream=True, **kwargs)
+            except BaseException:
+                self.llm_semaphore.release()
+                raise
+            held = True
+            return response
+        
+        try:
+            stream = await self.resilience.call("chat_stream", lambda: self.rate_limiter.call(
+                kwargs["model"], estimate_chat_tokens(kwargs), send
+            ))
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            if held:
+                self.llm_semaphore.release()
+        self.models.record(operation, kwargs["model"], asyncio.get_running_loop().time() - started)
+    
+    def _cache_key(self, kwargs: Dict[str, Any]) -> str:
+        params = {k: v for k, v in kwargs.items() if k not in ("model", "messages")}
+        return self.cache.make_key(kwargs["model"], kwargs["messages"], **params)
+    
+    async def _complete(self, cache: bool = False, **kwargs) -> str:
+        """Run a chat completion and return its text, using the LLM cache for deterministic prompts"""
+        operation = self._route(kwargs)
+        use_cache = cache and settings.LLM_CACHE_ENABLED
+        if use_cache:
+            cache_key = self._cache_key(kwargs)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit ({cache_key[:12]})")
+                return cached
+        
+        response = await self._chat(operation=operation, **kwargs)
+        content = (response.choices[0].message.content or "").strip()
+        
+        if use_cache and content:
+            await self.cache.set(cache_key, kwargs["model"], content)
+        return content
+    
+    async def _complete_json(self, schema: Type[SchemaT], cache: bool = False, **kwargs) -> SchemaT:
+        """Run a JSON-mode completion and validate it against schema
+        
+        Output that fails validation is sent back to the model with the validation
+        errors, up to LLM_JSON_MAX_RETRIES times. Only valid output is cached.
+        """
+        operation = self._route(kwargs)
+        kwargs["response_format"] = {"type": "json_object"}
+        use_cache = cache and settings.LLM_CACHE_ENABLED
+        if use_cache:
+            cache_key = self._cache_key(kwargs)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return schema.model_validate_json(cached)
+                except ValidationError:
+                    print(f"⚠️ Cached {schema.__name__} output no longer validates, regenerating")
+        
+        messages = list(kwargs.pop("messages"))
+        for attempt in range(settings.LLM_JSON_MAX_RETRIES + 1):
+            content = await self._complete(operation=operation, messages=messages, **kwargs)
+            try:
+                result = schema.model_validate_json(content)
+            except ValidationError as e:
+                print(f"⚠️ {schema.__name__} validation failed (attempt {attempt + 1}): {e.error_count()} errors")
+                errors = e
+                messages = messages + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": f"That JSON did not match the required format: {e}. Return the corrected JSON object only."}
+                ]
+                continue
+            
+            if use_cache:
+                await self.cache.set(cache_key, kwargs["model"], content)
+            return result
+        
+        raise LLMOutputError(f"{schema.__name__} output invalid after {settings.LLM_JSON_MAX_RETRIES + 1} attempts: {errors}")
     
     async def transcribe_audio(self, audio_data: str) -> str:
-        """Transcribe audio data using OpenAI Whisper"""
+        """Transcribe base64-encoded audio data using OpenAI Whisper"""
         try:
             # Decode base64 audio data
             audio_bytes = base64.b64decode(audio_data)
-            
-            # Create temporary file for transcription
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_file.flush()
-                
-                # Transcribe using Whisper
-                with open(temp_file.name, "rb") as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
-                        model=settings.WHISPER_MODEL,
-                        file=audio_file,
-                        response_format="text"
-                    )
-                
-                return transcription.strip()
+        except Exception as e:
+            print(f"❌ Transcription error: {e}")
+            raise Exception(f"Transcription failed: {str(e)}")
+        
+        return await self.transcribe_audio_bytes(audio_bytes)
+    
+    async def transcribe_audio_bytes(self, audio_bytes: bytes, audio_format: str = "wav") -> str:
+        """Transcribe raw audio using OpenAI Whisper; audio_format is the container extension (wav, webm, ...)"""
+        try:
+            # Transcribe using Whisper (upload from memory, no temp file)
+            transcription = await self._call("transcription", lambda: self.client.audio.transcriptions.with_raw_response.create(
+                model=settings.WHISPER_MODEL,
+                file=(f"audio.{audio_format}", audio_bytes),
+                response_format="text"
+            ), limit_key=settings.WHISPER_MODEL)
+            
+            return transcription.strip()
         
         except Exception as e:
             print(f"❌ Transcription error: {e}")
             raise Exception(f"Transcription failed: {str(e)}")
     
-    async def analyze_response(self, interview_id: str, response_text: str, question_context: str = None, role_focus: str = None) -> Dict[str, Any]:
-        """Analyze candidate response using GPT-4o with comprehensive scoring"""
+    async def analyze_response(self, interview_id: str, response_text: str, question_context: str = None, role_focus: str = None,
+                               expected_points: List[str] = None) -> Dict[str, Any]:
+        """Analyze candidate response with comprehensive scoring
+        
+        The local scorer answers first; GPT-4o is only asked when it is not confident.
+        """
+        local = None
         try:
             print(f"🔍 Analyzing response for interview {interview_id}: '{response_text[:100]}...'")
             
             # Get interview context for better analysis
-            from app.database import get_db
-            from app.models.interview import Interview
-            from app.models.question import Question
-            
-            db = next(get_db())
-            interview = db.query(Interview).filter(Interview.id == interview_id).first()
+            question_context, role_focus, stored_points = self._load_turn_context(interview_id, question_context, role_focus)
+            expected_points = expected_points or stored_points
             
-            if not question_context and interview:
-                # Get the current question context
-                questions = db.query(Question).filter(Question.interview_id == interview_id).all()
-                if questions:
-                    question_context = questions[-1].content if questions else "General interview question"
-            
-            role_focus = role_focus or (interview.role_focus if interview else "General")
+            local = local_scorer.score(response_text, question_context, expected_points)
+            if local and local.confident:
+                print(f"⚡ Local score: overall={sum(local.scores.values()) / len(local.scores):.1f} (±{local.interval})")
+                return local_scorer.analysis(local)
             
             prompt = f"""
             You are an expert interview analyst. Analyze this candidate response comprehensively.
@@ -113,88 +312,184 @@ class AIService:
             Do not include any text before or after the JSON. Only return the JSON object.
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            analysis = await self._complete_json(
+                ResponseAnalysis,
+                operation="analyze_response",
                 messages=[
                     {"role": "system", "content": "You are an expert interview analyst. Provide detailed, objective analysis of candidate responses. Always respond with valid JSON only."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,  # Lower temperature for more consistent results
-                max_tokens=1000  # Limit response length for faster processing
+                max_tokens=1000,  # Limit response length for faster processing
+                cache=True
             )
             
-            analysis_text = response.choices[0].message.content.strip()
-            print(f"🔍 AI Response for '{response_text[:50]}...': {analysis_text[:200]}...")
-            
-            # Try to parse JSON, with fallback if it fails
-            try:
-                analysis = json.loads(analysis_text)
-                print(f"✅ Parsed analysis: overall_score={analysis.get('overall_score')}, technical={analysis.get('technical_accuracy')}, communication={analysis.get('communication_clarity')}")
-                
-                # Validate and normalize the response
-                if 'overall_score' not in analysis:
-                    # Calculate overall score from individual scores
-                    scores = [
-                        analysis.get('technical_accuracy', 0),
-                        analysis.get('communication_clarity', 0),
-                        analysis.get('depth_of_knowledge', 0),
-                        analysis.get('problem_solving_approach', 0),
-                        analysis.get('relevance_to_question', 0),
-                        analysis.get('professional_experience', 0)
-                    ]
-                    analysis['overall_score'] = sum(scores) / len(scores) if scores else 0
-                
-                return analysis
-                
-            except json.JSONDecodeError as json_error:
-                print(f"❌ JSON parsing failed: {json_error}")
-                print(f"❌ Raw response: {analysis_text}")
-                
-                # Try to extract JSON from the response if it's wrapped in text
-                import re
-                json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-                if json_match:
-                    try:
-                        analysis = json.loads(json_match.group())
-                        # Validate and normalize
-                        if 'overall_score' not in analysis:
-                            scores = [
-                                analysis.get('technical_accuracy', 0),
-                                analysis.get('communication_clarity', 0),
-                                analysis.get('depth_of_knowledge', 0),
-                                analysis.get('problem_solving_approach', 0),
-                                analysis.get('relevance_to_question', 0),
-                                analysis.get('professional_experience', 0)
-                            ]
-                            analysis['overall_score'] = sum(scores) / len(scores) if scores else 0
-                        return analysis
-                    except json.JSONDecodeError:
-                        pass
-                
-                # Return default structure if all parsing fails
-                raise json_error
+            print(f"✅ Parsed analysis: overall_score={analysis.overall_score}, technical={analysis.technical_accuracy}, communication={analysis.communication_clarity}")
+            return analysis.model_dump()
         
         except Exception as e:
             print(f"❌ Response analysis error: {e}")
-            return {
-                "technical_accuracy": 5.0,
-                "communication_clarity": 5.0,
-                "depth_of_knowledge": 5.0,
-                "problem_solving_approach": 5.0,
-                "relevance_to_question": 5.0,
-                "professional_experience": 5.0,
-                "overall_score": 5.0,
-                "sentiment_score": 0.5,
-                "confidence_score": 0.5,
-                "relevance_score": 0.5,
-                "key_points_mentioned": [],
-                "missing_points": [],
-                "strengths_identified": [],
-                "areas_for_improvement": [],
-                "feedback": "Unable to analyze response due to technical error",
-                "difficulty_recommendation": "same",
-                "follow_up_suggestions": []
-            }
+            if local:
+                return local_scorer.analysis(local)
+            return local_scorer.fallback_analysis(response_text, question_context, expected_points)
+    
+    def _load_turn_context(self, interview_id: str, question_context: str = None, role_focus: str = None):
+        """Fill in the current question, its expected answer points and the role focus for a turn from the database
+        
+        Callers that already hold both (the WebSocket session) skip the database entirely.
+        """
+        if question_context and role_focus:
+            return question_context, role_focus, None
+        
+        from app.database import SessionLocal
+        from app.models.interview import Interview
+        from app.models.question import Question
+        
+        db = SessionLocal()
+        try:
+            interview = db.query(Interview).filter(Interview.id == interview_id).first()
+            expected_points = None
+            
+            if not question_context and interview:
+                # Get the current question context
+                question = db.query(Question).filter(
+                    Question.interview_id == interview_id
+                ).order_by(Question.id.desc()).first()
+                if question:
+                    question_context = question.content
+                    expected_points = question.expected_answer_points
+            
+            role_focus = role_focus or (interview.role_focus if interview else "General")
+            return question_context, role_focus, expected_points
+        finally:
+            db.close()
+    
+    async def analyze_responses_batch(self, interview_id: str, items: List[Dict[str, str]], role_focus: str = None) -> List[Dict[str, Any]]:
+        """Score several question/answer pairs in one LLM request
+        
+        Each item is {"question": ..., "response": ..., "expected_points": [...]} (points
+        optional). Returns analyses in the same order and shape as analyze_response;
+        items the local scorer is confident about skip the LLM, and items the model
+        skips are scored singly.
+        """
+        if not items:
+            return []
+        
+        analyses_by_index: Dict[int, Dict[str, Any]] = {}
+        local_scores = local_scorer.score_batch(
+            [item.get("response", "") for item in items],
+            [item.get("question") for item in items],
+            [item.get("expected_points") for item in items]
+        )
+        for n, local in enumerate(local_scores or [], 1):
+            if local.confident:
+                analyses_by_index[n] = local_scorer.analysis(local)
+        
+        # Batch positions sent to the LLM -> original 1-based item numbers
+        escalated = [n for n in range(1, len(items) + 1) if n not in analyses_by_index]
+        if not escalated:
+            print(f"⚡ Local scorer handled all {len(items)} responses for interview {interview_id}")
+            return [analyses_by_index[n] for n in range(1, len(items) + 1)]
+        
+        role_focus = role_focus or "General"
+        print(f"🔍 Batch analyzing {len(escalated)} responses for interview {interview_id} ({len(items) - len(escalated)} scored locally)")
+        
+        answers_block = "\n".join(
+            f'{position}. Question: {items[n - 1].get("question") or "General interview question"}\n   Response: "{items[n - 1].get("response", "")}"'
+            for position, n in enumerate(escalated, 1)
+        )
+        
+        prompt = f"""
+            You are an expert interview analyst. Analyze each candidate response below comprehensively.
+            
+            Interview Context:
+            - Role Focus: {role_focus}
+            
+            Responses to analyze:
+            {answers_block}
+            
+            Evaluate every response on multiple dimensions and provide detailed scoring:
+            
+            1. Technical Accuracy (0-10): How technically correct and accurate is the response?
+            2. Communication Clarity (0-10): How clear and well-structured is the communication?
+            3. Depth of Knowledge (0-10): How deep and comprehensive is the knowledge demonstrated?
+            4. Problem-Solving Approach (0-10): How logical and effective is the problem-solving approach?
+            5. Relevance to Question (0-10): How well does the response address the specific question?
+            6. Professional Experience (0-10): How well does the response demonstrate relevant experience?
+            
+            Provide analysis in valid JSON format only, with one entry per response in the same order:
+            {{
+                "analyses": [
+                    {{
+                        "index": 1,
+                        "technical_accuracy": 8.5,
+                        "communication_clarity": 7.0,
+                        "depth_of_knowledge": 6.5,
+                        "problem_solving_approach": 8.0,
+                        "relevance_to_question": 9.0,
+                        "professional_experience": 7.5,
+                        "overall_score": 7.6,
+                        "sentiment_score": 0.8,
+                        "confidence_score": 0.7,
+                        "relevance_score": 0.9,
+                        "key_points_mentioned": ["specific technical concepts"],
+                        "missing_points": ["specific examples"],
+                        "strengths_identified": ["clear communication"],
+                        "areas_for_improvement": ["quantify achievements"],
+                        "feedback": "Detailed feedback about the response quality and suggestions for improvement",
+                        "difficulty_recommendation": "same",
+                        "follow_up_suggestions": ["Ask for specific examples"]
+                    }}
+                ]
+            }}
+            
+            Scoring Guidelines:
+            - 9-10: Exceptional response, exceeds expectations
+            - 7-8: Good response, meets expectations
+            - 5-6: Average response, partially meets expectations
+            - 3-4: Below average response, needs improvement
+            - 1-2: Poor response, significantly below expectations
+            - 0: No response or completely irrelevant
+            
+            Do not include any text before or after the JSON. Only return the JSON object.
+            """
+        
+        try:
+            batch = await self._complete_json(
+                BatchResponseAnalysis,
+                operation="analyze_batch",
+                messages=[
+                    {"role": "system", "content": "You are an expert interview analyst. Provide detailed, objective analysis of candidate responses. Always respond with valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,  # Lower temperature for more consistent results
+                max_tokens=min(4000, 600 * len(escalated)),
+                cache=True
+            )
+            
+            for position, analysis in enumerate(batch.analyses, 1):
+                index = analysis.index or position
+                if 1 <= index <= len(escalated):
+                    analyses_by_index[escalated[index - 1]] = analysis.model_dump(exclude={"index"})
+        
+        except Exception as e:
+            print(f"❌ Batch response analysis error: {e}")
+        
+        # Score any responses the batch call did not return individually
+        missing = [n for n in range(1, len(items) + 1) if n not in analyses_by_index]
+        if missing:
+            print(f"⚠️ Batch analysis missing {len(missing)} of {len(items)} responses, scoring them individually")
+            # Items without a question keep the batch prompt's placeholder; None would grade them
+            # against the interview's newest stored question
+            singles = await asyncio.gather(*(
+                self.analyze_response(interview_id, items[n - 1].get("response", ""),
+                                      items[n - 1].get("question") or "General interview question", role_focus,
+                                      items[n - 1].get("expected_points"))
+                for n in missing
+            ))
+            analyses_by_index.update(zip(missing, singles))
+        
+        return [analyses_by_index[n] for n in range(1, len(items) + 1)]
     
     async def generate_next_action(self, interview_id: str, response_text: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate next action based on response analysis"""
@@ -205,15 +500,16 @@ class AIService:
             Response: "{response_text}"
             Analysis: {json.dumps(analysis, indent=2)}
             
-            Provide next action in JSON format with:
+            Provide next action as a JSON object with:
             - action_type ("next_question", "follow_up", "clarification", "move_on")
             - content (question or instruction)
             - difficulty_adjustment ("easier", "same", "harder")
             - reasoning (why this action was chosen)
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            action = await self._complete_json(
+                NextAction,
+                operation="next_action",
                 messages=[
                     {"role": "system", "content": "You are an expert interviewer. Generate appropriate follow-up actions based on candidate responses."},
                     {"role": "user", "content": prompt}
@@ -221,17 +517,195 @@ class AIService:
                 temperature=0.4
             )
             
-            action_text = response.choices[0].message.content
-            return json.loads(action_text)
+            return action.model_dump()
         
         except Exception as e:
             print(f"❌ Next action generation error: {e}")
-            return {
-                "action_type": "next_question",
-                "content": "Thank you for that response. Let's move on to the next question.",
-                "difficulty_adjustment": "same",
-                "reasoning": "Default action due to processing error"
-            }
+            return dict(DEFAULT_NEXT_ACTION)
+    
+    async def stream_next_action(self, interview_id: str, response_text: str, analysis: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the next action: yields {"type": "delta", "text"} pieces of the spoken
+        content as they arrive, then one {"type": "action", "action"} with the full action"""
+        parser = SectionStreamParser([ACTION_MARKER])
+        
+        try:
+            prompt = f"""
+            Based on this candidate response and analysis, determine the next action:
+            
+            Response: "{response_text}"
+            Analysis: {json.dumps(analysis, indent=2)}
+            
+            First write exactly what you will say to the candidate next (the question or
+            instruction) as plain text. Then, on a new line, write {ACTION_MARKER} followed by
+            a JSON object with:
+            - action_type ("next_question", "follow_up", "clarification", "move_on")
+            - difficulty_adjustment ("easier", "same", "harder")
+            - reasoning (why this action was chosen)
+            """
+            
+            async for chunk in self._stream(
+                operation="next_action",
+                messages=[
+                    {"role": "system", "content": "You are an expert interviewer. Generate appropriate follow-up actions based on candidate responses."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.4
+            ):
+                for section, text in parser.feed(chunk):
+                    if section == 0:
+                        yield {"type": "delta", "text": text}
+            
+            for section, text in parser.finish():
+                if section == 0:
+                    yield {"type": "delta", "text": text}
+            
+            action_json = parser.sections[1] if parser.section > 0 else ""
+            yield {"type": "action", "action": self._build_action(parser.sections[0], action_json)}
+        
+        except Exception as e:
+            print(f"❌ Next action streaming error: {e}")
+            # Keep whatever the candidate has already heard as the content
+            streamed = parser.sections[0].strip()
+            yield {"type": "action", "action": {**DEFAULT_NEXT_ACTION, "content": streamed or DEFAULT_NEXT_ACTION["content"]}}
+    
+    async def stream_turn(self, interview_id: str, response_text: str, question_context: str = None, role_focus: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Score a response and stream the follow-up from a single LLM call
+        
+        Yields {"type": "analysis", "analysis"} as soon as the rubric section is complete,
+        then {"type": "delta", "text"} pieces of the spoken content and a final
+        {"type": "action", "action"}. Raises FusedTurnError before yielding anything if
+        no analysis could be parsed, so callers can fall back to the two-step path.
+        """
+        parser = SectionStreamParser([RESPONSE_MARKER, ACTION_MARKER])
+        analysis = None
+        spoken_started = False
+        
+        try:
+            print(f"🔍 Fused turn for interview {interview_id}: '{response_text[:100]}...'")
+            question_context, role_focus, _ = self._load_turn_context(interview_id, question_context, role_focus)
+            
+            prompt = f"""
+            You are an expert interviewer. Score this candidate response, then continue the interview.
+            
+            Interview Context:
+            - Role Focus: {role_focus}
+            - Question: {question_context or "General interview question"}
+            - Response: "{response_text}"
+            
+            {SCORING_RUBRIC}
+            
+            Reply in exactly three parts, in this order:
+            1. A JSON object with the analysis:
+            {{
+                "technical_accuracy": 8.5,
+                "communication_clarity": 7.0,
+                "depth_of_knowledge": 6.5,
+                "problem_solving_approach": 8.0,
+                "relevance_to_question": 9.0,
+                "professional_experience": 7.5,
+                "overall_score": 7.6,
+                "sentiment_score": 0.8,
+                "confidence_score": 0.7,
+                "relevance_score": 0.9,
+                "key_points_mentioned": ["specific technical concepts"],
+                "missing_points": ["specific examples"],
+                "strengths_identified": ["clear communication"],
+                "areas_for_improvement": ["quantify achievements"],
+                "feedback": "Detailed feedback about the response quality",
+                "difficulty_recommendation": "same",
+                "follow_up_suggestions": ["Ask for specific examples"]
+            }}
+            2. On a new line {RESPONSE_MARKER}, then exactly what you will say to the candidate
+            next (the question or instruction) as plain text.
+            3. On a new line {ACTION_MARKER}, then a JSON object with:
+            - action_type ("next_question", "follow_up", "clarification", "move_on")
+            - difficulty_adjustment ("easier", "same", "harder")
+            - reasoning (why this action was chosen)
+            """
+            
+            async for chunk in self._stream(
+                operation="turn",
+                messages=[
+                    {"role": "system", "content": "You are an expert interviewer. Analyze candidate responses objectively and generate appropriate follow-up actions."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3
+            ):
+                pieces = parser.feed(chunk)
+                if analysis is None and parser.section > 0:
+                    analysis = self._parse_section(ResponseAnalysis, parser.sections[0]).model_dump()
+                    yield {"type": "analysis", "analysis": analysis}
+                for section, text in pieces:
+                    if section != 1:
+                        continue
+                    # Drop the newline that follows the marker before the spoken text
+                    if not spoken_started:
+                        text = text.lstrip()
+                        spoken_started = bool(text)
+                    if text:
+                        yield {"type": "delta", "text": text}
+            
+            for section, text in parser.finish():
+                if section == 1:
+                    yield {"type": "delta", "text": text}
+            
+            if analysis is None:
+                raise FusedTurnError("Fused turn ended before the analysis section")
+            
+            action_json = parser.sections[2] if parser.section > 1 else ""
+            yield {"type": "action", "action": self._build_action(parser.sections[1], action_json)}
+        
+        except FusedTurnError:
+            raise
+        except Exception as e:
+            if analysis is None:
+                raise FusedTurnError(f"Fused turn failed: {str(e)}") from e
+            print(f"❌ Fused turn streaming error: {e}")
+            streamed = parser.sections[1].strip()
+            yield {"type": "action", "action": {**DEFAULT_NEXT_ACTION, "content": streamed or DEFAULT_NEXT_ACTION["content"]}}
+    
+    @staticmethod
+    def _parse_section(schema: Type[SchemaT], text: str) -> SchemaT:
+        """Validate the JSON object spanning the first '{' to the last '}' of a streamed section"""
+        return schema.model_validate_json(text[text.find("{"):text.rfind("}") + 1])
+    
+    @classmethod
+    def _build_action(cls, content: str, action_json: str) -> Dict[str, Any]:
+        """Combine streamed spoken content with its trailing action JSON"""
+        action = cls._parse_section(NextAction, action_json) if action_json.strip() else NextAction()
+        action.content = content.strip() or action.content or DEFAULT_NEXT_ACTION["content"]
+        return action.model_dump()
+    
+    async def generate_speculative_question(self, interview_id: str, current_question: str, difficulty_adjustment: str, role_focus: str = None) -> Optional[str]:
+        """Pre-generate the next question for one difficulty branch before the answer arrives"""
+        try:
+            _, role_focus, _ = self._load_turn_context(interview_id, current_question, role_focus)
+            
+            prompt = f"""
+            A candidate for a {role_focus} role is currently answering this interview question:
+            "{current_question}"
+            
+            Write the next interview question to ask after they answer. Make it {difficulty_adjustment}
+            in difficulty than the current question ("same" means a comparable level), and do not
+            depend on the details of their answer.
+            
+            Return only the question text.
+            """
+            
+            question = await self._complete(
+                operation="speculative_question",
+                messages=[
+                    {"role": "system", "content": "You are an expert interviewer. Generate engaging, relevant interview questions."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5,
+                max_tokens=200
+            )
+            return question.strip().strip('"') or None
+        
+        except Exception as e:
+            print(f"❌ Speculative question error ({difficulty_adjustment}): {e}")
+            return None
     
     async def initialize_interview(self, interview_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize interview session with AI"""
@@ -246,7 +720,7 @@ class AIService:
             
             Candidate info: {json.dumps(candidate_info, indent=2)}
             
-            Provide in JSON format:
+            Provide a JSON object with:
             - question (the opening question)
             - question_type ("behavioral", "technical", "situational")
             - difficulty ("easy", "medium", "hard")
@@ -254,16 +728,16 @@ class AIService:
             - expected_answer_points (list of key points to look for)
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            question = await self._complete_json(
+                GeneratedQuestion,
+                operation="opening_question",
                 messages=[
                     {"role": "system", "content": "You are an expert interviewer. Generate engaging, relevant opening questions."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5
             )
-            
-            question_data = json.loads(response.choices[0].message.content)
+            question_data = question.model_dump()
             
             return {
                 "interview_id": interview_id,
@@ -280,7 +754,25 @@ class AIService:
             print(f"❌ Interview initialization error: {e}")
             raise Exception(f"Interview initialization failed: {str(e)}")
     
-    async def generate_final_analysis(self, interview_id: str) -> Dict[str, Any]:
+    async def generate_final_analysis(self, interview_id: str, rescore_responses: bool = False) -> Dict[str, Any]:
+        """Generate final analysis, coalescing concurrent runs for the same interview
+        
+        Callers in this process share one in-flight run. Across workers a Postgres
+        advisory lock serializes runs, so the Score upsert cannot race; a worker that
+        waited reruns against stored analyses and the LLM cache, which is cheap.
+        """
+        key = f"final_analysis:{int(interview_id)}"
+        flight_key = f"{key}:rescore" if rescore_responses else key
+        return await self.single_flight.run(
+            flight_key,
+            lambda: self._generate_final_analysis_locked(interview_id, key, rescore_responses)
+        )
+    
+    async def _generate_final_analysis_locked(self, interview_id: str, key: str, rescore_responses: bool) -> Dict[str, Any]:
+        async with advisory_lock(key):
+            return await self._generate_final_analysis(interview_id, rescore_responses)
+    
+    async def _generate_final_analysis(self, interview_id: str, rescore_responses: bool = False) -> Dict[str, Any]:
         """Generate comprehensive final interview analysis and scoring using OpenAI"""
         try:
             # Get interview data and responses from database
@@ -366,20 +858,10 @@ class AIService:
                 print(f"     AI Analysis: {bool(response.ai_analysis)}")
                 print(f"     Score: {response.score}")
             
-            # Build comprehensive conversation context with detailed scoring
-            conversation_context = ""
-            total_technical_score = 0
-            total_communication_score = 0
-            total_problem_solving_score = 0
-            total_relevance_score = 0
-            total_experience_score = 0
-            response_count = 0
-            
-            detailed_scores = []
-            
             # Sort questions by order_in_interview to match with responses
             sorted_questions = sorted(questions, key=lambda q: q.order_in_interview) if questions else []
             
+            matched_responses = []
             for i, response in enumerate(responses):
                 # Try to match question by ID first, then by order as fallback
                 question = next((q for q in questions if q.id == response.question_id), None)
@@ -402,46 +884,58 @@ class AIService:
                     )
                     print(f"   ⚠️ No question found for response {i+1}, created dummy question")
                 
+                matched_responses.append((i, response, question))
+            
+            # Generate missing analyses concurrently (only for responses with substantial content);
+            # when re-scoring, every substantial response is analyzed again
+            pending_analyses = [
+                (response, question)
+                for _, response, question in matched_responses
+                if (rescore_responses or not (response.ai_analysis or {}).get('overall_score'))
+                and response.text_response and len(response.text_response.strip()) > 10
+            ]
+            backfilled = await self._backfill_analyses(interview_id, interview.role_focus, pending_analyses)
+            
+            if backfilled:
+                # Store all new analyses in a single transaction
+                for response, _ in pending_analyses:
+                    ai_analysis = backfilled.get(response.id)
+                    if ai_analysis:
+                        record_analysis(db, interview_id, ai_analysis, previous=response.ai_analysis)
+                        response.ai_analysis = ai_analysis
+                        response.score = ai_analysis.get('overall_score', 5)
+                        response.feedback = ai_analysis.get('feedback', '')
+                db.commit()
+                print(f"✅ Generated and stored {len(backfilled)} missing analyses")
+            
+            # Build comprehensive conversation context with detailed scoring, within the token budget
+            conversation = ConversationPromptBuilder()
+            # Stored analyses are already summed in the running aggregate; default
+            # scores for responses without one are added on top
+            scored_analyses = []
+            defaulted_analyses = []
+            
+            detailed_scores = []
+            
+            for i, response, question in matched_responses:
                 # Always process the response (even if we had to create a dummy question)
                 if True:
-                    # Get AI analysis from response, or generate it if missing
+                    # Get AI analysis from response (backfilled above if it was missing)
                     ai_analysis = response.ai_analysis or {}
                     print(f"   🔍 Response {i+1} ai_analysis type: {type(ai_analysis)}")
                     print(f"   🔍 Response {i+1} ai_analysis keys: {list(ai_analysis.keys()) if isinstance(ai_analysis, dict) else 'NOT A DICT'}")
                     print(f"   🔍 Response {i+1} overall_score: {ai_analysis.get('overall_score') if isinstance(ai_analysis, dict) else 'N/A'}")
                     
-                    # If no AI analysis exists, generate it now (but only if we have substantial content)
-                    if not ai_analysis or not ai_analysis.get('overall_score'):
+                    # Fall back to default scores when no analysis could be generated
+                    if is_scored(ai_analysis):
+                        scored_analyses.append(ai_analysis)
+                    else:
                         if response.text_response and len(response.text_response.strip()) > 10:
-                            print(f"🔄 Generating missing analysis for response {response.id}")
-                            try:
-                                ai_analysis = await self.analyze_response(
-                                    interview_id, 
-                                    response.text_response, 
-                                    question.content, 
-                                    interview.role_focus
-                                )
-                                
-                                # Update the response with the new analysis
-                                response.ai_analysis = ai_analysis
-                                response.score = ai_analysis.get('overall_score', 5)
-                                response.feedback = ai_analysis.get('feedback', '')
-                                db.commit()
-                                print(f"✅ Generated and stored analysis for response {response.id}")
-                                
-                            except Exception as e:
-                                print(f"❌ Failed to generate analysis for response {response.id}: {e}")
-                                # Use default analysis if generation fails
-                                ai_analysis = {
-                                    'technical_accuracy': 5.0,
-                                    'communication_clarity': 5.0,
-                                    'depth_of_knowledge': 5.0,
-                                    'problem_solving_approach': 5.0,
-                                    'relevance_to_question': 5.0,
-                                    'professional_experience': 5.0,
-                                    'overall_score': 5.0,
-                                    'feedback': 'Analysis pending'
-                                }
+                            print(f"❌ No analysis available for response {response.id}, using local scores")
+                            # Score locally if generation failed
+                            ai_analysis = local_scorer.fallback_analysis(
+                                response.text_response, question.content, question.expected_answer_points
+                            )
                         else:
                             print(f"⚠️ Skipping analysis for response {response.id} - insufficient content")
                             # Use default analysis for short responses
@@ -455,41 +949,25 @@ class AIService:
                                 'overall_score': 4.0,
                                 'feedback': 'Short response - limited analysis possible'
                             }
+                        defaulted_analyses.append(ai_analysis)
                     
-                    conversation_context += f"Question {i+1}: {question.content}\n"
-                    conversation_context += f"Answer: {response.text_response}\n"
-                    conversation_context += f"Technical Accuracy: {ai_analysis.get('technical_accuracy', 0)}/10\n"
-                    conversation_context += f"Communication Clarity: {ai_analysis.get('communication_clarity', 0)}/10\n"
-                    conversation_context += f"Problem Solving: {ai_analysis.get('problem_solving_approach', 0)}/10\n"
-                    conversation_context += f"Relevance: {ai_analysis.get('relevance_to_question', 0)}/10\n"
-                    conversation_context += f"Experience: {ai_analysis.get('professional_experience', 0)}/10\n"
-                    conversation_context += f"Overall Score: {ai_analysis.get('overall_score', 0)}/10\n"
-                    conversation_context += f"Feedback: {ai_analysis.get('feedback', 'No feedback')}\n\n"
+                    conversation.add_turn(i + 1, question.content, response.text_response, ai_analysis)
                     
-                    # Accumulate scores for averaging - include all responses with analysis
-                    if ai_analysis:
-                        technical_score = ai_analysis.get('technical_accuracy', 0)
-                        communication_score = ai_analysis.get('communication_clarity', 0)
-                        problem_solving_score = ai_analysis.get('problem_solving_approach', 0)
-                        relevance_score = ai_analysis.get('relevance_to_question', 0)
-                        experience_score = ai_analysis.get('professional_experience', 0)
-                        overall_score = ai_analysis.get('overall_score', 0)
-                        
-                        print(f"   📊 Response {i+1} scores: Technical={technical_score}, Communication={communication_score}, Problem Solving={problem_solving_score}, Relevance={relevance_score}, Experience={experience_score}, Overall={overall_score}")
-                        
-                        # Always accumulate scores, even if they are 0 (they might be legitimate 0 scores)
-                        total_technical_score += technical_score
-                        total_communication_score += communication_score
-                        total_problem_solving_score += problem_solving_score
-                        total_relevance_score += relevance_score
-                        total_experience_score += experience_score
-                        response_count += 1
-                        
-                        detailed_scores.append({
-                            'question': question.content,
-                            'response': response.text_response,
-                            'scores': ai_analysis
-                        })
+                    detailed_scores.append({
+                        'question': question.content,
+                        'response': response.text_response,
+                        'scores': ai_analysis
+                    })
+            
+            # Read the running totals (rebuilt only if the aggregate is missing or stale)
+            totals = get_aggregate(db, interview_id, stored_analyses=scored_analyses).totals(extra=defaulted_analyses)
+            db.commit()
+            total_technical_score = totals['technical_accuracy']
+            total_communication_score = totals['communication_clarity']
+            total_problem_solving_score = totals['problem_solving_approach']
+            total_relevance_score = totals['relevance_to_question']
+            total_experience_score = totals['professional_experience']
+            response_count = totals['count']
             
             # Calculate average scores (convert from 0-10 to 0-100 scale)
             print(f"📊 Score calculation: response_count={response_count}")
@@ -509,77 +987,23 @@ class AIService:
                 print(f"⚠️ No analyzed responses found, generating scores from {len(responses)} responses")
                 
                 # Generate basic scores from response content
-                total_technical = 0
-                total_communication = 0
-                total_problem_solving = 0
-                total_cultural_fit = 0
-                total_relevance = 0
-                total_experience = 0
-                fallback_response_count = 0
-                
-                for response in responses:
-                    if response.text_response:
-                        content = response.text_response.lower()
-                        word_count = len(content.split())
-                        
-                        # Basic scoring based on content analysis
-                        technical_score = 5.0  # Base score
-                        if any(word in content for word in ['data', 'analysis', 'python', 'sql', 'visualization', 'statistics', 'machine learning', 'algorithm']):
-                            technical_score = 7.0
-                        
-                        communication_score = 5.0  # Base score
-                        if word_count > 20:
-                            communication_score = 7.0
-                        elif word_count > 10:
-                            communication_score = 6.0
-                        
-                        problem_solving_score = 5.0  # Base score
-                        if any(word in content for word in ['step', 'process', 'approach', 'solution', 'method']):
-                            problem_solving_score = 7.0
-                        
-                        cultural_fit_score = 5.0  # Base score
-                        if any(word in content for word in ['team', 'collaborate', 'work together', 'help', 'support']):
-                            cultural_fit_score = 7.0
-                        elif any(word in content for word in ['project', 'work', 'experience', 'learn', 'develop']):
-                            cultural_fit_score = 6.0  # Professional engagement
-                        
-                        # Relevance score based on how well response addresses the question
-                        relevance_score = 5.0  # Base score
-                        if any(word in content for word in ['because', 'therefore', 'however', 'specifically', 'example', 'instance']):
-                            relevance_score = 7.0  # Shows direct addressing of question
-                        elif word_count > 15:  # Substantial response
-                            relevance_score = 6.0
-                        
-                        # Experience score based on professional/academic experience mentions
-                        experience_score = 5.0  # Base score
-                        if any(word in content for word in ['internship', 'project', 'work', 'experience', 'previous', 'before', 'studied', 'learned']):
-                            experience_score = 7.0
-                        elif any(word in content for word in ['course', 'class', 'training', 'certification']):
-                            experience_score = 6.0
-                        
-                        total_technical += technical_score
-                        total_communication += communication_score
-                        total_problem_solving += problem_solving_score
-                        total_cultural_fit += cultural_fit_score
-                        total_relevance += relevance_score
-                        total_experience += experience_score
-                        fallback_response_count += 1
+                fallback_response_count, averages = average_scores(response.text_response for response in responses)
                 
                 if fallback_response_count > 0:
-                    avg_technical = (total_technical / fallback_response_count) * 10  # Convert to 0-100 scale
-                    avg_communication = (total_communication / fallback_response_count) * 10  # Convert to 0-100 scale
-                    avg_problem_solving = (total_problem_solving / fallback_response_count) * 10  # Convert to 0-100 scale
-                    avg_cultural_fit = (total_cultural_fit / fallback_response_count) * 10  # Convert to 0-100 scale
-                    avg_relevance = (total_relevance / fallback_response_count) * 10  # Convert to 0-100 scale
-                    avg_experience = (total_experience / fallback_response_count) * 10  # Convert to 0-100 scale
+                    avg_technical = averages['technical']
+                    avg_communication = averages['communication']
+                    avg_problem_solving = averages['problem_solving']
+                    avg_cultural_fit = averages['cultural_fit']
+                    avg_relevance = averages['relevance']
+                    avg_experience = averages['experience']
                     overall_average = (avg_technical + avg_communication + avg_problem_solving + avg_cultural_fit + avg_relevance + avg_experience) / 6
                     
-                    # Update the analysis variables
-                    total_technical_score = total_technical
-                    total_communication_score = total_communication
-                    total_problem_solving_score = total_problem_solving
-                    total_relevance_score = total_relevance
-                    total_experience_score = total_experience
+                    # Update the analysis variables (sums on the 0-10 scale)
+                    total_technical_score = avg_technical / 10 * fallback_response_count
+                    total_communication_score = avg_communication / 10 * fallback_response_count
+                    total_problem_solving_score = avg_problem_solving / 10 * fallback_response_count
+                    total_relevance_score = avg_relevance / 10 * fallback_response_count
+                    total_experience_score = avg_experience / 10 * fallback_response_count
                     response_count = fallback_response_count
                     
                     print(f"✅ Generated basic scores: Technical={avg_technical:.1f}, Communication={avg_communication:.1f}, Problem Solving={avg_problem_solving:.1f}, Cultural Fit={avg_cultural_fit:.1f}, Relevance={avg_relevance:.1f}, Experience={avg_experience:.1f}")
@@ -625,6 +1049,8 @@ class AIService:
                 overall_average = (avg_technical + avg_communication + avg_problem_solving + avg_relevance + avg_experience) / 5
                 print(f"📊 Applied baseline scores: technical={avg_technical:.1f}, communication={avg_communication:.1f}, problem_solving={avg_problem_solving:.1f}, relevance={avg_relevance:.1f}, experience={avg_experience:.1f}, overall={overall_average:.1f}")
             
+            conversation_context = conversation.build()
+            
             # Get candidate background for context
             candidate_background = ""
             if candidate:
@@ -704,37 +1130,23 @@ class AIService:
             Do not include any text before or after the JSON. Only return the JSON object.
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            final = await self._complete_json(
+                FinalAnalysis,
+                operation="final_analysis",
                 messages=[
                     {"role": "system", "content": "You are an expert interview analyst. Provide comprehensive, objective analysis and scoring."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,  # Lower temperature for more consistent results
-                max_tokens=1500  # Limit response length for faster processing
+                max_tokens=1500,  # Limit response length for faster processing
+                cache=True
             )
+            analysis = final.model_dump()
             
-            analysis_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON from response
-            try:
-                import re
-                json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                else:
-                    analysis = json.loads(analysis_text)
-                
-                print(f"✅ Parsed analysis response: {analysis}")
-                print(f"📊 Analysis keys: {list(analysis.keys())}")
-                print(f"📊 Overall score: {analysis.get('overall_score', 'NOT_FOUND')}")
-                print(f"📊 Technical score: {analysis.get('technical_score', 'NOT_FOUND')}")
-                print(f"📊 Communication score: {analysis.get('communication_score', 'NOT_FOUND')}")
-                
-            except json.JSONDecodeError as json_error:
-                print(f"❌ JSON parsing error: {json_error}")
-                print(f"Raw response: {analysis_text}")
-                raise Exception(f"Failed to parse AI response as JSON: {json_error}")
+            print(f"✅ Parsed analysis response: {analysis}")
+            print(f"📊 Overall score: {final.overall_score}")
+            print(f"📊 Technical score: {final.technical_score}")
+            print(f"📊 Communication score: {final.communication_score}")
             
             # Update interview with comprehensive analysis results
             # Use calculated scores instead of AI's scores (AI might return 0 or incorrect values)
@@ -872,8 +1284,121 @@ class AIService:
             except:
                 pass
     
-    async def analyze_resume_text(self, resume_text: str, role_focus: str) -> Dict[str, Any]:
-        """Analyze resume text and extract candidate information using OpenAI"""
+    async def _backfill_analyses(self, interview_id: str, role_focus: str, pending: List[Any]) -> Dict[int, Dict[str, Any]]:
+        """Analyze (response, question) pairs concurrently, returning analyses keyed by response id"""
+        if not pending:
+            return {}
+        
+        semaphore = asyncio.Semaphore(max(1, settings.FINAL_ANALYSIS_BACKFILL_CONCURRENCY))
+        
+        # Score in batches so the rubric is sent once per batch instead of once per answer
+        batch_size = max(1, settings.BATCH_SCORING_MAX_ITEMS) if settings.BATCH_SCORING_ENABLED else 1
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        
+        async def analyze(batch):
+            async with semaphore:
+                print(f"🔄 Generating missing analysis for responses {[response.id for response, _ in batch]}")
+                if len(batch) == 1:
+                    response, question = batch[0]
+                    return [await self.analyze_response(
+                        interview_id,
+                        response.text_response,
+                        question.content,
+                        role_focus,
+                        question.expected_answer_points
+                    )]
+                return await self.analyze_responses_batch(
+                    interview_id,
+                    [
+                        {"question": question.content, "response": response.text_response, "expected_points": question.expected_answer_points}
+                        for response, question in batch
+                    ],
+                    role_focus
+                )
+        
+        results = await asyncio.gather(
+            *(analyze(batch) for batch in batches),
+            return_exceptions=True
+        )
+        
+        analyses = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"❌ Failed to generate analysis for responses {[response.id for response, _ in batch]}: {result}")
+                continue
+            for (response, _), analysis in zip(batch, result):
+                analyses[response.id] = analysis
+        return analyses
+    
+    async def rescore_responses(self, interview_id: str) -> Dict[str, Any]:
+        """Re-score every stored response of an interview using batched analysis"""
+        from app.database import SessionLocal
+        from app.models.interview import Interview
+        from app.models.response import Response
+        from app.models.question import Question
+        
+        db = SessionLocal()
+        try:
+            interview = db.query(Interview).filter(Interview.id == int(interview_id)).first()
+            if not interview:
+                raise Exception(f"Interview {interview_id} not found")
+            
+            responses = db.query(Response).filter(Response.interview_id == int(interview_id)).all()
+            questions = {q.id: q for q in db.query(Question).filter(Question.interview_id == int(interview_id)).all()}
+            
+            pending = [
+                (response, questions.get(response.question_id) or Question(content="General interview question"))
+                for response in responses
+                if response.text_response and len(response.text_response.strip()) > 10
+            ]
+            analyses = await self._backfill_analyses(interview_id, interview.role_focus, pending)
+            
+            for response, _ in pending:
+                ai_analysis = analyses.get(response.id)
+                if ai_analysis:
+                    record_analysis(db, interview_id, ai_analysis, previous=response.ai_analysis)
+                    response.ai_analysis = ai_analysis
+                    response.score = ai_analysis.get('overall_score', 5)
+                    response.feedback = ai_analysis.get('feedback', '')
+            db.commit()
+            
+            print(f"✅ Re-scored {len(analyses)} of {len(responses)} responses for interview {interview_id}")
+            return {
+                "interview_id": interview_id,
+                "responses": len(responses),
+                "rescored": len(analyses),
+                "scores": {response_id: analysis.get('overall_score') for response_id, analysis in analyses.items()}
+            }
+        
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    async def analyze_resume_text(self, resume_text: str, role_focus: str, reanalyze: bool = False) -> Dict[str, Any]:
+        """Analyze resume text, reusing the stored result for a resume seen before
+        
+        Repeats are matched on a hash of the normalized resume text and the role
+        focus. reanalyze skips the stored result and the LLM cache and replaces it.
+        """
+        text_hash = resume_text_hash(resume_text)
+        if not reanalyze:
+            try:
+                stored = await asyncio.to_thread(get_stored_analysis, text_hash, role_focus)
+                if stored is not None:
+                    print(f"⚡ Reusing stored resume analysis ({text_hash[:12]}, {role_focus})")
+                    return stored
+            except Exception as e:
+                print(f"⚠️ Stored resume analysis lookup failed: {e}")
+        
+        return await self.single_flight.run(
+            f"resume_analysis:{text_hash}:{normalize_role_focus(role_focus)}",
+            lambda: self._analyze_resume_text(resume_text, role_focus, text_hash, reanalyze)
+        )
+    
+    async def _analyze_resume_text(self, resume_text: str, role_focus: str, text_hash: str, reanalyze: bool) -> Dict[str, Any]:
+        """Extract candidate information from resume text using OpenAI"""
         try:
             prompt = f"""
             Analyze the following resume and extract candidate information. 
@@ -904,32 +1429,25 @@ class AIService:
             Return only valid JSON, no additional text.
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            analysis = await self._complete_json(
+                ResumeAnalysis,
+                operation="resume_analysis",
                 messages=[
                     {"role": "system", "content": "You are an expert resume analyzer. Extract candidate information accurately and return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                cache=not reanalyze
             )
+            result = analysis.model_dump()
             
-            analysis_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON from response
             try:
-                # Find JSON in response (in case there's extra text)
-                import re
-                json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-                if json_match:
-                    analysis_json = json.loads(json_match.group())
-                else:
-                    analysis_json = json.loads(analysis_text)
-            except json.JSONDecodeError as json_error:
-                print(f"❌ JSON parsing error: {json_error}")
-                print(f"Raw response: {analysis_text}")
-                raise Exception(f"Failed to parse AI response as JSON: {json_error}")
-            
-            return analysis_json
+                model = self.models.tiers.get(self.models.tier_for("resume_analysis"))
+                await asyncio.to_thread(store_analysis, text_hash, role_focus, model, result)
+            except Exception as e:
+                print(f"⚠️ Could not store resume analysis: {e}")
+            
+            return result
         
         except Exception as e:
             print(f"❌ Resume analysis error: {e}")
@@ -992,21 +1510,19 @@ class AIService:
             Do not include any text before or after the JSON. Only return the JSON object.
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an expert interview coach. Generate adaptive questions that help assess candidates more effectively."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
-            
-            question_text = response.choices[0].message.content.strip()
-            
             try:
-                return json.loads(question_text)
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
+                question = await self._complete_json(
+                    AdaptiveQuestion,
+                    operation="adaptive_question",
+                    messages=[
+                        {"role": "system", "content": "You are an expert interview coach. Generate adaptive questions that help assess candidates more effectively."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7
+                )
+                return question.model_dump()
+            except LLMOutputError:
+                # Fallback if the output never matches the schema
                 return {
                     "question": "Can you provide more details about your experience with this technology?",
                     "question_type": question_type,
@@ -1037,20 +1553,23 @@ class AIService:
             
             Resume: {resume_text[:2000]}  # Limit resume text
             
-            Provide questions in JSON format as an array:
-            [
-                {{
-                    "question": "Question text",
-                    "question_type": "behavioral|technical|situational",
-                    "difficulty": "easy|medium|hard",
-                    "skills_tested": l2"],
-                    "expected_answer_points": ["point1", "p["skill1", "skiloint2"]
-                }}
-            ]
+            Provide the questions as a JSON object:
+            {{
+                "questions": [
+                    {{
+                        "question": "Question text",
+                        "question_type": "behavioral|technical|situational",
+                        "difficulty": "easy|medium|hard",
+                        "skills_tested": ["skill1", "skill2"],
+                        "expected_answer_points": ["point1", "point2"]
+                    }}
+                ]
+            }}
             """
             
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            result = await self._complete_json(
+                QuestionList,
+                operation="question_generation",
                 messages=[
                     {"role": "system", "content": "You are an expert interviewer. Generate relevant, challenging questions based on candidate background."},
                     {"role": "user", "content": prompt}
@@ -1058,23 +1577,59 @@ class AIService:
                 temperature=0.6
             )
             
-            questions_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON from response
-            try:
-                import re
-                json_match = re.search(r'\[.*\]', questions_text, re.DOTALL)
-                if json_match:
-                    questions = json.loads(json_match.group())
-                else:
-                    questions = json.loads(questions_text)
-            except json.JSONDecodeError as json_error:
-                print(f"❌ JSON parsing error: {json_error}")
-                print(f"Raw response: {questions_text}")
-                raise Exception(f"Failed to parse AI response as JSON: {json_error}")
-            
-            return questions
+            return [question.model_dump() for question in result.questions]
         
         except Exception as e:
             print(f"❌ Question generation error: {e}")
             raise Exception(f"Question generation failed: {str(e)}")
+    
+    async def generate_bank_questions(self, role_focus: str, difficulty: str, question_type: str, count: int, avoid: List[str] = None) -> List[Dict[str, Any]]:
+        """Generate questions for a question bank pool, avoiding ones it already holds"""
+        try:
+            avoid_section = ""
+            if avoid:
+                avoid_section = "Do not repeat or closely paraphrase these existing questions:\n" + "\n".join(f"- {question}" for question in avoid)
+            
+            prompt = f"""
+            Generate {count} distinct {difficulty} {question_type} interview questions for a {role_focus} role.
+            
+            {avoid_section}
+            
+            Provide the questions as a JSON object:
+            {{
+                "questions": [
+                    {{
+                        "question": "Question text",
+                        "question_type": "{question_type}",
+                        "difficulty": "{difficulty}",
+                        "skills_tested": ["skill1", "skill2"],
+                        "expected_answer_points": ["point1", "point2"]
+                    }}
+                ]
+            }}
+            """
+            
+            result = await self._complete_json(
+                QuestionList,
+                operation="question_generation",
+                messages=[
+                    {"role": "system", "content": "You are an expert interviewer. Generate relevant, challenging questions for the role."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.9
+            )
+            
+            # The pool decides type and difficulty, whatever the model labelled them
+            return [
+                {**question.model_dump(), "question_type": question_type, "difficulty": difficulty}
+                for question in result.questions[:count]
+            ]
+        
+        except Exception as e:
+            print(f"❌ Question bank generation error: {e}")
+            raise Exception(f"Question bank generation failed: {str(e)}")
+
+
+def get_ai_service(request: Request) -> AIService:
+    """Dependency to get the process-wide AI service created in the app lifespan"""
+    return request.app.state.ai_service
@@ -0,0 +1,201 @@
+"""
+Streaming audio ingest with energy-based endpointing
+
+Clients stream an answer as 16-bit little-endian mono PCM chunks. Samples are
+written into a buffer preallocated for the longest allowed answer, and every
+frame's RMS energy is compared with a noise floor that follows the quietest
+recent frames:
+
+- a pause after enough speech closes a segment, which is transcribed right
+  away while the candidate keeps talking
+- a longer silence after speech ends the answer
+
+When the answer ends only the last segment is still being transcribed, so
+the final transcript arrives about one segment after the candidate stops.
+"""
+
+import asyncio
+import struct
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+BYTES_PER_SAMPLE = 2
+# Noise floor tracking: drops to quieter frames at once, rises towards louder non-speech frames by this fraction per frame
+NOISE_FLOOR_RISE = 0.005
+# Whisper rejects shorter files
+MIN_SEGMENT_SECONDS = 0.1
+
+
+def wav_bytes(pcm, sample_rate: int) -> bytes:
+    """A mono PCM16 WAV file holding pcm"""
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * BYTES_PER_SAMPLE, BYTES_PER_SAMPLE, 16,
+        b"data", len(pcm)
+    )
+    return header + bytes(pcm)
+
+
+class AudioStream:
+    """Preallocated PCM buffer that splits speech into segments and detects the end of an answer"""
+
+    def __init__(self, sample_rate: int = 16000, max_seconds: float = settings.WS_STREAM_MAX_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * settings.WS_STREAM_FRAME_MS / 1000) * BYTES_PER_SAMPLE
+        self.buffer = bytearray(int(sample_rate * max_seconds) * BYTES_PER_SAMPLE)
+        self.view = memoryview(self.buffer)
+        self.length = 0  # Bytes written
+        self.analyzed = 0  # Bytes already split into frames
+
+        frame_seconds = settings.WS_STREAM_FRAME_MS / 1000
+        self.segment_pause_frames = max(1, round(settings.WS_STREAM_SEGMENT_PAUSE_SECONDS / frame_seconds))
+        self.segment_min_frames = max(1, round(settings.WS_STREAM_SEGMENT_MIN_SECONDS / frame_seconds))
+        self.segment_max_frames = max(1, round(settings.WS_STREAM_SEGMENT_MAX_SECONDS / frame_seconds))
+        self.end_silence_frames = max(1, round(settings.WS_STREAM_END_SILENCE_SECONDS / frame_seconds))
+
+        self.noise_floor: Optional[float] = None
+        self.segment_start = 0
+        self.segment_frames = 0
+        self.segment_speech_frames = 0
+        self.silent_frames = 0
+        self.heard_speech = False
+        self.ended = False
+
+    @property
+    def seconds(self) -> float:
+        return self.length / (self.sample_rate * BYTES_PER_SAMPLE)
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, int]]:
+        """Append a chunk; returns (start, end) byte ranges of segments it closed
+
+        Sets ended once the answer is over (end-of-speech silence or a full buffer).
+        """
+        if self.ended:
+            return []
+
+        room = len(self.buffer) - self.length
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.ended = True
+        self.view[self.length:self.length + len(chunk)] = chunk
+        self.length += len(chunk)
+
+        segments = []
+        frame_count = (self.length - self.analyzed) // self.frame_bytes
+        if frame_count:
+            end = self.analyzed + frame_count * self.frame_bytes
+            samples = np.frombuffer(self.view[self.analyzed:end], dtype="<i2").astype(np.float32)
+            energies = np.sqrt((samples.reshape(frame_count, -1) ** 2).mean(axis=1))
+            for energy in energies.tolist():
+                self.analyzed += self.frame_bytes
+                segment = self._frame(energy)
+                if segment:
+                    segments.append(segment)
+                if self.ended:
+                    break
+
+        if self.ended:
+            segment = self.close_segment()
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def _frame(self, energy: float) -> Optional[Tuple[int, int]]:
+        if self.noise_floor is None:
+            # Start no higher than the fixed threshold so an answer that begins at once is still speech
+            self.noise_floor = min(energy, settings.WS_STREAM_MIN_RMS / settings.WS_STREAM_SPEECH_RATIO)
+        is_speech = energy >= max(settings.WS_STREAM_MIN_RMS, self.noise_floor * settings.WS_STREAM_SPEECH_RATIO)
+        if energy < self.noise_floor:
+            self.noise_floor = energy
+        elif not is_speech:
+            # Only background frames raise the floor, or sustained speech would lift it above itself
+            self.noise_floor += (energy - self.noise_floor) * NOISE_FLOOR_RISE
+
+        self.segment_frames += 1
+        if is_speech:
+            self.heard_speech = True
+            self.segment_speech_frames += 1
+            self.silent_frames = 0
+        else:
+            self.silent_frames += 1
+
+        if self.heard_speech and self.silent_frames >= self.end_silence_frames:
+            self.ended = True
+            return None
+        if self.segment_speech_frames >= self.segment_min_frames and (
+            self.silent_frames >= self.segment_pause_frames or self.segment_frames >= self.segment_max_frames
+        ):
+            return self.close_segment()
+        return None
+
+    def close_segment(self) -> Optional[Tuple[int, int]]:
+        """Close the open segment at the current position; None if it holds no speech"""
+        start, end = self.segment_start, self.analyzed if not self.ended else self.length
+        has_speech = self.segment_speech_frames > 0
+        self.segment_start = end
+        self.segment_frames = 0
+        self.segment_speech_frames = 0
+        long_enough = end - start >= MIN_SEGMENT_SECONDS * self.sample_rate * BYTES_PER_SAMPLE
+        return (start, end) if has_speech and long_enough else None
+
+    def segment_wav(self, segment: Tuple[int, int]) -> bytes:
+        start, end = segment
+        return wav_bytes(self.view[start:end], self.sample_rate)
+
+
+class StreamingTranscription:
+    """Transcribe an AudioStream's segments concurrently as they close"""
+
+    def __init__(self, sample_rate: int, transcribe: Callable[[bytes], Awaitable[str]],
+                 on_interim: Optional[Callable[[str, int], Awaitable[None]]] = None):
+        self.stream = AudioStream(sample_rate)
+        self.transcribe = transcribe
+        self.on_interim = on_interim
+        self.tasks: List[asyncio.Task] = []
+        self.texts: List[Optional[str]] = []
+
+    @property
+    def ended(self) -> bool:
+        return self.stream.ended
+
+    def feed(self, chunk: bytes):
+        for segment in self.stream.feed(chunk):
+            self._start(segment)
+
+    def _start(self, segment: Tuple[int, int]):
+        index = len(self.tasks)
+        self.texts.append(None)
+        self.tasks.append(asyncio.create_task(self._transcribe(index, self.stream.segment_wav(segment))))
+
+    async def _transcribe(self, index: int, audio: bytes) -> str:
+        text = (await self.transcribe(audio)).strip()
+        self.texts[index] = text
+        if self.on_interim:
+            # Segments can finish out of order; report the contiguous prefix that is known
+            known = []
+            for segment_text in self.texts:
+                if segment_text is None:
+                    break
+                known.append(segment_text)
+            await self.on_interim(" ".join(filter(None, known)), index)
+        return text
+
+    async def finish(self) -> str:
+        """Close the last segment and return the full transcript"""
+        if not self.stream.ended:
+            self.stream.ended = True
+            segment = self.stream.close_segment()
+            if segment:
+                self._start(segment)
+        if not self.tasks:
+            return ""
+        texts = await asyncio.gather(*self.tasks)
+        return " ".join(text for text in texts if text)
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
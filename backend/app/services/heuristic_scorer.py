@@ -0,0 +1,113 @@
+"""
+Keyword heuristic scorer used when responses have no AI analysis
+
+Scores each response 5-7 on six dimensions from keyword mentions and length.
+Keyword hits use substring semantics ("data" also counts inside "database").
+With pyahocorasick installed, every keyword is matched in a single pass of a
+C Aho-Corasick automaton built at import time. Otherwise a de-duplicated
+keyword table is scanned with str containment; a combined regex measured
+slower than both in CPython. benchmarks/heuristic_scorer_bench.py compares
+them with the per-dimension scans this replaced.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # Listed in requirements.txt; without it fall back to substring scans
+    ahocorasick = None
+
+# Keyword groups; a response "mentions" a group if any keyword occurs in it
+KEYWORD_GROUPS = {
+    "technical": ("data", "analysis", "python", "sql", "visualization", "statistics", "machine learning", "algorithm"),
+    "structured": ("step", "process", "approach", "solution", "method"),
+    "collaboration": ("team", "collaborate", "work together", "help", "support"),
+    "engagement": ("project", "work", "experience", "learn", "develop"),
+    "reasoning": ("because", "therefore", "however", "specifically", "example", "instance"),
+    "experience": ("internship", "project", "work", "experience", "previous", "before", "studied", "learned"),
+    "training": ("course", "class", "training", "certification"),
+}
+GROUP_BITS = {group: 1 << position for position, group in enumerate(KEYWORD_GROUPS)}
+TECHNICAL, STRUCTURED, COLLABORATION, ENGAGEMENT, REASONING, EXPERIENCE, TRAINING = GROUP_BITS.values()
+
+# Score dimensions, in the order the callers report them
+DIMENSIONS = ("technical", "communication", "problem_solving", "cultural_fit", "relevance", "experience")
+
+
+def _keyword_masks() -> List[Tuple[str, int]]:
+    """Bitmask of groups found when each keyword matches
+
+    A match also covers every keyword it contains ("work together" implies
+    "work"), since the automaton reports only the keywords it ends on.
+    """
+    keywords = {keyword for group in KEYWORD_GROUPS.values() for keyword in group}
+    masks = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        mask = 0
+        for group, group_keywords in KEYWORD_GROUPS.items():
+            if any(other in keyword for other in group_keywords):
+                mask |= GROUP_BITS[group]
+        masks.append((keyword, mask))
+    return masks
+
+
+KEYWORD_MASKS = _keyword_masks()
+
+
+def _build_automaton():
+    automaton = ahocorasick.Automaton()
+    for keyword, mask in KEYWORD_MASKS:
+        automaton.add_word(keyword, mask)
+    automaton.make_automaton()
+    return automaton
+
+
+_automaton = _build_automaton() if ahocorasick is not None else None
+MATCHER = "aho-corasick" if _automaton is not None else "substring"
+
+
+def group_mask(content: str) -> int:
+    """Bitmask of keyword groups mentioned in lowercased content"""
+    mask = 0
+    if _automaton is not None:
+        for _, keyword_mask in _automaton.iter(content):
+            mask |= keyword_mask
+        return mask
+    for keyword, keyword_mask in KEYWORD_MASKS:
+        if keyword_mask & ~mask and keyword in content:
+            mask |= keyword_mask
+    return mask
+
+
+def score_response(text: str) -> Dict[str, float]:
+    """Heuristic 0-10 scores for one response"""
+    content = text.lower()
+    word_count = len(content.split())
+    mask = group_mask(content)
+
+    return {
+        "technical": 7.0 if mask & TECHNICAL else 5.0,
+        "communication": 7.0 if word_count > 20 else 6.0 if word_count > 10 else 5.0,
+        "problem_solving": 7.0 if mask & STRUCTURED else 5.0,
+        "cultural_fit": 7.0 if mask & COLLABORATION else 6.0 if mask & ENGAGEMENT else 5.0,
+        "relevance": 7.0 if mask & REASONING else 6.0 if word_count > 15 else 5.0,
+        "experience": 7.0 if mask & EXPERIENCE else 6.0 if mask & TRAINING else 5.0,
+    }
+
+
+def score_responses(texts: Iterable[str]) -> List[Dict[str, float]]:
+    """Heuristic 0-10 scores for a batch of responses"""
+    return [score_response(text) for text in texts]
+
+
+def average_scores(texts: Iterable[str]) -> Tuple[int, Dict[str, float]]:
+    """Score the non-empty responses; returns (count, per-dimension averages on the 0-100 scale)"""
+    totals = dict.fromkeys(DIMENSIONS, 0.0)
+    count = 0
+    for scores in score_responses(text for text in texts if text):
+        for dimension in DIMENSIONS:
+            totals[dimension] += scores[dimension]
+        count += 1
+    if not count:
+        return 0, totals
+    return count, {dimension: total / count * 10 for dimension, total in totals.items()}
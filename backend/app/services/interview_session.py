@@ -0,0 +1,138 @@
+"""
+In-memory interview state for live WebSocket turns
+
+The interview, candidate and stored questions are read once when the first
+connection for an interview opens. Questions asked and answers given over the
+socket are then tracked here, so turns pass their context to AIService
+instead of querying the database every time.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class SessionQuestion:
+    content: str
+    expected_points: List[str] = field(default_factory=list)
+
+
+@dataclass
+class InterviewSession:
+    """Role focus, candidate summary, ordered questions and turn history of one interview"""
+
+    interview_id: str
+    role_focus: str = "General"
+    difficulty: str = "medium"
+    candidate_summary: Dict[str, Any] = field(default_factory=dict)
+    questions: List[SessionQuestion] = field(default_factory=list)
+    current_index: int = -1
+    history: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def current_question(self) -> Optional[SessionQuestion]:
+        if 0 <= self.current_index < len(self.questions):
+            return self.questions[self.current_index]
+        return None
+
+    def ask(self, content: str, expected_points: Optional[List[str]] = None):
+        """Make content the question the candidate is now answering"""
+        if not content:
+            return
+        self.questions.append(SessionQuestion(content, list(expected_points or [])))
+        self.current_index = len(self.questions) - 1
+
+    def record_turn(self, response_text: str, analysis: Optional[Dict[str, Any]]):
+        """Add an answer to the current question to the history"""
+        question = self.current_question
+        self.history.append({
+            "question": question.content if question else None,
+            "response": response_text,
+            "overall_score": (analysis or {}).get("overall_score"),
+        })
+
+    def turn_context(self) -> Dict[str, Any]:
+        """Keyword arguments for AIService turn methods
+
+        Without a current question the question is left as None, so AIService
+        still looks up the latest stored one.
+        """
+        question = self.current_question
+        return {
+            "question_context": question.content if question else None,
+            "role_focus": self.role_focus,
+            "expected_points": question.expected_points if question else None,
+        }
+
+
+def load_session(interview_id: str) -> InterviewSession:
+    """Read an interview's state from the database (blocking)"""
+    from app.database import SessionLocal
+    from app.models.interview import Interview
+    from app.models.question import Question
+
+    db = SessionLocal()
+    try:
+        session = InterviewSession(interview_id=interview_id)
+        interview = db.query(Interview).filter(Interview.id == int(interview_id)).first()
+        if not interview:
+            return session
+
+        session.role_focus = interview.role_focus or "General"
+        session.difficulty = interview.difficulty_level or "medium"
+        candidate = interview.candidate
+        if candidate:
+            session.candidate_summary = {
+                "name": candidate.full_name,
+                "current_position": candidate.current_position,
+                "experience_years": candidate.experience_years,
+                "experience_level": candidate.experience_level,
+                "skills": candidate.extracted_skills or candidate.skills or [],
+            }
+
+        questions = db.query(Question.content, Question.expected_answer_points).filter(
+            Question.interview_id == int(interview_id)
+        ).order_by(Question.id).all()
+        session.questions = [SessionQuestion(content, list(points or [])) for content, points in questions]
+        session.current_index = len(session.questions) - 1
+        return session
+    finally:
+        db.close()
+
+
+class InterviewSessionStore:
+    """Sessions of interviews with open connections, shared by their sockets"""
+
+    def __init__(self):
+        self._sessions: Dict[str, InterviewSession] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    async def open(self, interview_id: str) -> InterviewSession:
+        """Return the interview's session, loading it on first use"""
+        session = self._sessions.get(interview_id)
+        if session:
+            return session
+
+        # Sockets connecting at the same time share one load
+        task = self._loading.get(interview_id)
+        if task is None:
+            task = asyncio.create_task(asyncio.to_thread(load_session, interview_id))
+            self._loading[interview_id] = task
+        try:
+            session = await task
+        finally:
+            self._loading.pop(interview_id, None)
+
+        session = self._sessions.setdefault(interview_id, session)
+        print(f"📋 Loaded session for interview {interview_id}: {len(session.questions)} questions, role {session.role_focus}")
+        return session
+
+    def get(self, interview_id: str) -> Optional[InterviewSession]:
+        return self._sessions.get(interview_id)
+
+    def close(self, interview_id: str):
+        self._sessions.pop(interview_id, None)
+        task = self._loading.pop(interview_id, None)
+        if task:
+            task.cancel()
@@ -0,0 +1,35 @@
+"""
+Background job handlers for AI work that should not hold an HTTP request open
+"""
+
+from typing import Any, Callable, Awaitable, Dict
+
+from app.services.ai_service import AIService
+from app.services.job_queue import JobQueue
+from app.services.question_bank import refill_pool
+
+
+def register_job_handlers(queue: JobQueue, ai_service: AIService):
+    """Register the AI job types on the queue"""
+
+    async def final_analysis(payload: Dict[str, Any], report_progress: Callable[[str], Awaitable[None]]):
+        interview_id = str(payload["interview_id"])
+        await report_progress("Generating final analysis")
+        result = await ai_service.generate_final_analysis(
+            interview_id, rescore_responses=payload.get("rescore_responses", False)
+        )
+        return {"interview_id": interview_id, "status": result.get("status")}
+
+    async def resume_analysis(payload: Dict[str, Any], report_progress: Callable[[str], Awaitable[None]]):
+        await report_progress("Analyzing resume")
+        return await ai_service.analyze_resume_text(
+            payload["resume_text"], payload.get("role_focus", "General"), reanalyze=payload.get("reanalyze", False)
+        )
+
+    async def question_bank_refresh(payload: Dict[str, Any], report_progress: Callable[[str], Awaitable[None]]):
+        await report_progress("Refilling question bank")
+        return await refill_pool(ai_service, payload["role_focus"], payload["difficulty"], report_progress=report_progress)
+    
+    queue.register("final_analysis", final_analysis)
+    queue.register("resume_analysis", resume_analysis)
+    queue.register("question_bank_refresh", question_bank_refresh)
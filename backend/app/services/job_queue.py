@@ -0,0 +1,246 @@
+"""
+Database-backed background job queue
+
+Jobs are rows in the jobs table. Worker coroutines in every process claim due
+jobs with SELECT ... FOR UPDATE SKIP LOCKED, so several workers and processes
+can share the queue without claiming the same job twice. Failed jobs are
+retried with exponential backoff and marked dead after max_attempts.
+"""
+
+import asyncio
+import os
+import socket
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+
+# handler(payload, report_progress) -> JSON-serializable result
+JobHandler = Callable[[Dict[str, Any], Callable[[str], Awaitable[None]]], Awaitable[Any]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _dialect_insert(db):
+    """INSERT construct supporting ON CONFLICT for the session's database"""
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+class JobQueue:
+    """Enqueue jobs and run them on worker coroutines"""
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of job_type"""
+        self.handlers[job_type] = handler
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None,
+                      max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        """Add a job, or return the queued/running job with the same dedupe_key"""
+        job = await asyncio.to_thread(self._db_enqueue, job_type, payload, dedupe_key, max_attempts)
+        self._wakeup.set()
+        return job
+
+    def _db_enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: Optional[str],
+                    max_attempts: Optional[int]) -> Dict[str, Any]:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            values = {
+                "job_type": job_type,
+                "payload": payload,
+                "dedupe_key": dedupe_key,
+                "status": JobStatus.QUEUED,
+                "attempts": 0,
+                "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+                "run_at": _now(),
+                "progress": "Queued"
+            }
+            if not dedupe_key:
+                job = Job(**values)
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+                print(f"📥 Enqueued {job_type} job {job.id}")
+                return job.to_dict()
+
+            # The partial unique index on active dedupe keys makes check-and-insert atomic:
+            # a concurrent enqueue of the same key inserts nothing and reuses the winner's job.
+            # Retried in case the existing job finishes between the insert and the lookup.
+            for _ in range(3):
+                job_id = db.execute(
+                    _dialect_insert(db)(Job).values(**values).on_conflict_do_nothing().returning(Job.id)
+                ).scalar()
+                db.commit()
+                if job_id is not None:
+                    print(f"📥 Enqueued {job_type} job {job_id}")
+                    return db.query(Job).filter(Job.id == job_id).one().to_dict()
+
+                existing = db.query(Job).filter(
+                    Job.dedupe_key == dedupe_key,
+                    Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+                ).first()
+                if existing:
+                    print(f"⏳ Reusing {existing.status} job {existing.id} for {dedupe_key}")
+                    return existing.to_dict()
+            raise RuntimeError(f"Could not enqueue or find an active job for {dedupe_key}")
+        finally:
+            db.close()
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            return job.to_dict() if job else None
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Claim the next due job, including running jobs whose lease expired"""
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            now = _now()
+            lease_expired = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            job = db.query(Job).filter(
+                Job.job_type.in_(list(self.handlers)),
+                or_(
+                    and_(Job.status == JobStatus.QUEUED, Job.run_at <= now),
+                    and_(Job.status == JobStatus.RUNNING, Job.locked_at < lease_expired)
+                )
+            ).order_by(Job.run_at).with_for_update(skip_locked=True).first()
+            if not job:
+                db.rollback()
+                return None
+
+            # Compare-and-set on attempts so the claim stays exclusive even where
+            # the database ignores SKIP LOCKED
+            attempts = (job.attempts or 0) + 1
+            claimed = db.query(Job).filter(Job.id == job.id, Job.attempts == job.attempts).update({
+                "status": JobStatus.RUNNING,
+                "attempts": attempts,
+                "locked_at": now,
+                "locked_by": self.worker_id,
+                "progress": "Running"
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return None
+            return {"id": job.id, "job_type": job.job_type, "payload": job.payload or {},
+                    "attempts": attempts, "max_attempts": job.max_attempts}
+        finally:
+            db.close()
+
+    def _update(self, job_id: int, **fields):
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(fields, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+
+        async def report_progress(message: str):
+            await asyncio.to_thread(self._update, job_id, progress=message[:500])
+
+        print(f"⚙️ Running {job['job_type']} job {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+        try:
+            result = await asyncio.wait_for(
+                self.handlers[job["job_type"]](job["payload"], report_progress),
+                timeout=settings.JOB_TIMEOUT_SECONDS
+            )
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without using up an attempt
+            await asyncio.shield(asyncio.to_thread(
+                self._update, job_id, status=JobStatus.QUEUED, attempts=job["attempts"] - 1,
+                locked_at=None, locked_by=None, progress="Requeued after worker shutdown"
+            ))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ Job {job_id} failed: {error}")
+            if job["attempts"] >= job["max_attempts"]:
+                await asyncio.to_thread(
+                    self._update, job_id, status=JobStatus.DEAD, last_error=traceback.format_exc()[-4000:],
+                    progress=f"Failed after {job['attempts']} attempts", locked_at=None, completed_at=_now()
+                )
+                print(f"💀 Job {job_id} moved to dead after {job['attempts']} attempts")
+            else:
+                delay = settings.JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                await asyncio.to_thread(
+                    self._update, job_id, status=JobStatus.QUEUED, last_error=error,
+                    run_at=_now() + timedelta(seconds=delay), locked_at=None, locked_by=None,
+                    progress=f"Retrying in {delay}s"
+                )
+            return
+
+        await asyncio.to_thread(
+            self._update, job_id, status=JobStatus.SUCCEEDED, result=result, progress="Completed",
+            locked_at=None, completed_at=_now()
+        )
+        print(f"✅ Job {job_id} succeeded")
+
+    async def _worker(self, number: int):
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                print(f"❌ Job worker {number} could not poll the queue: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Recording the outcome failed; the lease expires and another worker retries the job
+                print(f"❌ Job worker {number} could not finish job {job['id']}: {e}")
+
+    def start(self, workers: int = settings.JOB_WORKERS):
+        """Start worker coroutines on the running event loop"""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(workers)]
+        print(f"✅ Started {workers} job workers ({', '.join(self.handlers)})")
+
+    async def stop(self):
+        """Stop the workers; jobs still running are handed back to the queue"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+# Global job queue instance
+job_queue = JobQueue()
@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for deterministic LLM completions
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class LLMCache:
+    """Two-tier (in-memory LRU + database) cache keyed on model, prompt and sampling parameters"""
+
+    # Prune the persistent tier every N stores
+    PRUNE_INTERVAL = 100
+
+    def __init__(
+        self,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+        persistent: bool = settings.LLM_CACHE_PERSISTENT,
+        persistent_max_rows: int = settings.LLM_CACHE_PERSISTENT_MAX_ROWS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.persistent_max_rows = persistent_max_rows
+
+        # key -> (expires_at_monotonic, response_text)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._stores_since_prune = 0
+        self.counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], **params) -> str:
+        """Build the cache key from the model, prompt hash and sampling parameters"""
+        prompt_hash = hashlib.sha256(
+            json.dumps(messages, sort_keys=True, ensure_ascii=False).encode()
+        ).hexdigest()
+        key_string = json.dumps(
+            {"model": model, "prompt": prompt_hash, "params": params},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(key_string.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a cached completion, memory first then the database"""
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self.persistent:
+            try:
+                value = await asyncio.to_thread(self._db_get, key)
+            except Exception as e:
+                print(f"❌ LLM cache read error: {e}")
+                self.counters["errors"] += 1
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                self.counters["persistent_hits"] += 1
+                return value
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, model: str, value: str):
+        """Store a completion in both tiers"""
+        self._remember(key, value)
+        self.counters["stores"] += 1
+
+        if self.persistent:
+            self._stores_since_prune += 1
+            prune = self._stores_since_prune >= self.PRUNE_INTERVAL
+            if prune:
+                self._stores_since_prune = 0
+            try:
+                await asyncio.to_thread(self._db_set, key, model, value, prune)
+            except Exception as e:
+                print(f"❌ LLM cache write error: {e}")
+                self.counters["errors"] += 1
+
+    def _remember(self, key: str, value: str):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _db_get(self, key: str) -> Optional[str]:
+        """Read a non-expired entry from the persistent tier"""
+        from app.database import SessionLocal
+        from app.models.llm_cache import LLMCacheEntry
+
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.key == key,
+                LLMCacheEntry.expires_at > datetime.now(timezone.utc)
+            ).first()
+            if not entry:
+                return None
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+            return entry.response_text
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, model: str, value: str, prune: bool):
+        """Upsert an entry in the persistent tier, optionally pruning old rows"""
+        from app.database import SessionLocal
+        from app.models.llm_cache import LLMCacheEntry
+
+        db = SessionLocal()
+        try:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+            if entry:
+                entry.response_text = value
+                entry.expires_at = expires_at
+            else:
+                db.add(LLMCacheEntry(key=key, model=model, response_text=value, expires_at=expires_at))
+            db.commit()
+
+            if prune:
+                db.query(LLMCacheEntry).filter(
+                    LLMCacheEntry.expires_at <= datetime.now(timezone.utc)
+                ).delete(synchronize_session=False)
+                overflow = db.query(LLMCacheEntry).count() - self.persistent_max_rows
+                if overflow > 0:
+                    oldest = db.query(LLMCacheEntry.key).order_by(LLMCacheEntry.created_at).limit(overflow)
+                    db.query(LLMCacheEntry).filter(
+                        LLMCacheEntry.key.in_(oldest.scalar_subquery())
+                    ).delete(synchronize_session=False)
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def clear(self):
+        """Clear both cache tiers"""
+        self._entries.clear()
+        if self.persistent:
+            await asyncio.to_thread(self._db_clear)
+        print("✅ LLM cache cleared")
+
+    def _db_clear(self):
+        from app.database import SessionLocal
+        from app.models.llm_cache import LLMCacheEntry
+
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheEntry).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters"""
+        lookups = self.counters["memory_hits"] + self.counters["persistent_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["persistent_hits"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self.persistent,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global LLM cache instance
+llm_cache = LLMCache()
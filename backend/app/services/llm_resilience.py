@@ -0,0 +1,230 @@
+"""
+Retry, deadline, hedging and circuit-breaking layer for OpenAI calls
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import openai
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Latency samples kept per operation for the hedging threshold
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(Exception):
+    """The provider circuit is open; the call was rejected without being sent"""
+
+
+class DeadlineExceededError(Exception):
+    """The call did not succeed within its deadline, including retries"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, timeouts, connection failures and 5xx responses are worth retrying"""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Errors that suggest the provider is unhealthy (rate limits are load, not outage)"""
+    return is_retryable(error) and not isinstance(error, openai.RateLimitError)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on a 429/5xx response, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a provider failure; returns True if this opened the circuit"""
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            opened = self.state != "open"
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+            return opened
+        return False
+
+    def release_probe(self):
+        """A half-open probe ended without a verdict (e.g. a client error)"""
+        self._probe_in_flight = False
+
+
+class ResilientCaller:
+    """Run provider calls with jittered backoff, deadlines, hedging and a circuit breaker"""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_SECONDS)
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def _count(self, name: str, operation: str):
+        self.counters[name] += 1
+        self.counters[f"{operation}.{name}"] += 1
+
+    def p95(self, operation: str) -> Optional[float]:
+        samples = self.latencies[operation]
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    async def call(self, operation: str, fn: Callable[[], Awaitable[T]], hedge: bool = False,
+                   deadline_seconds: Optional[float] = None) -> T:
+        """Call fn until it succeeds, a non-retryable error occurs, or the deadline passes
+
+        fn must be safe to run more than once (retries and hedged duplicates).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (deadline_seconds or settings.LLM_CALL_DEADLINE_SECONDS)
+        self._count("calls", operation)
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow():
+                self._count("circuit_rejections", operation)
+                raise CircuitOpenError(f"OpenAI circuit open, rejecting {operation} call")
+            probing = self.breaker.state == "half_open"
+
+            remaining = deadline - loop.time()
+            started = loop.time()
+            try:
+                if hedge and settings.LLM_HEDGING_ENABLED:
+                    result = await asyncio.wait_for(self._hedged(operation, fn), timeout=remaining)
+                else:
+                    result = await asyncio.wait_for(fn(), timeout=remaining)
+            except asyncio.CancelledError:
+                # A cancelled probe has no verdict; without this the breaker stays half-open and rejects every call
+                if probing:
+                    self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count("timeouts", operation)
+                if is_provider_failure(e):
+                    if self.breaker.record_failure():
+                        self._count("circuit_opened", operation)
+                        print(f"🔌 OpenAI circuit opened after {self.breaker.consecutive_failures} consecutive failures")
+                else:
+                    self.breaker.release_probe()
+
+                attempt += 1
+                if not is_retryable(e) or attempt > settings.LLM_MAX_RETRIES:
+                    self._count("failures", operation)
+                    raise
+
+                backoff = random.uniform(0, min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+                backoff = max(backoff, _retry_after(e) or 0)
+                if loop.time() + backoff >= deadline:
+                    self._count("deadline_exceeded", operation)
+                    raise DeadlineExceededError(f"{operation} call exceeded its deadline after {attempt} attempts: {e}") from e
+
+                self._count("retries", operation)
+                print(f"🔁 Retrying {operation} call in {backoff:.1f}s (attempt {attempt + 1}): {type(e).__name__}")
+                await asyncio.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            self.latencies[operation].append(loop.time() - started)
+            self._count("successes", operation)
+            return result
+
+    async def _hedged(self, operation: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Start a duplicate request if the first is slower than the operation's p95"""
+        p95 = self.p95(operation)
+        primary = asyncio.ensure_future(fn())
+        tasks = [primary]
+        # Cancel whatever is still running when this returns, fails or is cancelled by the caller's timeout
+        try:
+            if p95 is None:
+                return await primary
+
+            delay = max(p95, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._count("hedges_started", operation)
+            hedged = asyncio.ensure_future(fn())
+            tasks.append(hedged)
+            pending = {primary, hedged}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is hedged:
+                            self._count("hedges_won", operation)
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters per behaviour and operation, breaker state and latency percentiles"""
+        latency = {}
+        for operation, samples in self.latencies.items():
+            if samples:
+                ordered = sorted(samples)
+                latency[operation] = {
+                    "samples": len(ordered),
+                    "p50": round(ordered[len(ordered) // 2], 3),
+                    "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 3)
+                }
+        return {
+            "counters": dict(self.counters),
+            "circuit": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.consecutive_failures
+            },
+            "latency_seconds": latency,
+            "hedging_enabled": settings.LLM_HEDGING_ENABLED
+        }
+
+
+# Global resilience layer shared by all OpenAI callers
+llm_resilience = ResilientCaller()
@@ -0,0 +1,194 @@
+"""
+Response schemas for structured LLM output
+
+Each model is validated with model_validate_json, which runs pydantic's
+compiled validator for the schema directly on the raw completion text.
+"""
+
+import re
+from typing import Annotated, Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# Rubric dimension scored 0-10
+RubricScore = Annotated[float, Field(ge=0, le=10)]
+# Final-report score on the 0-100 scale
+ReportScore = Annotated[float, Field(ge=0, le=100)]
+
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+class LLMOutputError(Exception):
+    """The model did not produce output matching the requested schema"""
+
+
+class LLMSchema(BaseModel):
+    """Base for LLM output schemas; unknown keys from the model are dropped"""
+
+    model_config = ConfigDict(extra="ignore")
+
+
+class ResponseAnalysis(LLMSchema):
+    """Rubric scoring of a single candidate response"""
+
+    technical_accuracy: RubricScore
+    communication_clarity: RubricScore
+    depth_of_knowledge: RubricScore
+    problem_solving_approach: RubricScore
+    relevance_to_question: RubricScore
+    professional_experience: RubricScore
+    overall_score: Optional[RubricScore] = None
+    sentiment_score: float = 0.5
+    confidence_score: float = 0.5
+    relevance_score: float = 0.5
+    key_points_mentioned: List[str] = []
+    missing_points: List[str] = []
+    strengths_identified: List[str] = []
+    areas_for_improvement: List[str] = []
+    feedback: str = ""
+    difficulty_recommendation: str = "same"
+    follow_up_suggestions: List[str] = []
+
+    @model_validator(mode="after")
+    def fill_overall_score(self):
+        """Average the rubric dimensions when the model leaves overall_score out"""
+        if self.overall_score is None:
+            scores = [
+                self.technical_accuracy,
+                self.communication_clarity,
+                self.depth_of_knowledge,
+                self.problem_solving_approach,
+                self.relevance_to_question,
+                self.professional_experience
+            ]
+            self.overall_score = sum(scores) / len(scores)
+        return self
+
+
+class IndexedResponseAnalysis(ResponseAnalysis):
+    """Response analysis tagged with its 1-based position in a batch"""
+
+    index: Optional[int] = None
+
+
+class BatchResponseAnalysis(LLMSchema):
+    analyses: List[IndexedResponseAnalysis]
+
+
+class NextAction(LLMSchema):
+    """What the interviewer does after a candidate response"""
+
+    action_type: str = "next_question"
+    content: str = ""
+    difficulty_adjustment: str = "same"
+    reasoning: str = ""
+
+
+class GeneratedQuestion(LLMSchema):
+    question: str
+    question_type: str = "behavioral"
+    difficulty: str = "medium"
+    skills_tested: List[str] = []
+    expected_answer_points: List[str] = []
+
+
+class AdaptiveQuestion(GeneratedQuestion):
+    adaptive_reasoning: str = ""
+    follow_up_type: str = "deeper_dive"
+
+
+class QuestionList(LLMSchema):
+    questions: List[GeneratedQuestion]
+
+
+class InterviewInsights(LLMSchema):
+    best_response: str = ""
+    weakest_response: str = ""
+    consistency: str = ""
+    growth_potential: str = ""
+
+
+class FinalAnalysis(LLMSchema):
+    """Whole-interview evaluation on the 0-100 scale"""
+
+    overall_score: ReportScore
+    communication_score: ReportScore
+    technical_score: ReportScore
+    problem_solving_score: ReportScore
+    cultural_fit_score: ReportScore
+    professional_experience_score: ReportScore
+    detailed_scores_breakdown: Dict[str, float] = {}
+    strengths: List[str] = []
+    areas_for_improvement: List[str] = []
+    hire_recommendation: str = "no_hire"
+    confidence_level: float = 0.8
+    detailed_feedback: str = ""
+    next_steps: List[str] = []
+    interview_insights: InterviewInsights = InterviewInsights()
+    role_specific_assessment: str = ""
+
+
+class ResumeAnalysis(LLMSchema):
+    """Candidate profile extracted from resume text"""
+
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    current_position: Optional[str] = None
+    current_company: Optional[str] = None
+    experience_years: Optional[float] = None
+    skills: List[str] = []
+    bio: Optional[str] = None
+    summary: Optional[str] = None
+    education: List[Dict[str, Any]] = []
+    work_experience: List[Dict[str, Any]] = []
+    projects: List[Dict[str, Any]] = []
+    certifications: List[str] = []
+    languages: List[str] = []
+    linkedin_url: Optional[str] = None
+    github_url: Optional[str] = None
+    portfolio_url: Optional[str] = None
+
+    # Resume extraction output varies a lot in shape; coerce the common variants
+    # instead of failing the whole analysis on them
+
+    @field_validator("experience_years", mode="before")
+    @classmethod
+    def parse_years(cls, value):
+        """"5+", "about 3.5 years" -> 5.0, 3.5; no number -> None"""
+        if isinstance(value, str):
+            match = NUMBER.search(value)
+            return float(match.group()) if match else None
+        return value
+
+    @field_validator("full_name", "email", "phone", "current_position", "current_company", "bio", "summary",
+                     "linkedin_url", "github_url", "portfolio_url", mode="before")
+    @classmethod
+    def scalar_to_str(cls, value):
+        if isinstance(value, (int, float)):
+            return str(value)
+        return value
+
+    @field_validator("skills", "certifications", "languages", mode="before")
+    @classmethod
+    def split_string_list(cls, value):
+        """"Python, Go" -> ["Python", "Go"]"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = value.split(",")
+        if isinstance(value, list):
+            return [str(item).strip() for item in value if item is not None and str(item).strip()]
+        return value
+
+    @field_validator("education", "work_experience", "projects", mode="before")
+    @classmethod
+    def wrap_description_list(cls, value):
+        """"BSc CS, MIT" -> [{"description": "BSc CS, MIT"}]"""
+        if value is None:
+            return []
+        if isinstance(value, (str, dict)):
+            value = [value]
+        if isinstance(value, list):
+            return [{"description": item} if isinstance(item, str) else item for item in value if item is not None]
+        return value
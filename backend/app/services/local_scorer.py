@@ -0,0 +1,345 @@
+"""
+Local first-pass scorer for candidate responses
+
+A ridge regression over TF-IDF similarity to the question and its expected
+answer points, point coverage, length, structure markers and keyword groups
+predicts the six rubric scores without a network call. Weights are trained
+offline from stored LLM analyses by scripts/train_local_scorer.py.
+
+Each prediction carries a 90% interval half-width from the training residuals
+and the feature vector's leverage; callers escalate to the LLM when it is too
+wide or the response lies outside the training data. Without numpy or a
+weights file the scorer is disabled and only fallback_analysis is available,
+which then uses the keyword heuristics.
+"""
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: every response is scored by the LLM
+    np = None
+
+from app.core.config import settings
+from app.services import heuristic_scorer
+
+RUBRIC_DIMENSIONS = (
+    "technical_accuracy",
+    "communication_clarity",
+    "depth_of_knowledge",
+    "problem_solving_approach",
+    "relevance_to_question",
+    "professional_experience",
+)
+
+FEATURE_NAMES = (
+    "reference_similarity",
+    "question_similarity",
+    "point_coverage",
+    "has_expected_points",
+    "log_words",
+    "log_sentences",
+    "mean_word_length",
+    "lexical_diversity",
+    "has_numbers",
+) + tuple(f"mentions_{group}" for group in heuristic_scorer.KEYWORD_GROUPS)
+
+# z for a two-sided 90% prediction interval
+INTERVAL_Z = 1.645
+# Responses per term-frequency matrix (bounds memory when featurizing training data)
+SIMILARITY_CHUNK = 512
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+SENTENCE_PATTERN = re.compile(r"[.!?]+(?:\s|$)")
+DIGIT_PATTERN = re.compile(r"\d")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from had has have i if in is it its me my "
+    "of on or so that the their then there they this to was we were what when which who "
+    "will with would you your um uh like just really very also".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased content tokens (stopwords and single characters dropped)"""
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def build_vocabulary(documents: Iterable[str], size: int) -> Tuple[Dict[str, int], List[float]]:
+    """Most frequent terms by document frequency, with smoothed IDF weights"""
+    document_frequency: Dict[str, int] = {}
+    total = 0
+    for document in documents:
+        total += 1
+        for token in set(tokenize(document)):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+
+    terms = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:size]
+    vocabulary = {term: index for index, term in enumerate(terms)}
+    idf = [math.log((1 + total) / (1 + document_frequency[term])) + 1.0 for term in terms]
+    return vocabulary, idf
+
+
+def point_coverage(response_tokens: set, expected_points: Sequence[str]) -> List[bool]:
+    """Whether the response mentions at least half of each expected point's content tokens"""
+    covered = []
+    for point in expected_points:
+        point_tokens = set(tokenize(point))
+        covered.append(bool(point_tokens) and len(point_tokens & response_tokens) * 2 >= len(point_tokens))
+    return covered
+
+
+@dataclass
+class LocalScore:
+    """A local prediction of the six rubric scores"""
+
+    scores: Dict[str, float]
+    interval: float  # Widest 90% interval half-width across dimensions, in rubric points
+    leverage: float
+    confident: bool
+    covered_points: List[str]
+    missing_points: List[str]
+    reference_similarity: float
+
+
+class LocalScorer:
+    """Ridge-regression rubric scorer loaded from a weights file"""
+
+    def __init__(self, weights_file: Optional[str] = settings.LOCAL_SCORER_WEIGHTS_FILE,
+                 max_interval: float = settings.LOCAL_SCORER_MAX_INTERVAL):
+        self.weights_file = weights_file
+        self.max_interval = max_interval
+        self._loaded = False
+        self.vocabulary: Dict[str, int] = {}
+        self.coef = None
+        self.counters = {"confident": 0, "escalated": 0}
+
+    def load(self) -> bool:
+        """Load the weights file; returns whether the scorer is usable"""
+        self._loaded = True
+        self.coef = None
+        if not settings.LOCAL_SCORER_ENABLED or np is None:
+            return False
+        if not os.path.exists(self.weights_file):
+            print(f"⚠️ Local scorer weights not found at {self.weights_file}, scoring with the LLM only")
+            return False
+
+        try:
+            with open(self.weights_file) as f:
+                weights = json.load(f)
+            self.use_weights(weights)
+        except Exception as e:
+            print(f"❌ Failed to load local scorer weights from {self.weights_file}: {e}")
+            self.coef = None
+            return False
+
+        print(f"✅ Local scorer loaded ({len(self.vocabulary)} terms, trained on {weights.get('samples', '?')} responses)")
+        return True
+
+    def use_weights(self, weights: Dict[str, Any]):
+        """Install a vocabulary and, when present, a fitted model (training builds features from the vocabulary alone)"""
+        if "coef" in weights and (tuple(weights["features"]) != FEATURE_NAMES or tuple(weights["targets"]) != RUBRIC_DIMENSIONS):
+            raise ValueError("feature or target layout does not match this version")
+
+        self._loaded = True
+        self.idf = np.asarray(weights["idf"], dtype=np.float64)
+        self.vocabulary = {term: index for index, term in enumerate(weights["vocabulary"])}
+        self.coef = None
+        if "coef" in weights:
+            self.mean = np.asarray(weights["mean"], dtype=np.float64)
+            self.scale = np.asarray(weights["scale"], dtype=np.float64)
+            self.coef = np.asarray(weights["coef"], dtype=np.float64)  # (features + 1) x targets, intercept last
+            self.inverse_gram = np.asarray(weights["inverse_gram"], dtype=np.float64)
+            self.residual_std = np.asarray(weights["residual_std"], dtype=np.float64)
+            self.max_leverage = float(weights["max_leverage"])
+
+    @property
+    def enabled(self) -> bool:
+        if not self._loaded:
+            self.load()
+        return self.coef is not None
+
+    def _term_ids(self, tokens: Sequence[str]) -> List[int]:
+        vocabulary = self.vocabulary
+        return [vocabulary[token] for token in tokens if token in vocabulary]
+
+    def _similarities(self, responses: List[List[int]], questions: List[List[int]], references: List[List[int]]):
+        """TF-IDF cosine of each response with its reference text and with its question
+
+        All documents share one term-frequency matrix restricted to the terms that
+        occur in the batch, so the work is a few array operations per batch.
+        """
+        documents = responses + questions + references
+        lengths = np.fromiter((len(document) for document in documents), dtype=np.int64, count=len(documents))
+        rows = np.repeat(np.arange(len(documents)), lengths)
+        columns = np.fromiter(chain.from_iterable(documents), dtype=np.int64, count=int(lengths.sum()))
+        terms, local_columns = np.unique(columns, return_inverse=True)
+
+        weights = np.zeros((len(documents), len(terms)))
+        np.add.at(weights, (rows, local_columns), 1.0)
+        weights *= self.idf[terms]
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        weights /= np.where(norms > 0, norms, 1.0)
+
+        count = len(responses)
+        response_weights = weights[:count]
+        return (
+            np.einsum("ij,ij->i", response_weights, weights[2 * count:]),
+            np.einsum("ij,ij->i", response_weights, weights[count:2 * count]),
+        )
+
+    def features(self, texts: Sequence[str], questions: Sequence[Optional[str]],
+                 expected_points: Sequence[Optional[Sequence[str]]]):
+        """Feature matrix (one row per response) and the expected points each response covers"""
+        rows = []
+        masks = []
+        coverage = []
+        response_ids, question_ids, reference_ids = [], [], []
+        question_cache: Dict[str, List[int]] = {}
+        for text, question, points in zip(texts, questions, expected_points):
+            text = text or ""
+            points = [point for point in (points or []) if point]
+            tokens = tokenize(text)
+            token_set = set(tokens)
+            covered = point_coverage(token_set, points)
+            coverage.append(covered)
+
+            question = question or ""
+            if question not in question_cache:
+                question_cache[question] = self._term_ids(tokenize(question))
+            response_ids.append(self._term_ids(tokens))
+            question_ids.append(question_cache[question])
+            reference_ids.append(self._term_ids(tokenize(" ".join(points))) if points else question_cache[question])
+
+            words = text.split()
+            masks.append(heuristic_scorer.group_mask(text.lower()))
+            rows.append((
+                sum(covered) / len(points) if points else 0.0,
+                1.0 if points else 0.0,
+                math.log1p(len(words)),
+                math.log1p(len(SENTENCE_PATTERN.findall(text)) or (1 if words else 0)),
+                sum(map(len, words)) / len(words) if words else 0.0,
+                len(token_set) / len(tokens) if tokens else 0.0,
+                1.0 if DIGIT_PATTERN.search(text) else 0.0,
+            ))
+
+        matrix = np.empty((len(rows), len(FEATURE_NAMES)))
+        if rows:
+            for start in range(0, len(rows), SIMILARITY_CHUNK):
+                chunk = slice(start, start + SIMILARITY_CHUNK)
+                matrix[chunk, 0], matrix[chunk, 1] = self._similarities(response_ids[chunk], question_ids[chunk], reference_ids[chunk])
+            matrix[:, 2:9] = rows
+            bits = np.fromiter(heuristic_scorer.GROUP_BITS.values(), dtype=np.int64)
+            matrix[:, 9:] = (np.asarray(masks, dtype=np.int64)[:, None] & bits) > 0
+        return matrix, coverage
+
+    def score_batch(self, texts: Sequence[str], questions: Sequence[Optional[str]],
+                    expected_points: Sequence[Optional[Sequence[str]]]) -> Optional[List[LocalScore]]:
+        """Predict rubric scores for several responses; None when the scorer is disabled"""
+        if not self.enabled or not texts:
+            return None
+
+        matrix, coverage = self.features(texts, questions, expected_points)
+        design = np.hstack([(matrix - self.mean) / self.scale, np.ones((len(matrix), 1))])
+        predictions = np.clip(design @ self.coef, 0.0, 10.0)
+        leverage = np.einsum("ij,jk,ik->i", design, self.inverse_gram, design)
+        intervals = INTERVAL_Z * np.sqrt(1.0 + leverage)[:, None] * self.residual_std[None, :]
+        widest = intervals.max(axis=1)
+
+        results = []
+        for row, points in enumerate(expected_points):
+            points = [point for point in (points or []) if point]
+            confident = bool(widest[row] <= self.max_interval and leverage[row] <= self.max_leverage)
+            self.counters["confident" if confident else "escalated"] += 1
+            results.append(LocalScore(
+                scores={dimension: round(float(predictions[row, column]), 1) for column, dimension in enumerate(RUBRIC_DIMENSIONS)},
+                interval=round(float(widest[row]), 2),
+                leverage=round(float(leverage[row]), 4),
+                confident=confident,
+                covered_points=[point for point, hit in zip(points, coverage[row]) if hit],
+                missing_points=[point for point, hit in zip(points, coverage[row]) if not hit],
+                reference_similarity=float(matrix[row, 0]),
+            ))
+        return results
+
+    def score(self, text: str, question: Optional[str] = None,
+              expected_points: Optional[Sequence[str]] = None) -> Optional[LocalScore]:
+        """Predict rubric scores for one response; None when the scorer is disabled"""
+        results = self.score_batch([text], [question], [expected_points])
+        return results[0] if results else None
+
+    def analysis(self, local: LocalScore) -> Dict[str, Any]:
+        """A local prediction in the same shape as an LLM response analysis"""
+        overall = round(sum(local.scores.values()) / len(local.scores), 1)
+        if local.covered_points or local.missing_points:
+            feedback = f"Covered {len(local.covered_points)} of {len(local.covered_points) + len(local.missing_points)} expected points."
+        else:
+            feedback = "Scored from answer relevance, structure and detail."
+        return {
+            **local.scores,
+            "overall_score": overall,
+            "sentiment_score": 0.5,
+            "confidence_score": 0.5,
+            "relevance_score": round(min(1.0, max(0.0, local.reference_similarity)), 2),
+            "key_points_mentioned": local.covered_points,
+            "missing_points": local.missing_points,
+            "strengths_identified": [],
+            "areas_for_improvement": [],
+            "feedback": feedback,
+            "difficulty_recommendation": "harder" if overall >= 8 else "easier" if overall < 4 else "same",
+            "follow_up_suggestions": [],
+            "scored_by": "local_model",
+            "score_interval": local.interval,
+        }
+
+    def fallback_analysis(self, text: str, question: Optional[str] = None,
+                          expected_points: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Best available analysis without the LLM: the local model, else the keyword heuristics"""
+        local = self.score(text, question, expected_points)
+        if local is not None:
+            return self.analysis(local)
+
+        heuristic = heuristic_scorer.score_response(text or "")
+        scores = {
+            "technical_accuracy": heuristic["technical"],
+            "communication_clarity": heuristic["communication"],
+            "depth_of_knowledge": (heuristic["technical"] + heuristic["experience"]) / 2,
+            "problem_solving_approach": heuristic["problem_solving"],
+            "relevance_to_question": heuristic["relevance"],
+            "professional_experience": heuristic["experience"],
+        }
+        return {
+            **scores,
+            "overall_score": round(sum(scores.values()) / len(scores), 1),
+            "sentiment_score": 0.5,
+            "confidence_score": 0.5,
+            "relevance_score": 0.5,
+            "key_points_mentioned": [],
+            "missing_points": [],
+            "strengths_identified": [],
+            "areas_for_improvement": [],
+            "feedback": "Scored from answer length and keywords; detailed analysis was unavailable.",
+            "difficulty_recommendation": "same",
+            "follow_up_suggestions": [],
+            "scored_by": "heuristic",
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.counters["confident"] + self.counters["escalated"]
+        return {
+            "enabled": self.enabled,
+            "weights_file": self.weights_file,
+            "max_interval": self.max_interval,
+            "vocabulary_size": len(self.vocabulary),
+            **self.counters,
+            "local_rate": self.counters["confident"] / total if total else 0.0,
+        }
+
+
+# Global local scorer instance
+local_scorer = LocalScorer()
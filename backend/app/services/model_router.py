@@ -0,0 +1,79 @@
+"""
+Per-operation model routing with latency-SLO fallback to the fast tier
+"""
+
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+
+# Latency samples kept per operation when checking its SLO
+SLO_WINDOW = 50
+
+
+class ModelRouter:
+    """Pick the model tier for each AIService operation
+
+    Live interview turns use the fast tier and report-quality work uses the
+    quality tier (see LLM_MODEL_ROUTES). When a quality-tier operation's p95
+    latency breaches its SLO it is moved to the fast tier for a cooldown.
+    """
+
+    def __init__(self):
+        self.tiers = {
+            "fast": settings.OPENAI_FAST_MODEL,
+            "quality": settings.OPENAI_MODEL
+        }
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=SLO_WINDOW))
+        self._degraded_until: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def tier_for(self, operation: Optional[str]) -> str:
+        tier = settings.LLM_MODEL_ROUTES.get(operation or "", "quality")
+        if tier == "quality" and self._degraded_until.get(operation, 0) > time.monotonic():
+            return "fast"
+        return tier
+
+    def model_for(self, operation: Optional[str]) -> str:
+        """Model to use for an operation right now"""
+        tier = self.tier_for(operation)
+        self.counters[f"{operation}.{tier}"] += 1
+        return self.tiers.get(tier, settings.OPENAI_MODEL)
+
+    def record(self, operation: Optional[str], model: str, seconds: float):
+        """Record a completed call's latency and degrade the operation if it breaches its SLO"""
+        slo = settings.LLM_LATENCY_SLO_SECONDS.get(operation or "")
+        if not slo or model != self.tiers["quality"]:
+            return
+
+        samples = self.latencies[operation]
+        samples.append(seconds)
+        if len(samples) < settings.LLM_SLO_MIN_SAMPLES:
+            return
+
+        ordered = sorted(samples)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        if p95 > slo:
+            self._degraded_until[operation] = time.monotonic() + settings.LLM_SLO_COOLDOWN_SECONDS
+            self.counters[f"{operation}.slo_fallbacks"] += 1
+            samples.clear()
+            print(f"🐢 {operation} p95 {p95:.1f}s over its {slo:.0f}s SLO, using {self.tiers['fast']} "
+                  f"for {settings.LLM_SLO_COOLDOWN_SECONDS}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "tiers": self.tiers,
+            "routes": settings.LLM_MODEL_ROUTES,
+            "slo_seconds": settings.LLM_LATENCY_SLO_SECONDS,
+            "degraded": {
+                operation: round(until - now)
+                for operation, until in self._degraded_until.items() if until > now
+            },
+            "counters": dict(self.counters)
+        }
+
+
+# Global model router
+model_router = ModelRouter()
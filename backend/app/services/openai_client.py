@@ -0,0 +1,52 @@
+"""
+Shared async OpenAI client and per-process concurrency limit
+"""
+
+import asyncio
+from typing import Optional
+
+import httpx
+import openai
+
+from app.core.config import settings
+
+
+_client: Optional[openai.AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Get the process-wide AsyncOpenAI client (one HTTP connection pool)"""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+            )
+        )
+        _client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            max_retries=0,  # Retries are handled by llm_resilience
+            http_client=http_client
+        )
+    return _client
+
+
+def get_openai_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent OpenAI calls in this process"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.OPENAI_MAX_CONCURRENCY))
+    return _semaphore
+
+
+async def close_openai_client():
+    """Close the shared client and its connection pool"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
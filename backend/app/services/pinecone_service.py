@@ -3,11 +3,16 @@ Pinecone service for vector storage and retrieval
 """
 
 import pinecone
+from fastapi import Request
 from typing import List, Dict, Any, Optional
 from app.core.config import settings
-import openai
+from app.services.openai_client import get_openai_client, get_openai_semaphore
+from app.services.llm_resilience import llm_resilience
+from app.services.rate_limiter import rate_limiter
 import json
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 
 class PineconeService:
     """Service for Pinecone vector database operations"""
@@ -38,14 +43,20 @@ class PineconeService:
             print(f"❌ Pinecone initialization error: {e}")
             self.index = None
     
-    def _get_embedding(self, text: str) -> List[float]:
+    async def _get_embedding(self, text: str) -> List[float]:
         """Get embedding for text using OpenAI"""
         try:
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
+            async def send():
+                async with get_openai_semaphore():
+                    return await get_openai_client().embeddings.with_raw_response.create(
+                        model=EMBEDDING_MODEL,
+                        input=text
+                    )
+            
+            async def create_embedding():
+                return await rate_limiter.call(EMBEDDING_MODEL, len(text) // 4, send)
+            
+            response = await llm_resilience.call("embedding", create_embedding, hedge=True)
             return response.data[0].embedding
         except Exception as e:
             print(f"❌ Embedding generation error: {e}")
@@ -58,7 +69,7 @@ class PineconeService:
                 return False
             
             # Generate embedding
-            embedding = self._get_embedding(resume_text)
+            embedding = await self._get_embedding(resume_text)
             if not embedding:
                 return False
             
@@ -95,7 +106,7 @@ class PineconeService:
                 return False
             
             # Generate embedding
-            embedding = self._get_embedding(context_text)
+            embedding = await self._get_embedding(context_text)
             if not embedding:
                 return False
             
@@ -132,7 +143,7 @@ class PineconeService:
                 return []
             
             # Generate query embedding
-            query_embedding = self._get_embedding(query_text)
+            query_embedding = await self._get_embedding(query_text)
             if not query_embedding:
                 return []
             
@@ -164,7 +175,7 @@ class PineconeService:
                 return []
             
             # Generate query embedding
-            query_embedding = self._get_embedding(query_text)
+            query_embedding = await self._get_embedding(query_text)
             if not query_embedding:
                 return []
             
@@ -225,3 +236,8 @@ class PineconeService:
         except Exception as e:
             print(f"❌ Interview data deletion error: {e}")
             return False
+
+
+def get_pinecone_service(request: Request) -> PineconeService:
+    """Dependency to get the process-wide Pinecone service created in the app lifespan"""
+    return request.app.state.pinecone_service
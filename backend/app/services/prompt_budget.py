@@ -0,0 +1,162 @@
+"""
+Token-budgeted builder for the conversation section of the final-analysis prompt
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character estimate
+    tiktoken = None
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"[a-z0-9]+")
+# Fewest tokens an answer is trimmed down to when the budget is tight
+MIN_ANSWER_TOKENS = 40
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = settings.OPENAI_MODEL) -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate ~4 characters per token"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    return (len(text) + 3) // 4
+
+
+def trim_answer(answer: str, max_tokens: int, question: str = "") -> str:
+    """Extractively shorten an answer to max_tokens
+
+    Keeps the opening sentence, then the sentences sharing the most words with
+    the question, and returns them in their original order.
+    """
+    if count_tokens(answer) <= max_tokens:
+        return answer
+
+    sentences = [s for s in SENTENCE_SPLIT.split(answer.strip()) if s]
+    question_words = set(WORD.findall(question.lower()))
+
+    def relevance(index: int) -> float:
+        words = WORD.findall(sentences[index].lower())
+        overlap = len(question_words.intersection(words)) if words else 0
+        return (1000 if index == 0 else 0) + overlap / (1 + len(words) ** 0.5)
+
+    kept, used = [], 0
+    for index in sorted(range(len(sentences)), key=relevance, reverse=True):
+        cost = count_tokens(sentences[index])
+        if used + cost > max_tokens:
+            continue
+        kept.append(index)
+        used += cost
+
+    if not kept:
+        # A single run-on sentence: cut it by characters
+        return answer[:max_tokens * 4].rstrip() + " …"
+
+    kept.sort()
+    trimmed, previous = [], -1
+    for index in kept:
+        if index != previous + 1:
+            trimmed.append("…")
+        trimmed.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        trimmed.append("…")
+    return " ".join(trimmed)
+
+
+class ConversationPromptBuilder:
+    """Collect interview turns and render them within a token budget"""
+
+    def __init__(self, max_tokens: int = settings.FINAL_ANALYSIS_CONTEXT_TOKENS,
+                 max_answer_tokens: int = settings.FINAL_ANALYSIS_MAX_ANSWER_TOKENS):
+        self.max_tokens = max_tokens
+        self.max_answer_tokens = max_answer_tokens
+        self.turns: List[Dict[str, Any]] = []
+        self.original_tokens = 0
+        self.compacted_tokens = 0
+
+    def add_turn(self, number: int, question: str, answer: Optional[str], analysis: Dict[str, Any]):
+        self.turns.append({
+            "number": number,
+            "question": question or "",
+            "answer": answer or "",
+            "analysis": analysis or {}
+        })
+
+    @staticmethod
+    def _full_turn(turn: Dict[str, Any]) -> str:
+        """The original verbose rendering, used to report how much was saved"""
+        a = turn["analysis"]
+        return (
+            f"Question {turn['number']}: {turn['question']}\n"
+            f"Answer: {turn['answer']}\n"
+            f"Technical Accuracy: {a.get('technical_accuracy', 0)}/10\n"
+            f"Communication Clarity: {a.get('communication_clarity', 0)}/10\n"
+            f"Problem Solving: {a.get('problem_solving_approach', 0)}/10\n"
+            f"Relevance: {a.get('relevance_to_question', 0)}/10\n"
+            f"Experience: {a.get('professional_experience', 0)}/10\n"
+            f"Overall Score: {a.get('overall_score', 0)}/10\n"
+            f"Feedback: {a.get('feedback', 'No feedback')}\n\n"
+        )
+
+    @staticmethod
+    def _compact_turn(turn: Dict[str, Any], answer: str, feedback: bool = True) -> str:
+        a = turn["analysis"]
+        lines = [
+            f"Q{turn['number']}: {turn['question']}",
+            f"A: {answer}",
+            "Scores/10: tech {} | comm {} | solving {} | relevance {} | experience {} | overall {}".format(
+                *(round(float(a.get(k, 0) or 0), 1) for k in (
+                    "technical_accuracy", "communication_clarity", "problem_solving_approach",
+                    "relevance_to_question", "professional_experience", "overall_score"
+                ))
+            )
+        ]
+        if feedback and a.get("feedback"):
+            lines.append(f"Feedback: {a['feedback']}")
+        return "\n".join(lines) + "\n\n"
+
+    def _render(self, answer_tokens: int, feedback: bool = True) -> str:
+        return "".join(
+            self._compact_turn(turn, trim_answer(turn["answer"], answer_tokens, turn["question"]), feedback)
+            for turn in self.turns
+        )
+
+    def build(self) -> str:
+        """Render all turns, trimming answers (then dropping feedback) until the budget fits"""
+        self.original_tokens = count_tokens("".join(self._full_turn(turn) for turn in self.turns))
+
+        answer_tokens = self.max_answer_tokens
+        context = self._render(answer_tokens)
+        tokens = count_tokens(context)
+
+        if tokens > self.max_tokens and self.turns:
+            # Share what is left after the fixed per-turn lines evenly between answers
+            fixed = count_tokens(self._render(0))
+            answer_tokens = max(MIN_ANSWER_TOKENS, (self.max_tokens - fixed) // len(self.turns))
+            context = self._render(min(answer_tokens, self.max_answer_tokens))
+            tokens = count_tokens(context)
+
+        if tokens > self.max_tokens:
+            context = self._render(MIN_ANSWER_TOKENS, feedback=False)
+            tokens = count_tokens(context)
+            if tokens > self.max_tokens:
+                print(f"⚠️ Conversation context still {tokens} tokens, over the {self.max_tokens} budget")
+
+        self.compacted_tokens = tokens
+        print(f"📏 Final analysis context: {self.original_tokens} -> {self.compacted_tokens} tokens "
+              f"(budget {self.max_tokens}, {len(self.turns)} turns)")
+        return context
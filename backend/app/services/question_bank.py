@@ -0,0 +1,198 @@
+"""
+Pre-generated question bank: indexed pool reads and background refills
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.question_bank import QuestionBankEntry
+from app.services.resume_analysis_store import normalize_role_focus
+
+# Question types kept stocked in every pool
+BANK_QUESTION_TYPES = ("behavioral", "technical", "situational")
+BANK_DIFFICULTIES = ("easy", "medium", "hard")
+# Existing questions shown to the model so a refill does not repeat them
+AVOID_EXAMPLES = 20
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def question_hash(question: str) -> str:
+    return hashlib.sha256(WHITESPACE.sub(" ", question).strip().lower().encode()).hexdigest()
+
+
+def sample_questions(db: Session, role_focus: str, difficulty: str, question_type: Optional[str] = None,
+                     limit: int = 20) -> List[Dict[str, Any]]:
+    """Random sample of up to limit questions from a pool
+
+    Pools are capped near QUESTION_BANK_TARGET_SIZE per type, so ordering the
+    index-filtered rows by random() stays cheap.
+    """
+    query = db.query(QuestionBankEntry).filter(
+        QuestionBankEntry.role_focus == normalize_role_focus(role_focus),
+        QuestionBankEntry.difficulty == difficulty
+    )
+    if question_type:
+        query = query.filter(QuestionBankEntry.question_type == question_type)
+    return [entry.to_dict() for entry in query.order_by(func.random()).limit(limit)]
+
+
+def pool_sizes(db: Session, role_focus: str, difficulty: str) -> Dict[str, int]:
+    """Question count per type in a pool"""
+    rows = db.query(QuestionBankEntry.question_type, func.count(QuestionBankEntry.id)).filter(
+        QuestionBankEntry.role_focus == normalize_role_focus(role_focus),
+        QuestionBankEntry.difficulty == difficulty
+    ).group_by(QuestionBankEntry.question_type).all()
+    sizes = {question_type: 0 for question_type in BANK_QUESTION_TYPES}
+    sizes.update({question_type: count for question_type, count in rows})
+    return sizes
+
+
+def short_pools(db: Session) -> List[Tuple[str, str]]:
+    """(role_focus, difficulty) pools with any question type below the target size"""
+    rows = db.query(
+        QuestionBankEntry.role_focus, QuestionBankEntry.difficulty,
+        QuestionBankEntry.question_type, func.count(QuestionBankEntry.id)
+    ).group_by(QuestionBankEntry.role_focus, QuestionBankEntry.difficulty, QuestionBankEntry.question_type).all()
+
+    counts = {(role, difficulty, question_type): count for role, difficulty, question_type, count in rows}
+    pools = {(role, difficulty) for role, difficulty, _ in counts}
+    pools.update(
+        (normalize_role_focus(role), difficulty)
+        for role in settings.QUESTION_BANK_ROLES for difficulty in BANK_DIFFICULTIES
+    )
+    return sorted(
+        pool for pool in pools
+        if any(counts.get((*pool, question_type), 0) < settings.QUESTION_BANK_TARGET_SIZE for question_type in BANK_QUESTION_TYPES)
+    )
+
+
+def add_questions(db: Session, role_focus: str, difficulty: str, question_type: str,
+                  questions: List[Dict[str, Any]]) -> int:
+    """Store generated questions in a pool, skipping ones it already holds; returns the number added"""
+    role_focus = normalize_role_focus(role_focus)
+    by_hash = {question_hash(q["question"]): q for q in questions if q.get("question", "").strip()}
+    if not by_hash:
+        return 0
+
+    existing = {
+        row[0] for row in db.query(QuestionBankEntry.question_hash).filter(
+            QuestionBankEntry.role_focus == role_focus,
+            QuestionBankEntry.question_hash.in_(list(by_hash))
+        )
+    }
+    entries = [
+        QuestionBankEntry(
+            role_focus=role_focus,
+            difficulty=difficulty,
+            question_type=question_type,
+            question=q["question"].strip(),
+            question_hash=digest,
+            skills_tested=q.get("skills_tested", []),
+            expected_answer_points=q.get("expected_answer_points", [])
+        )
+        for digest, q in by_hash.items() if digest not in existing
+    ]
+    db.add_all(entries)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent refill stored some of the same questions; keep the pool as it is
+        db.rollback()
+        return 0
+    return len(entries)
+
+
+def _recent_questions(db: Session, role_focus: str, difficulty: str, question_type: str) -> List[str]:
+    rows = db.query(QuestionBankEntry.question).filter(
+        QuestionBankEntry.role_focus == normalize_role_focus(role_focus),
+        QuestionBankEntry.difficulty == difficulty,
+        QuestionBankEntry.question_type == question_type
+    ).order_by(QuestionBankEntry.id.desc()).limit(AVOID_EXAMPLES)
+    return [row[0] for row in rows]
+
+
+async def refill_pool(ai_service, role_focus: str, difficulty: str, question_types: Optional[List[str]] = None,
+                      max_batches: Optional[int] = None,
+                      report_progress: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, int]:
+    """Generate questions until each type in the pool reaches QUESTION_BANK_TARGET_SIZE
+
+    Types are filled concurrently; each stops early if a batch adds nothing new.
+    Returns the number of questions added per type.
+    """
+    from app.database import SessionLocal
+
+    def db_call(fn, *args):
+        def run():
+            db = SessionLocal()
+            try:
+                return fn(db, *args)
+            finally:
+                db.close()
+        return asyncio.to_thread(run)
+
+    sizes = await db_call(pool_sizes, role_focus, difficulty)
+
+    async def fill(question_type: str) -> int:
+        added = 0
+        batches = 0
+        while sizes.get(question_type, 0) + added < settings.QUESTION_BANK_TARGET_SIZE:
+            if max_batches is not None and batches >= max_batches:
+                break
+            batches += 1
+            avoid = await db_call(_recent_questions, role_focus, difficulty, question_type)
+            count = min(settings.QUESTION_BANK_BATCH_SIZE, settings.QUESTION_BANK_TARGET_SIZE - sizes.get(question_type, 0) - added)
+            questions = await ai_service.generate_bank_questions(role_focus, difficulty, question_type, count, avoid)
+            new = await db_call(add_questions, role_focus, difficulty, question_type, questions)
+            if not new:
+                break
+            added += new
+            if report_progress:
+                await report_progress(f"Added {added} {question_type} questions for {role_focus} ({difficulty})")
+        return added
+
+    question_types = question_types or list(BANK_QUESTION_TYPES)
+    added = await asyncio.gather(*(fill(question_type) for question_type in question_types))
+    result = dict(zip(question_types, added))
+    print(f"📚 Question bank {normalize_role_focus(role_focus)}/{difficulty} refilled: {result}")
+    return result
+
+
+def refresh_dedupe_key(role_focus: str, difficulty: str) -> str:
+    return f"question_bank_refresh:{normalize_role_focus(role_focus)}:{difficulty}"
+
+
+async def enqueue_refresh(queue, role_focus: str, difficulty: str) -> Dict[str, Any]:
+    return await queue.enqueue(
+        "question_bank_refresh",
+        {"role_focus": normalize_role_focus(role_focus), "difficulty": difficulty},
+        dedupe_key=refresh_dedupe_key(role_focus, difficulty)
+    )
+
+
+async def refresh_loop(queue):
+    """Periodically queue refills for every pool below its target size"""
+    from app.database import SessionLocal
+
+    def find_short_pools():
+        db = SessionLocal()
+        try:
+            return short_pools(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            pools = await asyncio.to_thread(find_short_pools)
+            for role_focus, difficulty in pools:
+                await enqueue_refresh(queue, role_focus, difficulty)
+        except Exception as e:
+            print(f"❌ Question bank refresh scan failed: {e}")
+        await asyncio.sleep(settings.QUESTION_BANK_REFRESH_INTERVAL_SECONDS)
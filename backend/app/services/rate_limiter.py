@@ -0,0 +1,213 @@
+"""
+Adaptive token-bucket rate limiter for OpenAI requests and tokens
+
+Each model has a request bucket and a token bucket. Bucket state lives in a
+store shared by the uvicorn workers on a host (a JSON file under an fcntl
+lock), so bursts from several workers draw from one budget. Calls reserve
+capacity up front and sleep off any deficit, so waiting callers are served
+in reservation order without polling.
+
+The rate adapts AIMD-style: a 429 halves it, every successful call wins a
+little back, and x-ratelimit-* headers replace the configured limits and
+clamp the buckets to what OpenAI says is left.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import openai
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: fall back to per-process buckets
+    fcntl = None
+
+StateUpdate = Callable[[Dict[str, Any]], Any]
+
+
+class MemoryBucketStore:
+    """Bucket state for this process only"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: str, fn: StateUpdate) -> Any:
+        with self._lock:
+            return fn(self._states.setdefault(key, {}))
+
+
+class FileBucketStore:
+    """Bucket state in a JSON file, updated under an exclusive fcntl lock"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def update(self, key: str, fn: StateUpdate) -> Any:
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    states = json.loads(f.read() or "{}")
+                except ValueError:
+                    states = {}
+                result = fn(states.setdefault(key, {}))
+                f.seek(0)
+                f.truncate()
+                json.dump(states, f)
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _header_number(headers: Any, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_chat_tokens(kwargs: Dict[str, Any]) -> int:
+    """Rough prompt + completion tokens for a chat request (~4 characters per token)
+
+    Only used for the reservation; the bucket is corrected from usage afterwards.
+    """
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in kwargs.get("messages", []))
+    return prompt_chars // 4 + (kwargs.get("max_tokens") or settings.OPENAI_COMPLETION_TOKEN_ESTIMATE)
+
+
+class RateLimiter:
+    """Reserve request and token capacity per model before each OpenAI call"""
+
+    def __init__(self, backend: str = settings.OPENAI_RATE_LIMIT_BACKEND):
+        if backend == "file" and fcntl is not None:
+            self.store = FileBucketStore(settings.OPENAI_RATE_LIMIT_STATE_FILE)
+        else:
+            self.store = MemoryBucketStore()
+            backend = "memory"
+        self.backend = backend
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.waited_seconds = 0.0
+
+    async def _update(self, key: str, fn: StateUpdate) -> Any:
+        if isinstance(self.store, MemoryBucketStore):
+            return self.store.update(key, fn)
+        return await asyncio.to_thread(self.store.update, key, fn)
+
+    @staticmethod
+    def _refill(state: Dict[str, Any], key: str) -> Dict[str, float]:
+        """Bring a model's buckets up to date; returns its current per-second rates"""
+        configured = settings.OPENAI_RATE_LIMITS.get(key) or settings.OPENAI_RATE_LIMITS.get("default", {})
+        now = time.time()
+        if not state:
+            state.update(factor=1.0, rpm=configured.get("rpm", 0), tpm=configured.get("tpm", 0), updated=now)
+            state["requests"] = state["rpm"] * settings.OPENAI_RATE_LIMIT_BURST_SECONDS / 60
+            state["tokens"] = state["tpm"] * settings.OPENAI_RATE_LIMIT_BURST_SECONDS / 60
+
+        rates = {
+            "requests": state["rpm"] * state["factor"] / 60,
+            "tokens": state["tpm"] * state["factor"] / 60
+        }
+        elapsed = max(0.0, now - state["updated"])
+        for bucket, rate in rates.items():
+            capacity = rate * settings.OPENAI_RATE_LIMIT_BURST_SECONDS
+            state[bucket] = min(capacity, state[bucket] + elapsed * rate)
+        state["updated"] = now
+        return rates
+
+    async def acquire(self, key: str, tokens: int = 0) -> float:
+        """Reserve one request and tokens for model key, sleeping off any deficit"""
+
+        def reserve(state: Dict[str, Any]) -> float:
+            rates = self._refill(state, key)
+            wait = 0.0
+            for bucket, amount in (("requests", 1), ("tokens", tokens)):
+                if not rates[bucket] or not amount:
+                    continue
+                state[bucket] -= amount
+                if state[bucket] < 0:
+                    wait = max(wait, -state[bucket] / rates[bucket])
+            return wait
+
+        wait = await self._update(key, reserve)
+        self.counters[f"{key}.requests"] += 1
+        if wait > 0:
+            self.counters[f"{key}.throttled"] += 1
+            if wait > settings.OPENAI_RATE_LIMIT_MAX_WAIT_SECONDS:
+                print(f"⚠️ {key} rate limit reservation is {wait:.1f}s out, waiting {settings.OPENAI_RATE_LIMIT_MAX_WAIT_SECONDS}s")
+                wait = settings.OPENAI_RATE_LIMIT_MAX_WAIT_SECONDS
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+        return wait
+
+    async def settle(self, key: str, headers: Any = None, token_correction: int = 0):
+        """Record a successful call: additive increase, header limits and the usage correction"""
+
+        def apply(state: Dict[str, Any]):
+            self._refill(state, key)
+            state["factor"] = min(1.0, state["factor"] + settings.OPENAI_RATE_LIMIT_INCREASE)
+            if state["tpm"]:
+                state["tokens"] -= token_correction
+            if headers is None:
+                return
+            for bucket, limit_key in (("requests", "rpm"), ("tokens", "tpm")):
+                limit = _header_number(headers, f"x-ratelimit-limit-{bucket}")
+                remaining = _header_number(headers, f"x-ratelimit-remaining-{bucket}")
+                if limit:
+                    state[limit_key] = limit
+                if remaining is not None and state[limit_key]:
+                    state[bucket] = min(state[bucket], remaining)
+
+        await self._update(key, apply)
+
+    async def throttled(self, key: str, headers: Any = None):
+        """Record a 429: multiplicative decrease, and hold the bucket for any retry-after"""
+        retry_after = _header_number(headers, "retry-after") if headers is not None else None
+
+        def apply(state: Dict[str, Any]):
+            self._refill(state, key)
+            state["factor"] = max(settings.OPENAI_RATE_LIMIT_MIN_FRACTION, state["factor"] * settings.OPENAI_RATE_LIMIT_DECREASE)
+            rate = state["rpm"] * state["factor"] / 60
+            state["requests"] = min(state["requests"], -(retry_after or 0) * rate)
+            return state["factor"]
+
+        factor = await self._update(key, apply)
+        self.counters[f"{key}.rate_limited"] += 1
+        print(f"🚦 OpenAI 429 for {key}, rate cut to {factor:.0%} of its limit")
+
+    async def call(self, key: str, tokens: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, which returns an OpenAI raw response, under key's limits and return the parsed result"""
+        if not settings.OPENAI_RATE_LIMIT_ENABLED:
+            return (await fn()).parse()
+
+        await self.acquire(key, tokens)
+        try:
+            raw = await fn()
+        except openai.RateLimitError as e:
+            await self.throttled(key, e.response.headers)
+            raise
+
+        result = raw.parse()
+        usage = getattr(result, "usage", None)
+        correction = usage.total_tokens - tokens if usage is not None and tokens else 0
+        await self.settle(key, raw.headers, correction)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.OPENAI_RATE_LIMIT_ENABLED,
+            "backend": self.backend,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "counters": dict(self.counters)
+        }
+
+
+# Global rate limiter shared by all OpenAI callers in this process
+rate_limiter = RateLimiter()
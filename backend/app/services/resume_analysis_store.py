@@ -0,0 +1,84 @@
+"""
+Stored resume analyses, so repeat uploads of the same resume skip the LLM extraction
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+# Zero-width characters and soft hyphens left behind by PDF text extraction
+INVISIBLE_CHARS = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_resume_text(resume_text: str) -> str:
+    """Normalize text so re-extractions of the same resume compare equal
+
+    NFKC folds ligatures and full-width forms; case and whitespace runs are
+    ignored because PDF extractors differ mostly in line breaks and spacing.
+    """
+    text = unicodedata.normalize("NFKC", resume_text or "")
+    text = INVISIBLE_CHARS.sub("", text)
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+def resume_text_hash(resume_text: str) -> str:
+    return hashlib.sha256(normalize_resume_text(resume_text).encode()).hexdigest()
+
+
+def normalize_role_focus(role_focus: Optional[str]) -> str:
+    return WHITESPACE.sub(" ", role_focus or "General").strip().lower()[:100]
+
+
+def get_stored_analysis(text_hash: str, role_focus: str) -> Optional[Dict[str, Any]]:
+    """Stored analysis for a resume hash and role focus, counting the hit"""
+    from app.database import SessionLocal
+    from app.models.resume_analysis import ResumeAnalysisRecord
+
+    db = SessionLocal()
+    try:
+        record = db.query(ResumeAnalysisRecord).filter(
+            ResumeAnalysisRecord.text_hash == text_hash,
+            ResumeAnalysisRecord.role_focus == normalize_role_focus(role_focus)
+        ).first()
+        if not record:
+            return None
+        record.hit_count = (record.hit_count or 0) + 1
+        db.commit()
+        return record.analysis
+    finally:
+        db.close()
+
+
+def store_analysis(text_hash: str, role_focus: str, model: Optional[str], analysis: Dict[str, Any]):
+    """Insert or replace the stored analysis for a resume hash and role focus"""
+    from app.database import SessionLocal
+    from app.models.resume_analysis import ResumeAnalysisRecord
+
+    role_focus = normalize_role_focus(role_focus)
+    db = SessionLocal()
+    try:
+        for _ in range(2):
+            record = db.query(ResumeAnalysisRecord).filter(
+                ResumeAnalysisRecord.text_hash == text_hash,
+                ResumeAnalysisRecord.role_focus == role_focus
+            ).first()
+            if record:
+                record.analysis = analysis
+                record.model = model
+            else:
+                db.add(ResumeAnalysisRecord(text_hash=text_hash, role_focus=role_focus, model=model, analysis=analysis))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another worker inserted the same resume first; update its row instead
+                db.rollback()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,96 @@
+"""
+Maintenance of per-interview running score aggregates
+
+All helpers work inside the caller's session and never commit, so the
+aggregate changes land in the same transaction as the response they describe.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.score_aggregate import SCORE_DIMENSIONS, InterviewScoreAggregate
+
+
+def is_scored(analysis: Optional[Dict[str, Any]]) -> bool:
+    """Whether an analysis counts towards the aggregate (same rule as final analysis)"""
+    return bool(analysis) and bool(analysis.get("overall_score"))
+
+
+def _locked_aggregate(db: Session, interview_id: int) -> InterviewScoreAggregate:
+    """Fetch the aggregate row with a row lock, creating it if needed"""
+    aggregate = db.query(InterviewScoreAggregate).filter(
+        InterviewScoreAggregate.interview_id == interview_id
+    ).with_for_update().first()
+    if aggregate:
+        return aggregate
+
+    try:
+        with db.begin_nested():
+            aggregate = InterviewScoreAggregate(interview_id=interview_id)
+            aggregate.reset()
+            db.add(aggregate)
+        return aggregate
+    except IntegrityError:
+        # Another transaction created the row first
+        return db.query(InterviewScoreAggregate).filter(
+            InterviewScoreAggregate.interview_id == interview_id
+        ).with_for_update().one()
+
+
+def record_analysis(db: Session, interview_id: int, analysis: Optional[Dict[str, Any]],
+                    previous: Optional[Dict[str, Any]] = None):
+    """Apply a new (or replaced) response analysis to the interview aggregate"""
+    if not is_scored(analysis) and not is_scored(previous):
+        return
+
+    aggregate = _locked_aggregate(db, int(interview_id))
+    if is_scored(previous):
+        aggregate.add(previous, weight=-1)
+    if is_scored(analysis):
+        aggregate.add(analysis)
+
+
+def rebuild_aggregate(db: Session, interview_id: int) -> InterviewScoreAggregate:
+    """Recompute the aggregate from the stored responses"""
+    from app.models.response import Response
+
+    aggregate = _locked_aggregate(db, int(interview_id))
+    aggregate.reset()
+    analyses = db.query(Response.ai_analysis).filter(Response.interview_id == int(interview_id)).all()
+    for (analysis,) in analyses:
+        if is_scored(analysis):
+            aggregate.add(analysis)
+    print(f"🔄 Rebuilt score aggregate for interview {interview_id} from {aggregate.response_count} responses")
+    return aggregate
+
+
+def _matches(aggregate: InterviewScoreAggregate, analyses: Iterable[Dict[str, Any]]) -> bool:
+    """Whether the aggregate's count and per-dimension sums equal those of analyses"""
+    expected = InterviewScoreAggregate()
+    expected.reset()
+    for analysis in analyses:
+        expected.add(analysis)
+    if aggregate.response_count != expected.response_count:
+        return False
+    return all(
+        math.isclose(getattr(aggregate, f"{dimension}_sum") or 0.0, getattr(expected, f"{dimension}_sum"), abs_tol=1e-6)
+        for dimension in SCORE_DIMENSIONS
+    )
+
+
+def get_aggregate(db: Session, interview_id: int,
+                  stored_analyses: Optional[Iterable[Dict[str, Any]]] = None) -> InterviewScoreAggregate:
+    """Read the aggregate, rebuilding it when missing or out of step with stored_analyses
+
+    Callers that already loaded the interview's scored analyses pass them in, so
+    scores rewritten outside record_analysis are caught even when the count is unchanged.
+    """
+    aggregate = db.query(InterviewScoreAggregate).filter(
+        InterviewScoreAggregate.interview_id == int(interview_id)
+    ).first()
+    if aggregate is None or (stored_analyses is not None and not _matches(aggregate, stored_analyses)):
+        aggregate = rebuild_aggregate(db, interview_id)
+    return aggregate
@@ -0,0 +1,90 @@
+"""
+Single-flight coalescing of duplicate work within and across worker processes
+"""
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+
+class SingleFlight:
+    """Run at most one coroutine per key in this process; concurrent callers share its result"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or wait for the run already in flight"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            print(f"⏳ Joining in-flight run for {key}")
+
+        # Shield so a disconnecting caller does not cancel the run for everyone else
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when no caller is left to await it
+        if not task.cancelled():
+            task.exception()
+
+    def is_running(self, key: str) -> bool:
+        return key in self._inflight
+
+
+def advisory_lock_id(key: str) -> int:
+    """Map a string key onto a signed 64-bit Postgres advisory lock id"""
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big", signed=True)
+
+
+@asynccontextmanager
+async def advisory_lock(key: str):
+    """Hold a Postgres session advisory lock for key so only one worker runs at a time
+
+    Polls pg_try_advisory_lock instead of blocking a thread on pg_advisory_lock.
+    On other databases, or if the lock cannot be taken before the timeout,
+    the body runs without the cross-worker guard.
+    """
+    from app.database import engine
+
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    lock_id = advisory_lock_id(key)
+    conn = await asyncio.to_thread(engine.connect)
+    acquired = False
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS
+        delay = 0.1
+        while True:
+            acquired = await asyncio.to_thread(
+                lambda: conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}).scalar()
+            )
+            if acquired or loop.time() >= deadline:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+        if not acquired:
+            print(f"⚠️ Advisory lock for {key} not acquired after {settings.SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS}s, continuing without it")
+        yield
+    finally:
+        try:
+            if acquired:
+                await asyncio.to_thread(
+                    lambda: conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                )
+        finally:
+            await asyncio.to_thread(conn.close)
@@ -0,0 +1,57 @@
+"""
+Speculative pre-generation of the next interview question while the candidate answers
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+# difficulty_adjustment branches generated for every question
+BRANCHES = ("easier", "same", "harder")
+
+
+class QuestionSpeculator:
+    """Keep one set of in-flight next-question candidates per interview"""
+
+    def __init__(self):
+        self._pending: Dict[str, Dict[str, asyncio.Task]] = {}
+        self.counters = {"started": 0, "used": 0, "missed": 0}
+
+    def start(self, interview_id: str, generate: Callable[[str], Awaitable[Optional[str]]]):
+        """Start generating a next question for every difficulty branch, replacing older ones"""
+        self.cancel(interview_id)
+        self._pending[interview_id] = {
+            branch: asyncio.create_task(generate(branch)) for branch in BRANCHES
+        }
+        self.counters["started"] += 1
+
+    def is_pending(self, interview_id: str) -> bool:
+        return interview_id in self._pending
+
+    async def take(self, interview_id: str, difficulty: Optional[str]) -> Optional[str]:
+        """Return the question for the chosen branch and cancel the others
+
+        Returns None when nothing was speculated or the chosen branch failed.
+        """
+        tasks = self._pending.pop(interview_id, None)
+        if not tasks:
+            return None
+
+        branch = difficulty if difficulty in tasks else "same"
+        chosen = tasks.pop(branch)
+        for task in tasks.values():
+            task.cancel()
+
+        try:
+            question = await chosen
+        except asyncio.CancelledError:
+            if not chosen.cancelled():
+                raise
+            question = None
+
+        self.counters["used" if question else "missed"] += 1
+        return question
+
+    def cancel(self, interview_id: str):
+        """Drop any speculation for an interview"""
+        for task in self._pending.pop(interview_id, {}).values():
+            task.cancel()
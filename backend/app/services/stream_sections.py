@@ -0,0 +1,62 @@
+"""
+Incremental splitter for streamed completions made of marker-separated sections
+"""
+
+from typing import List, Tuple
+
+
+class SectionStreamParser:
+    """Split streamed text into sections separated by marker strings, in order
+
+    Text is released as soon as it cannot be the start of the next marker, so
+    callers can forward it to clients while the completion is still streaming.
+    """
+
+    def __init__(self, markers: List[str]):
+        self.markers = markers
+        self.section = 0
+        self.sections: List[str] = [""] * (len(markers) + 1)
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[Tuple[int, str]]:
+        """Add streamed text, returning (section_index, text) pieces that are now final"""
+        self._buffer += chunk
+        pieces = []
+
+        while self.section < len(self.markers):
+            marker = self.markers[self.section]
+            index = self._buffer.find(marker)
+            if index >= 0:
+                self._emit(pieces, self._buffer[:index])
+                self._buffer = self._buffer[index + len(marker):]
+                self.section += 1
+                continue
+
+            # Hold back a tail that could still grow into the marker
+            keep = self._partial_marker_length(marker)
+            self._emit(pieces, self._buffer[:len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            return pieces
+
+        self._emit(pieces, self._buffer)
+        self._buffer = ""
+        return pieces
+
+    def finish(self) -> List[Tuple[int, str]]:
+        """Flush any held-back text at the end of the stream"""
+        pieces = []
+        self._emit(pieces, self._buffer)
+        self._buffer = ""
+        return pieces
+
+    def _emit(self, pieces: List[Tuple[int, str]], text: str):
+        if text:
+            self.sections[self.section] += text
+            pieces.append((self.section, text))
+
+    def _partial_marker_length(self, marker: str) -> int:
+        """Length of the longest buffer suffix that is a prefix of marker"""
+        for length in range(min(len(marker) - 1, len(self._buffer)), 0, -1):
+            if self._buffer.endswith(marker[:length]):
+                return length
+        return 0
@@ -3,10 +3,105 @@ WebSocket connection manager for real-time interview communication
 """
 
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import json
 import asyncio
-from app.services.ai_service import AIService
+from app.core.config import settings
+from app.services.ai_service import AIService, FusedTurnError
+from app.services.speculation import QuestionSpeculator
+from app.services.interview_session import InterviewSessionStore
+
+# Messages that answer the current question; a newer answer supersedes them
+TURN_MESSAGES = {"text_response", "audio_data", "audio_end", "audio_stream_end"}
+
+
+class ConnectionWorker:
+    """Bounded inbound queue of one socket, processed in order by a dedicated task"""
+    
+    def __init__(self, send: Callable[[dict], Awaitable[None]], turn_slots: asyncio.Semaphore):
+        self.send = send
+        self.turn_slots = turn_slots  # Shared by the sockets of one interview
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_INBOUND_QUEUE_SIZE)
+        self.turn_seq = 0  # Turns queued under an older number were superseded or cancelled
+        self.cancel_reason = "superseded"
+        self.current_turn: Optional[asyncio.Task] = None
+        self.current_on_cancel: Optional[Callable[[], None]] = None
+        self.paused = False
+        self.task = asyncio.create_task(self._run())
+    
+    async def submit(self, factory: Callable[[], Awaitable[Any]], turn: bool = False, timestamp=None,
+                     on_cancel: Optional[Callable[[], None]] = None):
+        """Queue factory() to run after the messages before it; never waits for the queue
+        
+        on_cancel is called if the work is dropped or cancelled instead of completing.
+        """
+        if turn and settings.WS_CANCEL_SUPERSEDED_TURNS:
+            self.cancel_turns("superseded")
+        try:
+            self.queue.put_nowait((self.turn_seq if turn else None, timestamp, factory, on_cancel))
+        except asyncio.QueueFull:
+            if on_cancel:
+                on_cancel()
+            await self.send({"type": "error", "message": "Too many pending messages, message dropped"})
+            return
+    
+        if not self.paused and self.queue.qsize() >= settings.WS_BACKPRESSURE_HIGH_WATERMARK:
+            self.paused = True
+            await self.send({"type": "backpressure", "state": "pause", "queued": self.queue.qsize()})
+    
+    def cancel_turns(self, reason: str):
+        """Cancel the running turn and every queued one"""
+        self.turn_seq += 1
+        self.cancel_reason = reason
+        if self.current_turn and not self.current_turn.done():
+            self.current_turn.cancel()
+    
+    def stop(self):
+        if self.current_turn:
+            self.current_turn.cancel()
+            if self.current_on_cancel:
+                self.current_on_cancel()
+        self.task.cancel()
+        while not self.queue.empty():
+            on_cancel = self.queue.get_nowait()[3]
+            if on_cancel:
+                on_cancel()
+    
+    async def _run(self):
+        while True:
+            seq, timestamp, factory, on_cancel = await self.queue.get()
+            if self.paused and self.queue.qsize() <= settings.WS_BACKPRESSURE_LOW_WATERMARK:
+                self.paused = False
+                await self.send({"type": "backpressure", "state": "resume", "queued": self.queue.qsize()})
+    
+            try:
+                if seq is None:
+                    await factory()
+                else:
+                    await self._run_turn(seq, timestamp, factory, on_cancel)
+            except Exception as e:
+                print(f"❌ Error processing queued message: {e}")
+    
+    async def _run_turn(self, seq: int, timestamp, factory: Callable[[], Awaitable[Any]],
+                        on_cancel: Optional[Callable[[], None]] = None):
+        turn = None
+        if seq == self.turn_seq:
+            async with self.turn_slots:
+                # The turn may have been superseded while it waited for a slot
+                if seq == self.turn_seq:
+                    turn = self.current_turn = asyncio.create_task(factory())
+                    self.current_on_cancel = on_cancel
+                    # wait() instead of await, so cancelling the turn leaves the worker running
+                    await asyncio.wait({turn})
+                    self.current_turn = self.current_on_cancel = None
+    
+        if turn is None or turn.cancelled():
+            # A turn cancelled before it started never got to clean up after itself
+            if on_cancel:
+                on_cancel()
+            await self.send({"type": "turn_cancelled", "reason": self.cancel_reason, "timestamp": timestamp})
+            return
+        turn.result()
 
 
 class ConnectionManager:
@@ -14,7 +109,17 @@ class ConnectionManager:
     
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
-        self.ai_service = AIService()
+        # Assigned from the application lifespan once the shared services exist
+        self.ai_service: Optional[AIService] = None
+        self.speculator = QuestionSpeculator()
+        self.sessions = InterviewSessionStore()
+        # Binary audio being received per socket, between audio_start and audio_end
+        self.audio_uploads: Dict[WebSocket, Dict[str, Any]] = {}
+        # Streamed PCM answers per socket, segmented and transcribed as they arrive
+        self.audio_streams: Dict[WebSocket, Dict[str, Any]] = {}
+        # Inbound message worker per socket, and the turn slots each interview's workers share
+        self.workers: Dict[WebSocket, ConnectionWorker] = {}
+        self.turn_slots: Dict[str, asyncio.Semaphore] = {}
     
     async def connect(self, websocket: WebSocket, interview_id: str):
         """Accept a new WebSocket connection"""
@@ -24,10 +129,29 @@ class ConnectionManager:
             self.active_connections[interview_id] = []
         
         self.active_connections[interview_id].append(websocket)
+        slots = self.turn_slots.setdefault(
+            interview_id, asyncio.Semaphore(settings.WS_MAX_INFLIGHT_TURNS_PER_INTERVIEW)
+        )
+        self.workers[websocket] = ConnectionWorker(
+            lambda message: self._send_to_websocket(websocket, message), slots
+        )
         print(f"✅ WebSocket connected for interview {interview_id}")
+        
+        # Load interview state once so turns do not need database reads
+        try:
+            await self.sessions.open(interview_id)
+        except Exception as e:
+            print(f"⚠️ Could not load session for interview {interview_id}, turns will read the database: {e}")
     
     def disconnect(self, websocket: WebSocket, interview_id: str):
         """Remove a WebSocket connection"""
+        worker = self.workers.pop(websocket, None)
+        if worker:
+            worker.stop()
+        self.audio_uploads.pop(websocket, None)
+        streamed = self.audio_streams.pop(websocket, None)
+        if streamed:
+            streamed["transcription"].cancel()
         if interview_id in self.active_connections:
             if websocket in self.active_connections[interview_id]:
                 self.active_connections[interview_id].remove(websocket)
@@ -35,9 +159,76 @@ class ConnectionManager:
             # Clean up empty interview connections
             if not self.active_connections[interview_id]:
                 del self.active_connections[interview_id]
+                self.speculator.cancel(interview_id)
+                self.sessions.close(interview_id)
+                self.turn_slots.pop(interview_id, None)
         
         print(f"❌ WebSocket disconnected for interview {interview_id}")
     
+    async def receive(self, websocket: WebSocket, interview_id: str, message: dict):
+        """Route one frame from the receive loop without waiting for turns to be processed"""
+        # Binary frames carry audio after an audio_start or audio_stream_start message
+        if message.get("bytes") is not None:
+            await self.handle_audio_frame(websocket, interview_id, message["bytes"])
+            return
+        
+        try:
+            data = json.loads(message.get("text") or "")
+        except ValueError:
+            await self._send_error(websocket, "Invalid JSON message")
+            return
+        if not isinstance(data, dict):
+            await self._send_error(websocket, "Message must be a JSON object")
+            return
+        
+        message_type = data.get("type")
+        timestamp = data.get("timestamp")
+        try:
+            # Answered here so they are never stuck behind a slow turn
+            if message_type == "ping":
+                await self._send_to_websocket(websocket, {"type": "pong", "timestamp": timestamp})
+            elif message_type == "cancel":
+                worker = self.workers.get(websocket)
+                if worker:
+                    worker.cancel_turns("cancelled")
+            # Audio state changes here so the binary frames that follow find it
+            elif message_type in ("audio_start", "audio_stream_start"):
+                await self.handle_message(websocket, interview_id, data)
+            elif message_type == "audio_end":
+                upload = await self._take_audio_upload(websocket)
+                if upload:
+                    await self._submit(
+                        websocket,
+                        lambda: self._transcribe_upload(websocket, interview_id, upload, timestamp),
+                        turn=True, timestamp=timestamp
+                    )
+            elif message_type == "audio_stream_end":
+                streamed = await self._take_audio_stream(websocket)
+                if streamed:
+                    await self._submit(
+                        websocket,
+                        lambda: self._transcribe_stream(websocket, interview_id, streamed, timestamp),
+                        turn=True, timestamp=timestamp, on_cancel=streamed["transcription"].cancel
+                    )
+            else:
+                await self._submit(
+                    websocket,
+                    lambda: self.handle_message(websocket, interview_id, data),
+                    turn=message_type in TURN_MESSAGES, timestamp=timestamp
+                )
+        
+        except Exception as e:
+            print(f"❌ Error handling message: {e}")
+            await self._send_error(websocket, f"Error processing message: {str(e)}")
+    
+    async def _submit(self, websocket: WebSocket, factory, turn: bool = False, timestamp=None, on_cancel=None):
+        """Hand work to the socket's worker, or run it now for sockets that have none"""
+        worker = self.workers.get(websocket)
+        if worker is None:
+            await factory()
+            return
+        await worker.submit(factory, turn=turn, timestamp=timestamp, on_cancel=on_cancel)
+    
     async def handle_message(self, websocket: WebSocket, interview_id: str, data: dict):
         """Handle incoming WebSocket messages"""
         message_type = data.get("type")
@@ -45,6 +236,14 @@ class ConnectionManager:
         try:
             if message_type == "audio_data":
                 await self._handle_audio_data(websocket, interview_id, data)
+            elif message_type == "audio_start":
+                await self._handle_audio_start(websocket, interview_id, data)
+            elif message_type == "audio_end":
+                await self._handle_audio_end(websocket, interview_id, data)
+            elif message_type == "audio_stream_start":
+                await self._handle_audio_stream_start(websocket, interview_id, data)
+            elif message_type == "audio_stream_end":
+                await self._finish_audio_stream(websocket, interview_id, data.get("timestamp"))
             elif message_type == "text_response":
                 await self._handle_text_response(websocket, interview_id, data)
             elif message_type == "start_interview":
@@ -58,26 +257,167 @@ class ConnectionManager:
             print(f"❌ Error handling message: {e}")
             await self._send_error(websocket, f"Error processing message: {str(e)}")
     
+    async def handle_audio_frame(self, websocket: WebSocket, interview_id: str, frame: bytes):
+        """Handle a binary audio frame of a streamed answer or of an audio_start upload"""
+        streamed = self.audio_streams.get(websocket)
+        if streamed is not None:
+            if streamed.get("submitted"):
+                # Frames the client sent before it saw speech_ended
+                return
+            streamed["transcription"].feed(frame)
+            if streamed["transcription"].ended:
+                # Endpointing found the end of the answer; the stream stays until audio_stream_end
+                # or the next answer so late frames are ignored
+                streamed["submitted"] = True
+                await self._send_to_websocket(websocket, {"type": "speech_ended"})
+                await self._submit(
+                    websocket,
+                    lambda: self._transcribe_stream(websocket, interview_id, streamed),
+                    turn=True, timestamp=streamed["timestamp"], on_cancel=streamed["transcription"].cancel
+                )
+            return
+        
+        upload = self.audio_uploads.get(websocket)
+        if upload is None:
+            await self._send_error(websocket, "Binary audio frame received without audio_start")
+            return
+        
+        upload["size"] += len(frame)
+        if upload["size"] > settings.WS_AUDIO_MAX_BYTES:
+            del self.audio_uploads[websocket]
+            await self._send_error(websocket, f"Audio exceeds {settings.WS_AUDIO_MAX_BYTES} bytes")
+            return
+        upload["frames"].append(frame)
+    
+    async def _handle_audio_start(self, websocket: WebSocket, interview_id: str, data: dict):
+        """Start receiving an answer as binary frames"""
+        audio_format = str(data.get("format", "wav")).lower()
+        if audio_format not in settings.WS_AUDIO_FORMATS:
+            await self._send_error(websocket, f"Unsupported audio format: {audio_format}")
+            return
+        
+        # A new audio_start replaces an upload or stream that was never finished
+        self._drop_audio_stream(websocket)
+        self.audio_uploads[websocket] = {
+            "format": audio_format,
+            "timestamp": data.get("timestamp"),
+            "frames": [],
+            "size": 0
+        }
+    
+    async def _handle_audio_end(self, websocket: WebSocket, interview_id: str, data: dict):
+        """Transcribe the binary frames received since audio_start"""
+        upload = await self._take_audio_upload(websocket)
+        if upload:
+            await self._transcribe_upload(websocket, interview_id, upload, data.get("timestamp"))
+    
+    async def _take_audio_upload(self, websocket: WebSocket) -> Optional[Dict[str, Any]]:
+        """End the socket's binary upload; None (after sending an error) if there is nothing to transcribe"""
+        upload = self.audio_uploads.pop(websocket, None)
+        if upload is None:
+            await self._send_error(websocket, "audio_end received without audio_start")
+            return None
+        if not upload["size"]:
+            await self._send_error(websocket, "No audio data provided")
+            return None
+        return upload
+    
+    async def _transcribe_upload(self, websocket: WebSocket, interview_id: str, upload: Dict[str, Any], timestamp=None):
+        audio_bytes = upload["frames"][0] if len(upload["frames"]) == 1 else b"".join(upload["frames"])
+        await self._transcribe_and_respond(
+            websocket, interview_id,
+            self.ai_service.transcribe_audio_bytes(audio_bytes, upload["format"]),
+            timestamp or upload["timestamp"]
+        )
+    
+    async def _handle_audio_stream_start(self, websocket: WebSocket, interview_id: str, data: dict):
+        """Start a streamed answer: binary frames are 16-bit mono PCM at sample_rate"""
+        from app.services.audio_stream import StreamingTranscription
+        
+        sample_rate = data.get("sample_rate", 16000)
+        if sample_rate not in settings.WS_STREAM_SAMPLE_RATES:
+            await self._send_error(websocket, f"Unsupported sample rate: {sample_rate}")
+            return
+        
+        async def send_interim(text: str, segment: int):
+            await self._send_to_websocket(websocket, {
+                "type": "interim_transcript",
+                "text": text,
+                "segment": segment,
+                "timestamp": data.get("timestamp")
+            })
+        
+        # A new stream replaces any answer that was never finished
+        self._drop_audio_stream(websocket)
+        self.audio_uploads.pop(websocket, None)
+        ai_service = self.ai_service
+        self.audio_streams[websocket] = {
+            "transcription": StreamingTranscription(
+                sample_rate,
+                lambda audio: ai_service.transcribe_audio_bytes(audio, "wav"),
+                on_interim=send_interim
+            ),
+            "timestamp": data.get("timestamp")
+        }
+    
+    async def _finish_audio_stream(self, websocket: WebSocket, interview_id: str, timestamp=None):
+        """Wait for the streamed answer's remaining segments and answer the full transcript"""
+        streamed = await self._take_audio_stream(websocket)
+        if streamed:
+            await self._transcribe_stream(websocket, interview_id, streamed, timestamp)
+    
+    async def _take_audio_stream(self, websocket: WebSocket) -> Optional[Dict[str, Any]]:
+        """End the socket's streamed answer; None if it has none or endpointing already ended it"""
+        streamed = self.audio_streams.pop(websocket, None)
+        if streamed is None:
+            await self._send_error(websocket, "audio_stream_end received without audio_stream_start")
+            return None
+        return None if streamed.get("submitted") else streamed
+    
+    def _drop_audio_stream(self, websocket: WebSocket):
+        """Forget the socket's streamed answer, cancelling its transcription unless a turn already owns it"""
+        streamed = self.audio_streams.pop(websocket, None)
+        if streamed and not streamed.get("submitted"):
+            streamed["transcription"].cancel()
+    
+    async def _transcribe_stream(self, websocket: WebSocket, interview_id: str, streamed: Dict[str, Any], timestamp=None):
+        transcription = streamed["transcription"]
+        
+        async def transcript():
+            text = await transcription.finish()
+            print(f"🎙️ Streamed answer ended after {transcription.stream.seconds:.1f}s in {len(transcription.tasks)} segments")
+            if not text:
+                raise Exception("No speech detected")
+            return text
+        
+        await self._transcribe_and_respond(websocket, interview_id, transcript(), timestamp or streamed["timestamp"])
+    
     async def _handle_audio_data(self, websocket: WebSocket, interview_id: str, data: dict):
-        """Handle audio data from client"""
+        """Handle base64 audio data from client (JSON protocol)"""
         audio_data = data.get("audio_data")
         if not audio_data:
             await self._send_error(websocket, "No audio data provided")
             return
         
+        await self._transcribe_and_respond(
+            websocket, interview_id, self.ai_service.transcribe_audio(audio_data), data.get("timestamp")
+        )
+    
+    async def _transcribe_and_respond(self, websocket: WebSocket, interview_id: str, transcribe, timestamp=None):
+        """Await a transcription, send it to the client and answer it"""
         # Transcribe audio using Whisper
         try:
-            transcription = await self.ai_service.transcribe_audio(audio_data)
+            transcription = await transcribe
             
             # Send transcription back to client
             await self._send_to_websocket(websocket, {
                 "type": "transcription",
                 "text": transcription,
-                "timestamp": data.get("timestamp")
+                "timestamp": timestamp
             })
             
             # Process the transcription for AI response
-            await self._process_candidate_response(websocket, interview_id, transcription)
+            await self._process_candidate_response(websocket, interview_id, transcription, timestamp)
             
         except Exception as e:
             await self._send_error(websocket, f"Transcription failed: {str(e)}")
@@ -89,36 +429,139 @@ class ConnectionManager:
             await self._send_error(websocket, "No text provided")
             return
         
-        await self._process_candidate_response(websocket, interview_id, text)
+        await self._process_candidate_response(websocket, interview_id, text, data.get("timestamp"))
     
-    async def _process_candidate_response(self, websocket: WebSocket, interview_id: str, response_text: str):
+    async def _process_candidate_response(self, websocket: WebSocket, interview_id: str, response_text: str, timestamp=None):
         """Process candidate response and generate AI follow-up"""
         try:
-            # Analyze the response
-            analysis = await self.ai_service.analyze_response(interview_id, response_text)
+            next_action = None
+            analysis = None
+            speculated = self.speculator.is_pending(interview_id)
+            session = self.sessions.get(interview_id)
+            context = session.turn_context() if session else {}
             
-            # Send analysis to client
-            await self._send_to_websocket(websocket, {
-                "type": "response_analysis",
-                "analysis": analysis,
-                "timestamp": data.get("timestamp")
-            })
+            # With a speculated next question only the analysis is still needed
+            if settings.WS_TURN_MODE == "fused" and not speculated:
+                try:
+                    next_action, analysis = await self._run_fused_turn(websocket, interview_id, response_text, timestamp, context)
+                except FusedTurnError as e:
+                    print(f"⚠️ {e}, falling back to two-step turn")
+            
+            if next_action is None:
+                # Analyze the response
+                analysis = await self.ai_service.analyze_response(interview_id, response_text, **context)
+                
+                # Send analysis to client
+                await self._send_to_websocket(websocket, {
+                    "type": "response_analysis",
+                    "analysis": analysis,
+                    "timestamp": timestamp
+                })
+                
+                if speculated:
+                    next_action = await self._take_speculative_question(interview_id, analysis)
             
-            # Generate follow-up question or next step
-            next_action = await self.ai_service.generate_next_action(interview_id, response_text, analysis)
+            if next_action is None:
+                # Generate follow-up question or next step
+                if settings.WS_STREAM_AI_RESPONSES:
+                    next_action = await self._stream_next_action(websocket, interview_id, response_text, analysis, timestamp)
+                else:
+                    next_action = await self.ai_service.generate_next_action(interview_id, response_text, analysis)
             
             await self._send_to_websocket(websocket, {
                 "type": "ai_response",
                 "action": next_action,
-                "timestamp": data.get("timestamp")
+                "timestamp": timestamp
             })
             
+            if session:
+                session.record_turn(response_text, analysis)
+                session.ask(next_action.get("content"))
+            
+            self._speculate_next_question(interview_id, next_action.get("content"))
+            
         except Exception as e:
             await self._send_error(websocket, f"Response processing failed: {str(e)}")
     
+    def _speculate_next_question(self, interview_id: str, current_question: Optional[str]):
+        """Start pre-generating the question after current_question while the candidate answers"""
+        if not settings.WS_SPECULATIVE_QUESTIONS or not current_question:
+            return
+        ai_service = self.ai_service
+        session = self.sessions.get(interview_id)
+        role_focus = session.role_focus if session else None
+        self.speculator.start(
+            interview_id,
+            lambda difficulty: ai_service.generate_speculative_question(interview_id, current_question, difficulty, role_focus)
+        )
+    
+    async def _take_speculative_question(self, interview_id: str, analysis: dict) -> Optional[dict]:
+        """Use the pre-generated question matching the analysis difficulty recommendation"""
+        difficulty = analysis.get("difficulty_recommendation", "same")
+        question = await self.speculator.take(interview_id, difficulty)
+        if not question:
+            return None
+        print(f"⚡ Using speculative '{difficulty}' question for interview {interview_id}")
+        return {
+            "action_type": "next_question",
+            "content": question,
+            "difficulty_adjustment": difficulty,
+            "reasoning": "Pre-generated while the candidate was answering"
+        }
+    
+    async def _run_fused_turn(self, websocket: WebSocket, interview_id: str, response_text: str, timestamp=None, context: dict = None):
+        """Send response_analysis and the follow-up produced by one fused LLM call; returns (next_action, analysis)"""
+        context = context or {}
+        next_action = None
+        analysis = None
+        async for event in self.ai_service.stream_turn(
+            interview_id, response_text, context.get("question_context"), context.get("role_focus")
+        ):
+            if event["type"] == "analysis":
+                analysis = event["analysis"]
+                await self._send_to_websocket(websocket, {
+                    "type": "response_analysis",
+                    "analysis": event["analysis"],
+                    "timestamp": timestamp
+                })
+            elif event["type"] == "delta":
+                if settings.WS_STREAM_AI_RESPONSES:
+                    await self._send_to_websocket(websocket, {
+                        "type": "ai_response_delta",
+                        "delta": event["text"],
+                        "timestamp": timestamp
+                    })
+            elif event["type"] == "action":
+                next_action = event["action"]
+        return next_action, analysis
+    
+    async def _stream_next_action(self, websocket: WebSocket, interview_id: str, response_text: str, analysis: dict, timestamp=None) -> dict:
+        """Forward the follow-up as ai_response_delta frames while it is generated"""
+        next_action = None
+        async for event in self.ai_service.stream_next_action(interview_id, response_text, analysis):
+            if event["type"] == "delta":
+                await self._send_to_websocket(websocket, {
+                    "type": "ai_response_delta",
+                    "delta": event["text"],
+                    "timestamp": timestamp
+                })
+            elif event["type"] == "action":
+                next_action = event["action"]
+        return next_action
+    
     async def _handle_start_interview(self, websocket: WebSocket, interview_id: str, data: dict):
         """Handle interview start"""
         try:
+            # Fill in what the client left out from the loaded interview
+            session = self.sessions.get(interview_id)
+            if session:
+                data = {
+                    **data,
+                    "role_focus": data.get("role_focus") or session.role_focus,
+                    "difficulty": data.get("difficulty") or session.difficulty,
+                    "candidate_info": data.get("candidate_info") or session.candidate_summary
+                }
+            
             # Initialize interview session
             interview_data = await self.ai_service.initialize_interview(interview_id, data)
             
@@ -127,12 +570,20 @@ class ConnectionManager:
                 "data": interview_data
             })
             
+            opening_question = interview_data.get("opening_question") or {}
+            if session:
+                session.role_focus = data["role_focus"]
+                session.ask(opening_question.get("question"), opening_question.get("expected_answer_points"))
+            self._speculate_next_question(interview_id, opening_question.get("question"))
+            
         except Exception as e:
             await self._send_error(websocket, f"Interview initialization failed: {str(e)}")
     
     async def _handle_end_interview(self, websocket: WebSocket, interview_id: str, data: dict):
         """Handle interview end"""
         try:
+            self.speculator.cancel(interview_id)
+            
             # Generate final analysis and scoring
             final_analysis = await self.ai_service.generate_final_analysis(interview_id)
             
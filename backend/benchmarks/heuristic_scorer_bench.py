@@ -0,0 +1,145 @@
+"""
+Microbenchmark: app.services.heuristic_scorer against the per-dimension keyword scans it replaced
+
+Scores the same synthetic responses with both, checks the scores are
+identical, and reports the best of several runs.
+
+Usage:
+    python benchmarks/heuristic_scorer_bench.py --responses 10000 --repeat 5
+    python benchmarks/heuristic_scorer_bench.py --matcher substring  # without pyahocorasick
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import heuristic_scorer  # noqa: E402
+
+# Interview-style phrases, some containing scorer keywords, mixed with filler words
+PHRASES = [
+    "In my previous role I worked on a data pipeline",
+    "we broke the problem down step by step",
+    "I would collaborate with the team to find a solution",
+    "for example when the database was slow",
+    "I learned a lot from that project",
+    "because the requirements kept changing",
+    "I took a course on statistics last year",
+    "honestly I am not sure",
+    "the customer was happy with the result",
+    "I think communication matters most",
+    "we shipped the feature on time",
+    "my manager gave me feedback",
+    "I usually start by reading the logs",
+    "it depends on the situation",
+]
+FILLER = ("um so yeah basically like the a and then it was really quite good fine okay "
+          "right maybe actually probably things stuff kind sort of").split()
+
+
+def legacy_score(text: str) -> Dict[str, float]:
+    """The keyword scoring previously duplicated in ai_service and the test-analysis endpoint"""
+    content = text.lower()
+    word_count = len(content.split())
+
+    technical_score = 5.0
+    if any(word in content for word in ['data', 'analysis', 'python', 'sql', 'visualization', 'statistics', 'machine learning', 'algorithm']):
+        technical_score = 7.0
+
+    communication_score = 5.0
+    if word_count > 20:
+        communication_score = 7.0
+    elif word_count > 10:
+        communication_score = 6.0
+
+    problem_solving_score = 5.0
+    if any(word in content for word in ['step', 'process', 'approach', 'solution', 'method']):
+        problem_solving_score = 7.0
+
+    cultural_fit_score = 5.0
+    if any(word in content for word in ['team', 'collaborate', 'work together', 'help', 'support']):
+        cultural_fit_score = 7.0
+    elif any(word in content for word in ['project', 'work', 'experience', 'learn', 'develop']):
+        cultural_fit_score = 6.0
+
+    relevance_score = 5.0
+    if any(word in content for word in ['because', 'therefore', 'however', 'specifically', 'example', 'instance']):
+        relevance_score = 7.0
+    elif word_count > 15:
+        relevance_score = 6.0
+
+    experience_score = 5.0
+    if any(word in content for word in ['internship', 'project', 'work', 'experience', 'previous', 'before', 'studied', 'learned']):
+        experience_score = 7.0
+    elif any(word in content for word in ['course', 'class', 'training', 'certification']):
+        experience_score = 6.0
+
+    return {
+        "technical": technical_score,
+        "communication": communication_score,
+        "problem_solving": problem_solving_score,
+        "cultural_fit": cultural_fit_score,
+        "relevance": relevance_score,
+        "experience": experience_score,
+    }
+
+
+def make_responses(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            if rng.random() < 0.4:
+                parts.append(rng.choice(PHRASES))
+            else:
+                parts.append(" ".join(rng.choice(FILLER) for _ in range(rng.randint(3, 15))))
+        responses.append(". ".join(parts).capitalize() + ".")
+    return responses
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--responses", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--matcher", choices=["auto", "substring"], default="auto",
+                        help="substring forces the fallback used without pyahocorasick")
+    args = parser.parse_args()
+
+    if args.matcher == "substring":
+        heuristic_scorer._automaton = None
+    matcher = "aho-corasick" if heuristic_scorer._automaton is not None else "substring"
+
+    responses = make_responses(args.responses, args.seed)
+    legacy = [legacy_score(text) for text in responses]
+    scored = heuristic_scorer.score_responses(responses)
+    if scored != legacy:
+        mismatches = sum(1 for old, new in zip(legacy, scored) if old != new)
+        raise SystemExit(f"❌ Scores differ from the legacy scorer for {mismatches} responses")
+
+    legacy_seconds = best_of(args.repeat, lambda: [legacy_score(text) for text in responses])
+    batch_seconds = best_of(args.repeat, lambda: heuristic_scorer.score_responses(responses))
+
+    words = sum(len(text.split()) for text in responses) / len(responses)
+    print(f"{args.responses} responses, {words:.0f} words on average, matcher={matcher}, best of {args.repeat}")
+    print(f"  legacy keyword scans : {legacy_seconds * 1000:8.1f} ms  ({legacy_seconds / args.responses * 1e6:.2f} µs/response)")
+    print(f"  heuristic_scorer     : {batch_seconds * 1000:8.1f} ms  ({batch_seconds / args.responses * 1e6:.2f} µs/response)")
+    print(f"  speedup              : {legacy_seconds / batch_seconds:8.2f}x (scores identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+OpenAI-compatible stand-in server for offline benchmarking
+
+Serves the endpoints the backend uses (chat completions, streamed or not,
+audio transcriptions and embeddings) so the interview flow can be
+load-tested without calling OpenAI. Point the backend at it with
+OPENAI_BASE_URL=http://localhost:8100/v1.
+
+Modes:
+- synthetic: schema-valid JSON built from app.services.llm_schemas, chosen
+  from hints in the prompt, and the marker format for streamed turns
+- replay: serve fixtures recorded earlier, keyed by a hash of the request;
+  requests without a fixture fall back to synthetic output
+- record: proxy to the real API (OPENAI_UPSTREAM_API_KEY) and save each
+  response as a fixture
+
+Usage:
+    python benchmarks/openai_stub.py --port 8100 --mode synthetic \
+        --latency chat=lognormal:0.8:0.4 --latency transcription=uniform:0.3:0.9 \
+        --token-delay 0.02 --error-rate 0.02 --rate-limit-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.ai_service import ACTION_MARKER, RESPONSE_MARKER  # noqa: E402
+from app.services.llm_schemas import (  # noqa: E402
+    LLMSchema, ResponseAnalysis, BatchResponseAnalysis, NextAction, GeneratedQuestion,
+    AdaptiveQuestion, QuestionList, FinalAnalysis, ResumeAnalysis
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+EMBEDDING_DIMENSIONS = 1536
+
+# Default latency per endpoint, overridable with --latency / STUB_LATENCY
+DEFAULT_LATENCY = {
+    "chat": "lognormal:0.8:0.4",
+    "transcription": "uniform:0.3:0.9",
+    "embedding": "fixed:0.05"
+}
+
+
+class StubConfig:
+    """Runtime configuration, read from STUB_* environment variables and the CLI"""
+
+    def __init__(self):
+        self.mode = os.getenv("STUB_MODE", "synthetic")
+        self.fixtures_dir = Path(os.getenv("STUB_FIXTURES_DIR", str(FIXTURES_DIR)))
+        self.latency = dict(DEFAULT_LATENCY)
+        self.latency.update(parse_pairs(os.getenv("STUB_LATENCY", "")))
+        self.token_delay = float(os.getenv("STUB_TOKEN_DELAY", "0.01"))
+        self.error_rate = float(os.getenv("STUB_ERROR_RATE", "0"))
+        self.rate_limit_rate = float(os.getenv("STUB_RATE_LIMIT_RATE", "0"))
+        self.upstream_url = os.getenv("STUB_UPSTREAM_URL", "https://api.openai.com/v1")
+        self.upstream_api_key = os.getenv("OPENAI_UPSTREAM_API_KEY", "")
+
+
+def parse_pairs(spec: str) -> Dict[str, str]:
+    """Parse "chat=lognormal:0.8:0.4,embedding=fixed:0.05" into a dict"""
+    pairs = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def sample_latency(spec: str) -> float:
+    """Seconds to wait for a latency spec: fixed:S, uniform:LO:HI or lognormal:MEDIAN:SIGMA"""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+config = StubConfig()
+app = FastAPI(title="OpenAI stub")
+stats: Dict[str, int] = {}
+
+
+def count(name: str):
+    stats[name] = stats.get(name, 0) + 1
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Fixture key: hash of the request without transport-only fields"""
+    canonical = {k: v for k, v in payload.items() if k not in ("stream", "stream_options", "user")}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def fixture_path(endpoint: str, key: str) -> Path:
+    return config.fixtures_dir / endpoint / f"{key}.json"
+
+
+def load_fixture(endpoint: str, key: str) -> Optional[Dict[str, Any]]:
+    path = fixture_path(endpoint, key)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_fixture(endpoint: str, key: str, request_payload: Dict[str, Any], response: Any):
+    path = fixture_path(endpoint, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"request": request_payload, "response": response}, indent=2, default=str))
+    print(f"💾 Recorded {endpoint} fixture {key[:12]}")
+
+
+def error_response(status_code: int, message: str, error_type: str) -> JSONResponse:
+    headers = {"retry-after": "1"} if status_code == 429 else {}
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers
+    )
+
+
+async def simulate(endpoint: str) -> Optional[JSONResponse]:
+    """Wait out the endpoint's latency and maybe inject a failure"""
+    count(f"{endpoint}.requests")
+    await asyncio.sleep(sample_latency(config.latency.get(endpoint, "fixed:0")))
+
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        count(f"{endpoint}.rate_limited")
+        return error_response(429, "Rate limit reached (stub)", "rate_limit_exceeded")
+    if roll < config.rate_limit_rate + config.error_rate:
+        count(f"{endpoint}.errors")
+        return error_response(500, "The server had an error while processing your request (stub)", "server_error")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Synthetic output
+# ---------------------------------------------------------------------------
+
+def synthesize(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random, name: str = "") -> Any:
+    """Build a value that satisfies a JSON schema fragment"""
+    if "$ref" in schema:
+        return synthesize(defs[schema["$ref"].split("/")[-1]], defs, rng, name)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return synthesize(options[0], defs, rng, name) if options else None
+
+    kind = schema.get("type")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        if not properties:
+            return {"synthetic": round(rng.uniform(0, 10), 1)}
+        return {key: synthesize(value, defs, rng, key) for key, value in properties.items()}
+    if kind == "array":
+        return [synthesize(schema.get("items", {"type": "string"}), defs, rng, name) for _ in range(2)]
+    if kind in ("number", "integer"):
+        low = schema.get("minimum", 0)
+        high = schema.get("maximum", 1 if ("score" in name or "confidence" in name) else 10)
+        value = rng.uniform(low + (high - low) * 0.4, high - (high - low) * 0.1)
+        return int(value) if kind == "integer" else round(value, 1)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if name in ("question", "content"):
+        return synthetic_question(rng)
+    if name in ("difficulty_adjustment", "difficulty_recommendation"):
+        return rng.choice(["easier", "same", "harder"])
+    if name == "action_type":
+        return "next_question"
+    if name == "hire_recommendation":
+        return rng.choice(["strong_hire", "hire", "no_hire"])
+    return f"Synthetic {name.replace('_', ' ') or 'text'}"
+
+
+def synthetic_question(rng: random.Random) -> str:
+    topic = rng.choice(["a recent project", "a production incident", "a design trade-off", "a difficult code review"])
+    return f"Can you walk me through {topic} and what you would do differently?"
+
+
+def schema_instance(schema: Type[LLMSchema], rng: random.Random, items: int = 1) -> Dict[str, Any]:
+    """Synthetic output for a schema, validated so it matches what AIService accepts"""
+    if schema is BatchResponseAnalysis:
+        analyses = [dict(schema_instance(ResponseAnalysis, rng), index=n) for n in range(1, items + 1)]
+        return BatchResponseAnalysis.model_validate({"analyses": analyses}).model_dump()
+
+    json_schema = schema.model_json_schema()
+    value = synthesize(json_schema, json_schema.get("$defs", {}), rng)
+    return schema.model_validate(value).model_dump()
+
+
+def pick_schema(prompt: str) -> Tuple[Optional[Type[LLMSchema]], int]:
+    """Guess the requested schema from the prompt; returns (schema, batch size)"""
+    if '"analyses"' in prompt:
+        return BatchResponseAnalysis, max(1, len(re.findall(r"^\s*\d+\. Question:", prompt, re.MULTILINE)))
+    hints = [
+        ("hire_recommendation", FinalAnalysis),
+        ("technical_accuracy", ResponseAnalysis),
+        ("full_name", ResumeAnalysis),
+        ('"questions"', QuestionList),
+        ("adaptive_reasoning", AdaptiveQuestion),
+        ("action_type", NextAction),
+        ('"question"', GeneratedQuestion)
+    ]
+    for hint, schema in hints:
+        if hint in prompt:
+            return schema, 1
+    return None, 1
+
+
+def synthetic_chat(payload: Dict[str, Any]) -> str:
+    """Completion text for a chat request, deterministic per request"""
+    rng = random.Random(request_key(payload))
+    prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+    action = json.dumps({"action_type": "next_question", "difficulty_adjustment": rng.choice(["easier", "same", "harder"]),
+                         "reasoning": "Synthetic reasoning"})
+
+    if RESPONSE_MARKER in prompt:
+        analysis = json.dumps(schema_instance(ResponseAnalysis, rng))
+        return f"{analysis}\n{RESPONSE_MARKER}\n{synthetic_question(rng)}\n{ACTION_MARKER}\n{action}"
+    if ACTION_MARKER in prompt:
+        return f"{synthetic_question(rng)}\n{ACTION_MARKER}\n{action}"
+
+    schema, items = pick_schema(prompt)
+    if (payload.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(schema_instance(schema, rng, items) if schema else {"result": "Synthetic output"})
+    if "question" in prompt.lower():
+        return synthetic_question(rng)
+    return "This is a synthetic completion from the OpenAI stub."
+
+
+def chat_completion(payload: Dict[str, Any], content: str) -> Dict[str, Any]:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in payload.get("messages", [])) // 4
+    return {
+        "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4
+        }
+    }
+
+
+async def stream_chunks(payload: Dict[str, Any], content: str):
+    """Server-sent events in the chat.completion.chunk format, a few characters per chunk"""
+    completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for start in range(0, len(content), 4):
+        if config.token_delay:
+            await asyncio.sleep(config.token_delay)
+        yield chunk({"content": content[start:start + 4]})
+    yield chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+# ---------------------------------------------------------------------------
+# Upstream proxy for record mode
+# ---------------------------------------------------------------------------
+
+async def upstream(path: str, **kwargs) -> httpx.Response:
+    if not config.upstream_api_key:
+        raise RuntimeError("Record mode needs OPENAI_UPSTREAM_API_KEY")
+    async with httpx.AsyncClient(base_url=config.upstream_url, timeout=120) as client:
+        response = await client.post(path, headers={"Authorization": f"Bearer {config.upstream_api_key}"}, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    failure = await simulate("chat")
+    if failure:
+        return failure
+
+    key = request_key(payload)
+    content = None
+    if config.mode == "record":
+        # Record the non-streamed completion; streamed callers get it re-chunked
+        upstream_payload = {k: v for k, v in payload.items() if k not in ("stream", "stream_options")}
+        response = (await upstream("/chat/completions", json=upstream_payload)).json()
+        save_fixture("chat", key, upstream_payload, response)
+        content = response["choices"][0]["message"]["content"]
+    elif config.mode == "replay":
+        fixture = load_fixture("chat", key)
+        if fixture:
+            count("chat.replayed")
+            content = fixture["response"]["choices"][0]["message"]["content"]
+
+    if content is None:
+        count("chat.synthetic")
+        content = synthetic_chat(payload)
+
+    if payload.get("stream"):
+        return StreamingResponse(stream_chunks(payload, content), media_type="text/event-stream")
+    return chat_completion(payload, content)
+
+
+@app.post("/v1/audio/transcriptions")
+async def audio_transcriptions(request: Request):
+    form = await request.form()
+    upload = form.get("file")
+    audio = await upload.read() if upload is not None else b""
+    fields = {k: v for k, v in form.items() if k != "file"}
+    failure = await simulate("transcription")
+    if failure:
+        return failure
+
+    key = request_key({**fields, "audio_sha256": hashlib.sha256(audio).hexdigest()})
+    text = None
+    if config.mode == "record":
+        response = await upstream(
+            "/audio/transcriptions",
+            data={**fields, "response_format": "json"},
+            files={"file": (getattr(upload, "filename", "audio.wav"), audio)}
+        )
+        text = response.json()["text"]
+        save_fixture("transcription", key, fields, {"text": text})
+    elif config.mode == "replay":
+        fixture = load_fixture("transcription", key)
+        if fixture:
+            count("transcription.replayed")
+            text = fixture["response"]["text"]
+
+    if text is None:
+        count("transcription.synthetic")
+        # Roughly one spoken word per 4 KB of audio
+        words = max(3, len(audio) // 4096)
+        text = " ".join(["I", "worked", "on", "the", "backend", "service", "and", "improved", "latency"] * (words // 9 + 1))
+        text = " ".join(text.split()[:words]) + "."
+
+    if fields.get("response_format") == "text":
+        return PlainTextResponse(text + "\n")
+    return {"text": text}
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    payload = await request.json()
+    failure = await simulate("embedding")
+    if failure:
+        return failure
+
+    inputs = payload.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    key = request_key(payload)
+    if config.mode == "record":
+        response = (await upstream("/embeddings", json=payload)).json()
+        save_fixture("embedding", key, payload, response)
+        return response
+    if config.mode == "replay":
+        fixture = load_fixture("embedding", key)
+        if fixture:
+            count("embedding.replayed")
+            return fixture["response"]
+
+    count("embedding.synthetic")
+    data = []
+    for index, text in enumerate(inputs):
+        # Deterministic unit vector per input so similarity search is stable across runs
+        rng = random.Random(hashlib.sha256(str(text).encode()).hexdigest())
+        vector = [rng.gauss(0, 1) for _ in range(payload.get("dimensions") or EMBEDDING_DIMENSIONS)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        data.append({"object": "embedding", "index": index, "embedding": [v / norm for v in vector]})
+
+    tokens = sum(len(str(text)) for text in inputs) // 4
+    return {
+        "object": "list",
+        "data": data,
+        "model": payload.get("model", "stub"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+    }
+
+
+@app.get("/v1/models/{model}")
+async def get_model(model: str):
+    return {"id": model, "object": "model", "created": 0, "owned_by": "stub"}
+
+
+@app.get("/stub/stats")
+async def get_stats():
+    return {"mode": config.mode, "latency": config.latency, "counters": stats}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for offline benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mode", choices=["synthetic", "replay", "record"], default=config.mode)
+    parser.add_argument("--fixtures-dir", default=str(config.fixtures_dir))
+    parser.add_argument("--latency", action="append", default=[],
+                        help="ENDPOINT=fixed:S|uniform:LO:HI|lognormal:MEDIAN:SIGMA (chat, transcription, embedding)")
+    parser.add_argument("--token-delay", type=float, default=config.token_delay, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate, help="Fraction of requests failing with 429")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and error sampling")
+    args = parser.parse_args(argv)
+
+    config.mode = args.mode
+    config.fixtures_dir = Path(args.fixtures_dir)
+    for spec in args.latency:
+        config.latency.update(parse_pairs(spec))
+    for spec in config.latency.values():
+        sample_latency(spec)  # Fail fast on a bad spec
+    config.token_delay = args.token_delay
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    print(f"🧪 OpenAI stub ({config.mode}) on http://{args.host}:{args.port}/v1 - latency {config.latency}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
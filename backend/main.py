@@ -8,14 +8,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import Response
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 from app.database import init_db
-from app.routers import auth, interviews, candidates, ai
+from app.routers import auth, interviews, candidates, ai, jobs
 from app.websocket import connection_manager
 from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.pinecone_service import PineconeService
+from app.services.job_queue import job_queue
+from app.services.job_handlers import register_job_handlers
+from app.services.question_bank import refresh_loop
 
 # Load environment variables
 load_dotenv()
@@ -26,9 +32,30 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     await init_db()
+    
+    # Create process-wide AI services once (Pinecone init does network I/O)
+    pinecone_service = await asyncio.to_thread(PineconeService)
+    ai_service = AIService(pinecone_service=pinecone_service)
+    await ai_service.warm_up()
+    app.state.pinecone_service = pinecone_service
+    app.state.ai_service = ai_service
+    connection_manager.ai_service = ai_service
+    
+    # Background workers for queued AI jobs
+    register_job_handlers(job_queue, ai_service)
+    question_bank_refresher = None
+    if settings.JOB_QUEUE_ENABLED:
+        job_queue.start()
+        question_bank_refresher = asyncio.create_task(refresh_loop(job_queue))
+    
     yield
+    
     # Shutdown
-    pass
+    if question_bank_refresher:
+        question_bank_refresher.cancel()
+    await job_queue.stop()
+    connection_manager.ai_service = None
+    await ai_service.aclose()
 
 
 # Initialize FastAPI app
@@ -99,6 +126,7 @@ app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(candidates.router, prefix="/api/candidates", tags=["candidates"])
 app.include_router(interviews.router, prefix="/api/interviews", tags=["interviews"])
 app.include_router(ai.router, prefix="/api/ai", tags=["ai"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 # WebSocket endpoint for real-time interview
 @app.websocket("/ws/interview/{interview_id}")
@@ -107,9 +135,16 @@ async def websocket_endpoint(websocket: WebSocket, interview_id: str):
     await connection_manager.connect(websocket, interview_id)
     try:
         while True:
-            data = await websocket.receive_json()
-            await connection_manager.handle_message(websocket, interview_id, data)
+            # Turns run on the connection's worker, so this loop keeps reading pings, cancels and audio
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            await connection_manager.receive(websocket, interview_id, message)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Also on unexpected errors, so the connection's worker and turn slots are released
         connection_manager.disconnect(websocket, interview_id)
 
 
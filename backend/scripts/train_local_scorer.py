@@ -0,0 +1,195 @@
+"""
+Train the local first-pass response scorer from stored LLM analyses
+
+Reads every response whose ai_analysis came from the LLM (local and heuristic
+scores are skipped so the model never learns from itself), fits a ridge
+regression from app.services.local_scorer features to the six rubric scores,
+reports held-out error and the share of responses that would be scored
+locally, and writes the weights file the backend loads.
+
+Usage:
+    python scripts/train_local_scorer.py --output local_scorer_weights.json
+    python scripts/train_local_scorer.py --input samples.jsonl  # rows of {response, question, expected_points, analysis}
+    python scripts/train_local_scorer.py --export samples.jsonl  # dump the training rows and exit
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.local_scorer import (  # noqa: E402
+    FEATURE_NAMES, INTERVAL_Z, RUBRIC_DIMENSIONS, LocalScorer, build_vocabulary
+)
+from app.services.score_aggregates import is_scored  # noqa: E402
+
+
+def load_samples_from_db() -> List[Dict[str, Any]]:
+    from app.database import SessionLocal
+    from app.models.question import Question
+    from app.models.response import Response
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Response, Question).join(Question, Response.question_id == Question.id).all()
+        return [
+            {
+                "response": response.text_response,
+                "question": question.content,
+                "expected_points": question.expected_answer_points or [],
+                "analysis": response.ai_analysis,
+            }
+            for response, question in rows
+        ]
+    finally:
+        db.close()
+
+
+def load_samples_from_file(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Feedback of the constant-score defaults older versions stored when analysis failed
+LEGACY_FALLBACK_FEEDBACK = {"Unable to analyze response due to technical error", "Analysis pending"}
+
+
+def is_legacy_fallback(analysis: Dict[str, Any]) -> bool:
+    """Placeholder analyses saved before fallbacks were tagged with scored_by"""
+    if analysis.get("feedback") in LEGACY_FALLBACK_FEEDBACK:
+        return True
+    return len({analysis[dimension] for dimension in RUBRIC_DIMENSIONS}) == 1 and analysis[RUBRIC_DIMENSIONS[0]] == 5.0
+
+
+def usable(sample: Dict[str, Any]) -> bool:
+    """LLM-scored responses with all six rubric dimensions"""
+    analysis = sample.get("analysis")
+    return (
+        bool((sample.get("response") or "").strip())
+        and isinstance(analysis, dict)
+        and is_scored(analysis)
+        and "scored_by" not in analysis
+        and all(isinstance(analysis.get(dimension), (int, float)) for dimension in RUBRIC_DIMENSIONS)
+        and not is_legacy_fallback(analysis)
+    )
+
+
+def fit(scorer: LocalScorer, samples: List[Dict[str, Any]], alpha: float) -> Dict[str, Any]:
+    """Ridge fit on standardized features; returns the weights file contents"""
+    matrix, _ = scorer.features(
+        [s["response"] for s in samples], [s.get("question") for s in samples], [s.get("expected_points") for s in samples]
+    )
+    targets = np.asarray([[s["analysis"][dimension] for dimension in RUBRIC_DIMENSIONS] for s in samples], dtype=np.float64)
+
+    mean = matrix.mean(axis=0)
+    scale = matrix.std(axis=0)
+    scale[scale == 0] = 1.0
+    design = np.hstack([(matrix - mean) / scale, np.ones((len(matrix), 1))])
+
+    penalty = alpha * np.eye(design.shape[1])
+    penalty[-1, -1] = 0.0  # Leave the intercept unpenalized
+    gram = design.T @ design
+    inverse_gram = np.linalg.inv(gram + penalty)
+    coef = inverse_gram @ design.T @ targets
+
+    # Effective degrees of freedom of the ridge fit, for unbiased residual spread and the leverage cutoff
+    dof = float(np.trace(inverse_gram @ gram))
+    residuals = targets - design @ coef
+    residual_std = np.sqrt((residuals ** 2).sum(axis=0) / max(1.0, len(samples) - dof))
+
+    return {
+        "features": list(FEATURE_NAMES),
+        "targets": list(RUBRIC_DIMENSIONS),
+        "vocabulary": sorted(scorer.vocabulary, key=scorer.vocabulary.get),
+        "idf": scorer.idf.tolist(),
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": coef.tolist(),
+        "inverse_gram": inverse_gram.tolist(),
+        "residual_std": residual_std.tolist(),
+        "max_leverage": min(1.0, 3 * dof / len(samples)),
+        "samples": len(samples),
+        "alpha": alpha,
+    }
+
+
+def scorer_for(samples: List[Dict[str, Any]], vocabulary_size: int) -> LocalScorer:
+    """A LocalScorer with a vocabulary built from the samples and no model yet"""
+    documents = [s["response"] for s in samples] + [
+        " ".join([s.get("question") or ""] + list(s.get("expected_points") or [])) for s in samples
+    ]
+    vocabulary, idf = build_vocabulary(documents, vocabulary_size)
+
+    scorer = LocalScorer(weights_file=None, max_interval=settings.LOCAL_SCORER_MAX_INTERVAL)
+    scorer.use_weights({"vocabulary": sorted(vocabulary, key=vocabulary.get), "idf": idf})
+    return scorer
+
+
+def evaluate(train: List[Dict[str, Any]], holdout: List[Dict[str, Any]], args) -> None:
+    scorer = scorer_for(train, args.vocabulary_size)
+    weights = fit(scorer, train, args.alpha)
+    scorer.use_weights(weights)
+
+    results = scorer.score_batch(
+        [s["response"] for s in holdout], [s.get("question") for s in holdout], [s.get("expected_points") for s in holdout]
+    )
+    predicted = np.asarray([[r.scores[d] for d in RUBRIC_DIMENSIONS] for r in results])
+    actual = np.asarray([[s["analysis"][d] for d in RUBRIC_DIMENSIONS] for s in holdout])
+    confident = np.asarray([r.confident for r in results])
+    errors = np.abs(predicted - actual)
+
+    print(f"📊 Held-out evaluation on {len(holdout)} responses (trained on {len(train)})")
+    for column, dimension in enumerate(RUBRIC_DIMENSIONS):
+        print(f"   {dimension:<26} MAE {errors[:, column].mean():.2f}")
+    print(f"   Scored locally at ±{scorer.max_interval}: {confident.mean():.0%}")
+    if confident.any():
+        covered = (errors[confident] <= INTERVAL_Z * np.asarray(weights["residual_std"])).mean()
+        print(f"   MAE on locally scored responses: {errors[confident].mean():.2f} ({covered:.0%} of scores within their interval)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="JSONL samples instead of the database")
+    parser.add_argument("--export", help="Write the usable samples as JSONL and exit")
+    parser.add_argument("--output", default=settings.LOCAL_SCORER_WEIGHTS_FILE)
+    parser.add_argument("--vocabulary-size", type=int, default=5000)
+    parser.add_argument("--alpha", type=float, default=1.0, help="Ridge penalty")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--min-samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    samples = [s for s in (load_samples_from_file(args.input) if args.input else load_samples_from_db()) if usable(s)]
+    print(f"📥 {len(samples)} LLM-scored responses available for training")
+
+    if args.export:
+        with open(args.export, "w") as f:
+            for sample in samples:
+                f.write(json.dumps(sample) + "\n")
+        print(f"✅ Exported {len(samples)} samples to {args.export}")
+        return
+
+    if len(samples) < args.min_samples:
+        raise SystemExit(f"❌ Need at least {args.min_samples} scored responses, found {len(samples)}")
+
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.holdout))
+    if 0 < split < len(samples):
+        evaluate(samples[:split], samples[split:], args)
+
+    # Final weights use every sample
+    weights = fit(scorer_for(samples, args.vocabulary_size), samples, args.alpha)
+    with open(args.output, "w") as f:
+        json.dump(weights, f)
+    print(f"✅ Wrote local scorer weights ({len(weights['vocabulary'])} terms, {len(samples)} samples) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import threading
+from datetime import timedelta
+from typing import Optional
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.database
+from app.models.job import Job, JobStatus
+from app.services.job_queue import JobQueue, _now
+
+# Set to a disposable PostgreSQL database to also run the SKIP LOCKED test against a real server
+POSTGRES_URL = os.getenv("TEST_JOBS_DATABASE_URL")
+
+
+def make_queue(monkeypatch, url: Optional[str] = None) -> JobQueue:
+    """A queue whose sessions use a fresh jobs table (in-memory SQLite unless url is given)"""
+    if url:
+        engine = create_engine(url)
+    else:
+        # One shared connection, so every session sees the same in-memory database
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Job.__table__.drop(engine, checkfirst=True)
+    Job.__table__.create(engine)
+    monkeypatch.setattr(app.database, "SessionLocal", sessionmaker(bind=engine))
+
+    queue = JobQueue()
+    queue.register("final_analysis", None)
+    return queue
+
+
+def test_enqueue_reuses_the_active_job_with_the_same_dedupe_key(monkeypatch):
+    queue = make_queue(monkeypatch)
+    first = queue._db_enqueue("final_analysis", {"interview_id": 1}, "final_analysis:1", None)
+    second = queue._db_enqueue("final_analysis", {"interview_id": 1}, "final_analysis:1", None)
+    other = queue._db_enqueue("final_analysis", {"interview_id": 2}, "final_analysis:2", None)
+
+    assert second["job_id"] == first["job_id"]
+    assert other["job_id"] != first["job_id"]
+
+
+def test_enqueue_after_the_job_finished_creates_a_new_one(monkeypatch):
+    queue = make_queue(monkeypatch)
+    first = queue._db_enqueue("final_analysis", {}, "final_analysis:1", None)
+    queue._update(first["job_id"], status=JobStatus.SUCCEEDED)
+
+    again = queue._db_enqueue("final_analysis", {}, "final_analysis:1", None)
+    assert again["job_id"] != first["job_id"]
+    assert again["status"] == JobStatus.QUEUED
+
+
+def test_active_dedupe_key_is_unique_in_the_database(monkeypatch):
+    queue = make_queue(monkeypatch)
+    queue._db_enqueue("final_analysis", {}, "final_analysis:1", None)
+
+    db = app.database.SessionLocal()
+    try:
+        db.add(Job(job_type="final_analysis", dedupe_key="final_analysis:1", status=JobStatus.QUEUED, attempts=0, max_attempts=3))
+        with pytest.raises(Exception):
+            db.commit()
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_claim_takes_each_job_once(monkeypatch):
+    queue = make_queue(monkeypatch)
+    ids = {queue._db_enqueue("final_analysis", {"n": n}, None, None)["job_id"] for n in range(2)}
+
+    claimed = [queue._claim(), queue._claim(), queue._claim()]
+    assert {job["id"] for job in claimed[:2]} == ids
+    assert all(job["attempts"] == 1 for job in claimed[:2])
+    assert claimed[2] is None
+
+
+def test_claim_retakes_running_jobs_whose_lease_expired(monkeypatch):
+    queue = make_queue(monkeypatch)
+    job_id = queue._db_enqueue("final_analysis", {}, None, None)["job_id"]
+    assert queue._claim()["id"] == job_id
+    assert queue._claim() is None
+
+    queue._update(job_id, locked_at=_now() - timedelta(seconds=3600))
+    reclaimed = queue._claim()
+    assert reclaimed["id"] == job_id
+    assert reclaimed["attempts"] == 2
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_JOBS_DATABASE_URL not set")
+def test_claim_skips_rows_locked_by_another_worker(monkeypatch):
+    queue = make_queue(monkeypatch, POSTGRES_URL)
+    locked_id = queue._db_enqueue("final_analysis", {"n": 1}, None, None)["job_id"]
+    free_id = queue._db_enqueue("final_analysis", {"n": 2}, None, None)["job_id"]
+
+    # Another worker holds the row lock on the first job while we claim
+    other = app.database.SessionLocal()
+    try:
+        other.query(Job).filter(Job.id == locked_id).with_for_update().one()
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(job=queue._claim()))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive(), "claim blocked on a locked row instead of skipping it"
+        assert result["job"]["id"] == free_id
+    finally:
+        other.rollback()
+        other.close()
@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_resilience import CircuitOpenError, ResilientCaller
+
+
+def open_circuit(caller: ResilientCaller):
+    """Open the breaker and let its reset period pass, so the next call is the half-open probe"""
+    caller.breaker.state = "open"
+    caller.breaker.opened_at = time.monotonic() - caller.breaker.reset_seconds - 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_releases_the_breaker():
+    caller = ResilientCaller()
+    open_circuit(caller)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(60)
+
+    probe = asyncio.create_task(caller.call("chat", hang))
+    await started.wait()
+    assert caller.breaker.state == "half_open"
+    assert not caller.breaker.allow()
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert caller.breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_rejects_calls():
+    caller = ResilientCaller()
+    caller.breaker.state = "open"
+    caller.breaker.opened_at = time.monotonic()
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(CircuitOpenError):
+        await caller.call("chat", ok)
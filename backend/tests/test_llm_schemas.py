@@ -0,0 +1,35 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.services.llm_schemas import ResumeAnalysis
+
+
+def parse(**fields) -> ResumeAnalysis:
+    return ResumeAnalysis.model_validate_json(json.dumps(fields))
+
+
+@pytest.mark.parametrize("value, expected", [("5+", 5.0), ("about 3.5 years", 3.5), ("n/a", None), (7, 7.0)])
+def test_experience_years_parsed_from_text(value, expected):
+    assert parse(experience_years=value).experience_years == expected
+
+
+def test_scalar_contact_fields_become_strings():
+    assert parse(phone=5551234567).phone == "5551234567"
+
+
+def test_comma_separated_skills_are_split():
+    assert parse(skills="Python, Go").skills == ["Python", "Go"]
+    assert parse(skills=None, languages=["English", 1]).languages == ["English", "1"]
+
+
+def test_bare_strings_become_description_entries():
+    analysis = parse(education=["BSc CS, MIT", {"degree": "MSc"}], projects="Compiler")
+    assert analysis.education == [{"description": "BSc CS, MIT"}, {"degree": "MSc"}]
+    assert analysis.projects == [{"description": "Compiler"}]
+
+
+def test_unusable_shapes_still_fail():
+    with pytest.raises(ValidationError):
+        parse(education=5)
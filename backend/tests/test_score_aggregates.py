@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every mapper for the relationships)
+from app.models.response import Response
+from app.models.score_aggregate import InterviewScoreAggregate
+from app.services.score_aggregates import get_aggregate, record_analysis
+
+
+def analysis(score: float):
+    return {
+        "technical_accuracy": score, "communication_clarity": score, "problem_solving_approach": score,
+        "relevance_to_question": score, "professional_experience": score, "overall_score": score,
+    }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [Response.__table__, InterviewScoreAggregate.__table__]
+    for table in tables:
+        table.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_response(db, score: float) -> Response:
+    response = Response(interview_id=1, question_id=1, text_response="answer", ai_analysis=analysis(score))
+    db.add(response)
+    record_analysis(db, 1, response.ai_analysis)
+    db.commit()
+    return response
+
+
+def test_rewritten_scores_with_unchanged_count_trigger_a_rebuild(db):
+    first = add_response(db, 6.0)
+    add_response(db, 8.0)
+
+    # Rescored outside record_analysis: same count, different sums
+    first.ai_analysis = analysis(2.0)
+    db.commit()
+
+    stored = [response.ai_analysis for response in db.query(Response).all()]
+    aggregate = get_aggregate(db, 1, stored_analyses=stored)
+    assert aggregate.response_count == 2
+    assert aggregate.overall_score_sum == pytest.approx(10.0)
+
+
+def test_matching_aggregate_is_used_as_is(db):
+    add_response(db, 6.0)
+    stored = [response.ai_analysis for response in db.query(Response).all()]
+    aggregate = get_aggregate(db, 1, stored_analyses=stored)
+    assert aggregate.overall_score_sum == pytest.approx(6.0)